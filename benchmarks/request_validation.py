@@ -0,0 +1,361 @@
+"""Micro-benchmark of request validation: if/elif validation functions
+(previous path) against validators compiled once from Swagger specification
+and constants (current path). Both must give identical messages on every
+request of the data set.
+
+Usage: python benchmarks/request_validation.py --number 10000
+"""
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+os.environ['ENVIRONMENT'] = 'test'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import constants, pagination, validator  # noqa: E402
+
+
+# Validation constants of previous path
+VALIDATION_DEPARTMENT_POST_AND_PUT = {
+    'required_fields': ['name']
+}
+VALIDATION_EMPLOYEE_POST_AND_PUT = {
+    'required_fields': ['name', 'department_id'],
+    'integer_fields': ['department_id']
+}
+VALIDATION_DEPARTMENT_PATCH = {
+    'fields': ['name'],
+    'not_null_fields': ['name']
+}
+VALIDATION_EMPLOYEE_PATCH = {
+    'fields': ['name', 'department_id', 'date_of_joining', 'gender',
+               'address', 'salary'],
+    'not_null_fields': ['name', 'department_id', 'date_of_joining', 'gender',
+                        'salary']
+}
+
+EMPLOYEE = {
+    'name': 'Ann', 'department_id': 1, 'date_of_joining': '2017-01-02',
+    'gender': 'female', 'address': 'House 1', 'salary': 2000.5
+}
+# Requests of each kind: (arguments of previous and current function)
+BODY_REQUESTS = [
+    (EMPLOYEE, 'POST', 'employee'),
+    (EMPLOYEE, 'PUT', 'employee'),
+    (dict(EMPLOYEE, department_id='x', gender='other'), 'POST', 'employee'),
+    ({'name': 'Ann', 'salary': 'high'}, 'PUT', 'employee'),
+    ({}, 'POST', 'employee'),
+    ({'name': 'Sales'}, 'POST', 'department'),
+    ({'title': 'Sales'}, 'PUT', 'department')
+]
+PARTIAL_REQUESTS = [
+    ({'salary': 2500.0}, 'employee'),
+    ({'department_id': 2, 'date_of_joining': '2017-13-01'}, 'employee'),
+    ({'name': '', 'gender': None, 'address': None, 'age': 3}, 'employee'),
+    ({'name': 'Sales'}, 'department'),
+    ({'name': None, 'code': 'S'}, 'department'),
+    ([], 'employee')
+]
+FILTER_REQUESTS = [
+    ({'page': 1, 'page_size': 10}, 'employee'),
+    ({'page': 2, 'page_size': 50, 'sort_by': 'name,salary',
+      'order_by': 'DESC', 'count': 'estimate'}, 'employee'),
+    ({'page': 1, 'page_size': 10, 'search_by': 'date_of_joining:between',
+      'search_for': '2017-01-01|2017-12-31', 'search_mode': 'exact',
+      'fields': 'employee_id,name'}, 'employee'),
+    ({'page': 'x', 'page_size': 10, 'sort_by': 'age', 'order_by': 'UP',
+      'search_by': 'name', 'search_for': None}, 'employee'),
+    ({'page': 1, 'page_size': 10, 'sort_by': 'relevance',
+      'search_mode': 'fulltext', 'search_by': 'name',
+      'search_for': 'sales'}, 'department'),
+    ({'format': 'xml', 'sort_by': 'name', 'order_by': None,
+      'search_by': None, 'search_for': None}, 'department')
+]
+
+
+# Previous path, validation functions as they were before compiled
+# validators.
+def validate_request(payload, request_type, model):
+    """Validate POST and PUT request.
+    :param payload: json
+    :param request_type: str
+    :param model: str
+    :return: list
+    """
+    validation_message = []
+    if not payload:
+        return 'Request should not be empty'
+    if request_type == 'POST' and model == 'department':
+        missing_fields_list = missing_fields(
+            payload,
+            VALIDATION_DEPARTMENT_POST_AND_PUT['required_fields'])
+        if missing_fields_list:
+            validation_message.append(missing_fields_list)
+    elif request_type == 'POST' and model == 'employee':
+        missing_fields_list = missing_fields(
+            payload,
+            VALIDATION_EMPLOYEE_POST_AND_PUT['required_fields'])
+        if missing_fields_list:
+            validation_message.append(missing_fields_list)
+        non_numeric_fields = numeric_fields(
+            payload,
+            VALIDATION_EMPLOYEE_POST_AND_PUT['integer_fields'])
+        if non_numeric_fields:
+            validation_message.append(non_numeric_fields)
+        if not validate_date(payload.get('date_of_joining')):
+            validation_message.append({
+                'invalid date format':
+                    'Date of joining should be in valid YYYY-MM-DD format'})
+        if payload.get('gender') not in constants.GENDER:
+            validation_message.append({
+                'invalid gender value': 'Gender should be male or female'})
+        if not validator.is_float(str(payload.get('salary'))):
+            validation_message.append({
+                'invalid salary value': 'Salary should be like 2000.00'})
+    elif request_type == 'PUT' and model == 'department':
+        missing_fields_list = missing_fields(
+            payload,
+            VALIDATION_DEPARTMENT_POST_AND_PUT['required_fields'])
+        if missing_fields_list:
+            validation_message.append(missing_fields_list)
+    elif request_type == 'PUT' and model == 'employee':
+        missing_fields_list = missing_fields(
+            payload,
+            VALIDATION_EMPLOYEE_POST_AND_PUT['required_fields'])
+        if missing_fields_list:
+            validation_message.append(missing_fields_list)
+        non_numeric_fields = numeric_fields(
+            payload,
+            VALIDATION_EMPLOYEE_POST_AND_PUT['integer_fields'])
+        if non_numeric_fields:
+            validation_message.append(non_numeric_fields)
+        if not validate_date(payload.get('date_of_joining')):
+            validation_message.append({
+                'invalid date format':
+                    'Date of joining should be in valid YYYY-MM-DD format'})
+        if payload.get('gender') not in constants.GENDER:
+            validation_message.append({
+                'invalid gender value': 'Gender should be male or female'})
+        if not validator.is_float(str(payload.get('salary'))):
+            validation_message.append({
+                'invalid salary value': 'Salary should be like 2000.00'})
+    return validation_message
+
+
+def validate_partial_request(payload, model):
+    """Validate PATCH request, only fields given in the request.
+    :param payload: json
+    :param model: str
+    :return: list
+    """
+    validation_message = []
+    if not payload or not isinstance(payload, dict):
+        return 'Request should not be empty'
+    validation = VALIDATION_DEPARTMENT_PATCH \
+        if model == 'department' else VALIDATION_EMPLOYEE_PATCH
+    invalid_fields_list = validator.invalid_fields(
+        ','.join(payload.keys()), 'request', validation['fields'])
+    if invalid_fields_list:
+        validation_message.append({'invalid fields': [invalid_fields_list]})
+    null_fields = [key for key in validation['not_null_fields']
+                   if key in payload and payload.get(key) in (None, '')]
+    if null_fields:
+        validation_message.append({'missing fields': null_fields})
+    if model == 'employee':
+        if 'department_id' in payload:
+            non_numeric_fields = numeric_fields(payload, ['department_id'])
+            if non_numeric_fields:
+                validation_message.append(non_numeric_fields)
+        if 'date_of_joining' in payload \
+                and not validate_date(payload.get('date_of_joining')):
+            validation_message.append({
+                'invalid date format':
+                    'Date of joining should be in valid YYYY-MM-DD format'})
+        if 'gender' in payload \
+                and payload.get('gender') not in constants.GENDER:
+            validation_message.append({
+                'invalid gender value': 'Gender should be male or female'})
+        if 'salary' in payload \
+                and not validator.is_float(str(payload.get('salary'))):
+            validation_message.append({
+                'invalid salary value': 'Salary should be like 2000.00'})
+    return validation_message
+
+
+def missing_fields(payload, key_list):
+    """Check missing fields.
+    :param payload: json
+    :param key_list: list
+    :return: mixed
+    """
+    missing_fields_list = []
+    for key in key_list:
+        if key not in payload:
+            missing_fields_list.append(key)
+    if missing_fields_list:
+        return {'missing fields': [key for key in missing_fields_list]}
+    return missing_fields_list
+
+
+def numeric_fields(payload, key_list):
+    """Check fields are numeric.
+    :param payload: json
+    :param key_list: list
+    :return: mixed
+    """
+    non_numeric_fields = []
+    for key in key_list:
+        if not validator.is_number(str(payload.get(key))):
+            non_numeric_fields.append(key)
+    if non_numeric_fields:
+        return {'non integer or negative fields list':
+                [key for key in non_numeric_fields]}
+    return non_numeric_fields
+
+
+def validate_date(date):
+    """Validate date in Y-m-d format.
+    :param date: Date to validate.
+    :return: boolean
+    """
+    try:
+        datetime.datetime.strptime(date, '%Y-%m-%d')
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def validate_filter_request(filter_data, model):
+    """Validate GET request for filter records.
+    :param filter_data: dict - Request to filter data.
+    :param model: str
+    :return: list
+    """
+    validation_message = []
+    invalid_fields_message = []
+    non_numeric_fields = numeric_fields(
+        filter_data, [
+            field for field in constants.INTEGER_FIELDS_FILTER_REQUEST
+            if field in filter_data])
+    if non_numeric_fields:
+        validation_message.append(non_numeric_fields)
+    if 'format' in filter_data \
+            and filter_data.get('format') not in constants.EXPORT_FORMATS:
+        validation_message.append({
+            'invalid format value': 'format value should be ndjson or csv'})
+    if filter_data.get('order_by') \
+            and filter_data.get('order_by') not in constants.SORT_ORDER:
+        validation_message.append({
+            'invalid order by value':
+                'order_by value should be ASC or DESC'})
+    if filter_data.get('count') \
+            and filter_data.get('count') not in constants.COUNT_MODES:
+        validation_message.append({
+            'invalid count value':
+                'count value should be exact, estimate or none'})
+    if filter_data.get('search_mode') \
+            and filter_data.get('search_mode') not in constants.SEARCH_MODES:
+        validation_message.append({
+            'invalid search mode value':
+                'search_mode value should be exact, prefix, contains or '
+                'fulltext'})
+    sort_by = (filter_data.get('sort_by') or '').split(',')
+    if constants.SORT_BY_RELEVANCE in sort_by and (
+            filter_data.get('search_mode') != 'fulltext'
+            or filter_data.get('cursor') is not None):
+        validation_message.append({
+            'invalid sort by value':
+                constants.ERROR_MESSAGE_SORT_BY_RELEVANCE})
+    missing_fields_list = validator.missing_fields_for_filters(filter_data)
+    if missing_fields_list:
+        validation_message.append({'missing fields': missing_fields_list})
+    if model == 'department':
+        if filter_data.get('sort_by'):
+            invalid_fields_list = validator.invalid_fields(
+                filter_data.get('sort_by'), 'sort_by',
+                constants.VALIDATION_DEPARTMENT_FIELDS_FOR_FILTER +
+                [constants.SORT_BY_RELEVANCE])
+            if invalid_fields_list:
+                invalid_fields_message.append(invalid_fields_list)
+        if filter_data.get('search_by'):
+            invalid_fields_list = validator.invalid_fields(
+                validator.search_by_fields(filter_data), 'search_by',
+                constants.VALIDATION_DEPARTMENT_FIELDS_FOR_FILTER)
+            if invalid_fields_list:
+                invalid_fields_message.append(invalid_fields_list)
+    if model == 'employee':
+        if filter_data.get('sort_by'):
+            invalid_fields_list = validator.invalid_fields(
+                filter_data.get('sort_by'), 'sort_by',
+                constants.VALIDATION_EMPLOYEE_FIELDS_FOR_FILTER +
+                [constants.SORT_BY_RELEVANCE])
+            if invalid_fields_list:
+                invalid_fields_message.append(invalid_fields_list)
+        if filter_data.get('search_by'):
+            invalid_fields_list = validator.invalid_fields(
+                validator.search_by_fields(filter_data), 'search_by',
+                constants.VALIDATION_EMPLOYEE_FIELDS_FOR_FILTER)
+            if invalid_fields_list:
+                invalid_fields_message.append(invalid_fields_list)
+    if filter_data.get('fields'):
+        invalid_fields_list = validator.invalid_fields(
+            filter_data.get('fields'), 'fields',
+            constants.RESPONSE_FIELDS[model])
+        if invalid_fields_list:
+            invalid_fields_message.append(invalid_fields_list)
+    validation_message.extend(
+        validator.validate_search_filters(filter_data, model))
+    if invalid_fields_message:
+        validation_message.append({'invalid fields': invalid_fields_message})
+    if filter_data.get('cursor') and not pagination.decode_cursor(
+            filter_data.get('cursor'), pagination.keyset_fields(
+                filter_data, '{model}_id'.format(model=model))):
+        validation_message.append({
+            'invalid cursor': constants.ERROR_MESSAGE_INVALID_CURSOR})
+    return validation_message
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark request validation.')
+    parser.add_argument('--number', type=int, default=10000,
+                        help='Validations of each request per measurement.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Measurements of each path.')
+    args = parser.parse_args()
+    kinds = [
+        ('body', BODY_REQUESTS, validate_request,
+         validator.validate_request),
+        ('partial', PARTIAL_REQUESTS, validate_partial_request,
+         validator.validate_partial_request),
+        ('filter', FILTER_REQUESTS, validate_filter_request,
+         validator.validate_filter_request)
+    ]
+    for kind, requests, previous, current in kinds:
+        for arguments in requests:
+            if previous(*arguments) != current(*arguments):
+                sys.exit('Output differs on {kind} request {arguments}'.format(
+                    kind=kind, arguments=arguments))
+    # Paths are measured in turns, so load of machine affects both alike.
+    for kind, requests, previous, current in kinds:
+        timings = {'previous': [], 'compiled': []}
+        for repeat in range(args.repeat):
+            for name, function in (('previous', previous),
+                                   ('compiled', current)):
+                timings[name].append(timeit.timeit(
+                    lambda: [function(*arguments) for arguments in requests],
+                    number=args.number) / args.number / len(requests))
+        timings = {name: min(values) for name, values in timings.items()}
+        print('{kind:>7}: previous {previous:.2f} us, compiled {compiled:.2f} '
+              'us per request, speedup {speedup:.2f}x'.format(
+                  kind=kind, previous=timings['previous'] * 10 ** 6,
+                  compiled=timings['compiled'] * 10 ** 6,
+                  speedup=timings['previous'] / timings['compiled']))
+    print('output identical on {} requests'.format(
+        sum(len(requests) for kind, requests, previous, current in kinds)))
+
+
+if __name__ == '__main__':
+    main()
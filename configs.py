@@ -14,12 +14,62 @@ BASE_PATH = '/v1'
 # Swagger specification file path
 SWAGGER_SPEC_PATH = 'spec/swagger.yaml'
 
+# Total records count cache (time to live in seconds)
+COUNT_CACHE_TTL = int(os.getenv('COUNT_CACHE_TTL') or 30)
+COUNT_CACHE_MAX_ENTRIES = int(os.getenv('COUNT_CACHE_MAX_ENTRIES') or 1024)
+
+# Cache of single employee and department details (time to live in seconds)
+ENTITY_CACHE_ENABLED = \
+    (os.getenv('ENTITY_CACHE_ENABLED') or 'true').lower() == 'true'
+ENTITY_CACHE_TTL = int(os.getenv('ENTITY_CACHE_TTL') or 300)
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv('ENTITY_CACHE_MAX_ENTRIES') or 10000)
+# Interval in seconds of checking table generation of in process cache, to
+# remove details written by other processes
+ENTITY_CACHE_CHECK_INTERVAL = \
+    float(os.getenv('ENTITY_CACHE_CHECK_INTERVAL') or 1)
+
+# In process map of department id to name used by employee reads (reloaded
+# on department writes and every refresh interval in seconds)
+DEPARTMENT_NAMES_REFRESH_INTERVAL = \
+    int(os.getenv('DEPARTMENT_NAMES_REFRESH_INTERVAL') or 60)
+
+# Bulk create (number of records inserted per transaction)
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE') or 500)
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS') or 10000)
+
+# Multi-get by ids (number of ids per IN query and per request)
+MULTI_GET_CHUNK_SIZE = int(os.getenv('MULTI_GET_CHUNK_SIZE') or 500)
+MULTI_GET_MAX_IDS = int(os.getenv('MULTI_GET_MAX_IDS') or 1000)
+
+# Batch request (number of operations run in single transaction)
+BATCH_MAX_OPERATIONS = int(os.getenv('BATCH_MAX_OPERATIONS') or 100)
+
+# Export (number of rows fetched from server side cursor per chunk)
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE') or 1000)
+
+# Import (number of records upserted per transaction)
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE') or 1000)
+IMPORT_MAX_REJECTS_IN_RESPONSE = \
+    int(os.getenv('IMPORT_MAX_REJECTS_IN_RESPONSE') or 1000)
+
+# Response compression by Accept-Encoding, in order of preference (br and zstd
+# are used when brotli and zstandard packages are installed). Responses
+# smaller than min size (bytes) are not compressed, streamed ones always are.
+COMPRESSION_ENABLED = \
+    (os.getenv('COMPRESSION_ENABLED') or 'true').lower() == 'true'
+COMPRESSION_ENCODINGS = \
+    (os.getenv('COMPRESSION_ENCODINGS') or 'br,zstd,gzip').split(',')
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE') or 1024)
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL') or 6)
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY') or 4)
+COMPRESSION_ZSTD_LEVEL = int(os.getenv('COMPRESSION_ZSTD_LEVEL') or 3)
+
 # Application environment
 '''
 Development: dev
 Testing: test
 '''
-ENVIRONMENT = 'dev'
+ENVIRONMENT = os.getenv('ENVIRONMENT') or 'dev'
 
 # Database credentials
 DB_CREDENTIALS = {
@@ -30,8 +80,32 @@ DB_CREDENTIALS = {
     'database': os.getenv('DB_NAME') or '{database}'
 }
 
+# Read replicas, comma separated host:port with credentials of primary.
+# Replica strategy: round_robin or least_connections. Replica lagging more
+# than max lag seconds is skipped until next check.
+DB_REPLICA_HOSTS = os.getenv('DB_REPLICA_HOSTS') or ''
+DB_REPLICA_STRATEGY = os.getenv('DB_REPLICA_STRATEGY') or 'round_robin'
+DB_REPLICA_MAX_LAG = int(os.getenv('DB_REPLICA_MAX_LAG') or 5)
+DB_REPLICA_LAG_CHECK_INTERVAL = \
+    int(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL') or 5)
+
+# Database connection pool, per worker process
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE') or 5)
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW') or 10)
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE') or 3600)
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT') or 30)
+DB_POOL_PRE_PING = (os.getenv('DB_POOL_PRE_PING') or 'true').lower() == 'true'
+# Requests run at once by ASGI serving, each on a thread, per worker process,
+# sized to the database connection pool (connections are held by the event
+# loop)
+ASGI_THREADS = int(os.getenv('ASGI_THREADS') or DB_POOL_SIZE + DB_MAX_OVERFLOW)
+# Log all SQL statements
+DB_ECHO = (os.getenv('DB_ECHO') or 'false').lower() == 'true'
+
 # Database connection uri
-DATABASE_URI = 'sqlite://'
+# SQLite database in test environment, in memory unless file uri is given.
+# Ex: sqlite:////tmp/flask_crud.db
+DATABASE_URI = os.getenv('SQLITE_URI') or 'sqlite://'
 if ENVIRONMENT == 'dev':
     DATABASE_URI = \
         'mysql+pymysql://{username}:{password}@{host}:{port}/{database}'.\
@@ -42,3 +116,18 @@ if ENVIRONMENT == 'dev':
             port=DB_CREDENTIALS.get('port'),
             database=DB_CREDENTIALS.get('database')
         )
+
+# Read replica connection uris
+REPLICA_DATABASE_URIS = []
+if ENVIRONMENT == 'dev':
+    for replica_host in filter(None, DB_REPLICA_HOSTS.split(',')):
+        replica_host, _, replica_port = replica_host.strip().partition(':')
+        REPLICA_DATABASE_URIS.append(
+            'mysql+pymysql://{username}:{password}@{host}:{port}/{database}'.
+            format(
+                username=DB_CREDENTIALS.get('username'),
+                password=DB_CREDENTIALS.get('password'),
+                host=replica_host,
+                port=replica_port or DB_CREDENTIALS.get('port'),
+                database=DB_CREDENTIALS.get('database')
+            ))
@@ -28,7 +28,9 @@ SET time_zone = "+00:00";
 
 CREATE TABLE `department` (
   `department_id` int(11) NOT NULL,
-  `name` varchar(255) NOT NULL
+  `name` varchar(255) NOT NULL,
+  `version` int(11) NOT NULL DEFAULT '1',
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 
 -- --------------------------------------------------------
@@ -44,7 +46,34 @@ CREATE TABLE `employee` (
   `date_of_joining` date NOT NULL,
   `gender` enum('male','female') NOT NULL DEFAULT 'male',
   `address` varchar(1000) DEFAULT NULL,
-  `salary` float(10,2) NOT NULL
+  `salary` float(10,2) NOT NULL,
+  `version` int(11) NOT NULL DEFAULT '1',
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `employee_stats`
+--
+
+CREATE TABLE `employee_stats` (
+  `department_id` int(11) NOT NULL,
+  `gender` enum('male','female') NOT NULL,
+  `headcount` int(11) NOT NULL,
+  `salary_sum` double NOT NULL,
+  `salary_min` float(10,2) NOT NULL,
+  `salary_max` float(10,2) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+--
+-- Table structure for table `table_generation`
+--
+
+CREATE TABLE `table_generation` (
+  `table_name` varchar(64) NOT NULL,
+  `generation` int(11) NOT NULL,
+  `updated_at` datetime NOT NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 
 --
@@ -55,14 +84,37 @@ CREATE TABLE `employee` (
 -- Indexes for table `department`
 --
 ALTER TABLE `department`
-  ADD PRIMARY KEY (`department_id`);
+  ADD PRIMARY KEY (`department_id`),
+  ADD KEY `ix_department_name` (`name`);
+ALTER TABLE `department`
+  ADD FULLTEXT KEY `ft_department_name` (`name`);
 
 --
 -- Indexes for table `employee`
 --
 ALTER TABLE `employee`
   ADD PRIMARY KEY (`employee_id`),
-  ADD KEY `department_id` (`department_id`);
+  ADD KEY `ix_employee_department_date` (`department_id`,`date_of_joining`),
+  ADD KEY `ix_employee_date_of_joining` (`date_of_joining`),
+  ADD KEY `ix_employee_salary` (`salary`),
+  ADD KEY `ix_employee_name` (`name`),
+  ADD KEY `ix_employee_address` (`address`(255));
+ALTER TABLE `employee`
+  ADD FULLTEXT KEY `ft_employee_name` (`name`);
+ALTER TABLE `employee`
+  ADD FULLTEXT KEY `ft_employee_address` (`address`);
+
+--
+-- Indexes for table `employee_stats`
+--
+ALTER TABLE `employee_stats`
+  ADD PRIMARY KEY (`department_id`,`gender`);
+
+--
+-- Indexes for table `table_generation`
+--
+ALTER TABLE `table_generation`
+  ADD PRIMARY KEY (`table_name`);
 
 --
 -- AUTO_INCREMENT for dumped tables
@@ -88,6 +140,12 @@ ALTER TABLE `employee`
 ALTER TABLE `employee`
   ADD CONSTRAINT `employee_ibfk_1` FOREIGN KEY (`department_id`) REFERENCES `department` (`department_id`);
 
+--
+-- Constraints for table `employee_stats`
+--
+ALTER TABLE `employee_stats`
+  ADD CONSTRAINT `employee_stats_ibfk_1` FOREIGN KEY (`department_id`) REFERENCES `department` (`department_id`) ON DELETE CASCADE;
+
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
 /*!40101 SET CHARACTER_SET_RESULTS=@OLD_CHARACTER_SET_RESULTS */;
 /*!40101 SET COLLATION_CONNECTION=@OLD_COLLATION_CONNECTION */;
@@ -0,0 +1,21 @@
+--
+-- Row versions and table generations for conditional GET (ETag and
+-- Last-Modified) of existing database.
+--
+
+ALTER TABLE `department`
+  ADD `version` int(11) NOT NULL DEFAULT '1',
+  ADD `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+ALTER TABLE `employee`
+  ADD `version` int(11) NOT NULL DEFAULT '1',
+  ADD `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+CREATE TABLE `table_generation` (
+  `table_name` varchar(64) NOT NULL,
+  `generation` int(11) NOT NULL,
+  `updated_at` datetime NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+ALTER TABLE `table_generation`
+  ADD PRIMARY KEY (`table_name`);
@@ -0,0 +1,17 @@
+--
+-- Indexes of prefix (B-tree) and full text (FULLTEXT) search on names and
+-- address of existing database. InnoDB creates one FULLTEXT index at a time.
+--
+
+ALTER TABLE `department`
+  ADD KEY `ix_department_name` (`name`);
+ALTER TABLE `department`
+  ADD FULLTEXT KEY `ft_department_name` (`name`);
+
+ALTER TABLE `employee`
+  ADD KEY `ix_employee_name` (`name`),
+  ADD KEY `ix_employee_address` (`address`(255));
+ALTER TABLE `employee`
+  ADD FULLTEXT KEY `ft_employee_name` (`name`);
+ALTER TABLE `employee`
+  ADD FULLTEXT KEY `ft_employee_address` (`address`);
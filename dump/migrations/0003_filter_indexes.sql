@@ -0,0 +1,13 @@
+--
+-- Indexes of range and multi-value search filters of employees: department
+-- with date of joining, date of joining and salary. Department and date index
+-- also serves the foreign key, so single column department index is dropped.
+--
+
+ALTER TABLE `employee`
+  ADD KEY `ix_employee_department_date` (`department_id`,`date_of_joining`),
+  ADD KEY `ix_employee_date_of_joining` (`date_of_joining`),
+  ADD KEY `ix_employee_salary` (`salary`);
+
+ALTER TABLE `employee`
+  DROP KEY `department_id`;
@@ -0,0 +1,19 @@
+--
+-- Summary table of employee statistics by department and gender. Fill it
+-- from existing employees by running `python runstats.py` after migration.
+--
+
+CREATE TABLE `employee_stats` (
+  `department_id` int(11) NOT NULL,
+  `gender` enum('male','female') NOT NULL,
+  `headcount` int(11) NOT NULL,
+  `salary_sum` double NOT NULL,
+  `salary_min` float(10,2) NOT NULL,
+  `salary_max` float(10,2) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+ALTER TABLE `employee_stats`
+  ADD PRIMARY KEY (`department_id`,`gender`);
+
+ALTER TABLE `employee_stats`
+  ADD CONSTRAINT `employee_stats_ibfk_1` FOREIGN KEY (`department_id`) REFERENCES `department` (`department_id`) ON DELETE CASCADE;
@@ -1,12 +1,176 @@
 """Database connection."""
+import threading
+import time
 import configs
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from functools import wraps
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import Session as BaseSession, scoped_session, \
+    sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.dml import UpdateBase
+from src import dialect
+
+
+def engine_options(database_uri):
+    """Returns dialect specific options to create engine.
+    :param database_uri: str - Database connection uri.
+    :return: dict
+    """
+    url = make_url(database_uri)
+    if url.get_backend_name() != 'sqlite':
+        return {
+            'pool_size': configs.DB_POOL_SIZE,
+            'max_overflow': configs.DB_MAX_OVERFLOW,
+            'pool_recycle': configs.DB_POOL_RECYCLE,
+            'pool_timeout': configs.DB_POOL_TIMEOUT,
+            'pool_pre_ping': configs.DB_POOL_PRE_PING
+        }
+    options = {'connect_args': {'check_same_thread': False}}
+    # Share single connection, as each connection to in memory database
+    # opens new empty database.
+    if url.database in (None, '', ':memory:'):
+        options['poolclass'] = StaticPool
+    return options
+
+
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """Enforce foreign keys (ON DELETE CASCADE) on SQLite connection.
+    :param dbapi_connection: obj - DBAPI connection.
+    :param connection_record: obj - Pool connection record.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.close()
+
+
+class ReplicaRouter(object):
+    """Select read replica by round robin or least connections, skipping the
+    replica which lags behind primary."""
+
+    def __init__(self, engines, strategy, max_lag, lag_check_interval):
+        self.engines = engines
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.health = {}
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def engine(self):
+        """Returns engine of the selected read replica.
+        :return: mixed - Engine or None if no replica is healthy.
+        """
+        engines = [engine for engine in self.engines
+                   if self.is_healthy(engine)]
+        if not engines:
+            return None
+        if self.strategy == 'least_connections':
+            return min(engines, key=checked_out_connections)
+        with self.lock:
+            self.counter += 1
+            return engines[self.counter % len(engines)]
+
+    def is_healthy(self, engine):
+        """Check replication lag of replica, at most once per check interval.
+        :param engine: obj - Replica engine.
+        :return: boolean
+        """
+        checked_at, healthy = self.health.get(engine, (0, False))
+        if time.time() - checked_at < self.lag_check_interval:
+            return healthy
+        try:
+            connection = engine.connect()
+            try:
+                lag = dialect.get_engine_dialect(engine).replica_lag(
+                    connection)
+            finally:
+                connection.close()
+            healthy = lag is not None and lag <= self.max_lag
+        except (exc.SQLAlchemyError, exc.DBAPIError):
+            healthy = False
+        self.health[engine] = (time.time(), healthy)
+        return healthy
+
+
+def checked_out_connections(engine):
+    """Returns number of connections of engine in use.
+    :param engine: obj - Database engine.
+    :return: int
+    """
+    checkedout = getattr(engine.pool, 'checkedout', None)
+    return checkedout() if checkedout else 0
+
+
+class RoutingSession(BaseSession):
+    """Session which reads from read replica when enabled by read_replica(),
+    until it writes. Writes, and all reads after them in the same request,
+    are run on primary."""
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info['wrote'] = True
+        if replica_router is None or not self.info.get('replica') \
+                or self.info.get('wrote'):
+            return engine
+        # Stay on one replica during request to read consistent data.
+        if 'replica_engine' not in self.info:
+            self.info['replica_engine'] = replica_router.engine() or engine
+        return self.info['replica_engine']
+
+
+def read_replica(func):
+    """Wrapper function to route reads of function to read replica.
+    :param func: function - Function which only reads.
+    :return: Wrapper function response.
+    """
+    @wraps(func)
+    def read_from_replica(*args, **kwargs):
+        session = Session()
+        replica = session.info.get('replica')
+        session.info['replica'] = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            session.info['replica'] = replica
+    return read_from_replica
+
+
+def read_primary(func):
+    """Wrapper function to route reads of function to primary, also when
+    called by function reading from read replica, for reads which must not
+    lag behind writes (like, reads filling cache).
+    :param func: function - Function which only reads.
+    :return: Wrapper function response.
+    """
+    @wraps(func)
+    def read_from_primary(*args, **kwargs):
+        session = Session()
+        replica = session.info.get('replica')
+        session.info['replica'] = False
+        try:
+            return func(*args, **kwargs)
+        finally:
+            session.info['replica'] = replica
+    return read_from_primary
 
 
 # Create engine, session and base declarative
-engine = create_engine(configs.DATABASE_URI, echo=True)
-Session = sessionmaker(bind=engine)
+engine = create_engine(
+    configs.DATABASE_URI, echo=configs.DB_ECHO,
+    **engine_options(configs.DATABASE_URI))
+if engine.dialect.name == 'sqlite':
+    event.listen(engine, 'connect', enable_sqlite_foreign_keys)
+replica_router = None
+if configs.REPLICA_DATABASE_URIS:
+    replica_router = ReplicaRouter(
+        [create_engine(uri, echo=configs.DB_ECHO, **engine_options(uri))
+         for uri in configs.REPLICA_DATABASE_URIS],
+        configs.DB_REPLICA_STRATEGY, configs.DB_REPLICA_MAX_LAG,
+        configs.DB_REPLICA_LAG_CHECK_INTERVAL)
+# Session registry, each thread (request) works with its own session which is
+# removed at the end of request.
+Session = scoped_session(sessionmaker(bind=engine, class_=RoutingSession))
 Base = declarative_base()
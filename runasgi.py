@@ -0,0 +1,17 @@
+"""ASGI entry point, serving the api on event loop of ASGI server.
+
+Usage: uvicorn runasgi:app --host 0.0.0.0 --port 5000
+   or: python runasgi.py (with uvicorn installed)
+"""
+import configs
+
+from src import asgi
+from src.api import app as wsgi_app
+
+
+app = asgi.ASGIApplication(wsgi_app, configs.ASGI_THREADS)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
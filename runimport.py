@@ -0,0 +1,58 @@
+"""Import employees or departments from CSV or NDJSON file.
+
+Usage: python runimport.py employee employees.csv --batch-size 5000
+"""
+import argparse
+import json
+import sys
+
+import configs
+import mysql_connector
+
+from src import constants, dialect, importer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Import employees or departments from CSV or NDJSON file.')
+    parser.add_argument('model', choices=sorted(importer.IMPORTERS))
+    parser.add_argument('path', help='CSV or NDJSON file to import.')
+    parser.add_argument(
+        '--format', choices=['csv', 'ndjson'],
+        help='File format, detected from file extension by default.')
+    parser.add_argument(
+        '--batch-size', type=int, default=configs.IMPORT_BATCH_SIZE,
+        help='Number of records upserted per transaction.')
+    parser.add_argument(
+        '--rejects', help='NDJSON file to write rejected records, '
+                          '<path>.rejects.ndjson by default.')
+    args = parser.parse_args()
+    # Create tables of SQLite database used in test environment, as the API
+    # does.
+    if configs.ENVIRONMENT != 'dev':
+        mysql_connector.Base.metadata.create_all(mysql_connector.engine)
+        dialect.get_engine_dialect(
+            mysql_connector.engine).create_search_indexes(
+                mysql_connector.engine, mysql_connector.Base.metadata,
+                constants.TEXT_SEARCH_FIELDS)
+    import_format = args.format or (
+        'csv' if args.path.lower().endswith('.csv') else 'ndjson')
+    rejects_path = args.rejects or args.path + '.rejects.ndjson'
+    with open(args.path, encoding='utf-8', newline='') as lines, \
+            open(rejects_path, 'w', encoding='utf-8') as rejects:
+
+        def reject(line_number, record, errors):
+            rejects.write(json.dumps(
+                {'line': line_number, 'record': record, 'errors': errors}))
+            rejects.write('\n')
+
+        summary = importer.import_records(
+            importer.read_records(lines, import_format), args.model,
+            args.batch_size, reject)
+    summary['rejects'] = rejects_path
+    print(json.dumps(summary))
+    return 1 if summary['total_rejected'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
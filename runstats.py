@@ -0,0 +1,38 @@
+"""Rebuild summary table of employee statistics from employees, after the
+table is created or employees are written outside of the application.
+
+Usage: python runstats.py --department-id 1 --department-id 2
+"""
+import argparse
+import json
+import sys
+
+import mysql_connector
+
+from src.logic.models import employee, generation
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rebuild summary table of employee statistics.')
+    parser.add_argument(
+        '--department-id', type=int, action='append',
+        help='Department to rebuild, all departments by default.')
+    args = parser.parse_args()
+    session = mysql_connector.Session
+    try:
+        groups = employee.refresh_stats(args.department_id)
+        # Versions of statistics responses change with the rebuild.
+        generation.bump(employee.Employee.__tablename__)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.remove()
+    print(json.dumps({'groups': groups}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
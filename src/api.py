@@ -2,13 +2,21 @@
    1) Swagger UI
    2) API routes
 """
+import io
+import json
+
+from functools import wraps
+
 import configs
+import mysql_connector
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from oto import response
 from oto.adaptors.flask import flaskify
 from flasgger import Swagger
-from src import constants, validator
+from werkzeug.http import is_resource_modified
+from src import cache, compression, constants, dialect, export, \
+    serializer, validator
 from src.logic import logic
 from flask_cors import CORS
 
@@ -17,6 +25,14 @@ from flask_cors import CORS
 app = Flask(configs.API_NAME)
 CORS(app)
 
+# Create tables of SQLite database used in test environment, with indexes of
+# text search.
+if configs.ENVIRONMENT != 'dev':
+    mysql_connector.Base.metadata.create_all(mysql_connector.engine)
+    dialect.get_engine_dialect(mysql_connector.engine).create_search_indexes(
+        mysql_connector.engine, mysql_connector.Base.metadata,
+        constants.TEXT_SEARCH_FIELDS)
+
 # Swagger UI integration
 app.config['SWAGGER'] = {
    'title': 'Flask Api - CRUD',
@@ -25,6 +41,61 @@ app.config['SWAGGER'] = {
 Swagger(app, template_file=configs.SWAGGER_SPEC_PATH)
 
 
+@app.teardown_appcontext
+def remove_session(exception=None):
+    """Rollback the database session on error and remove it at the end of
+    request, so no transaction or loaded object outlives the request.
+    :param exception: Unhandled exception of request.
+    """
+    if exception is not None:
+        mysql_connector.Session.rollback()
+    mysql_connector.Session.remove()
+
+
+def conditional(version):
+    """Wrapper function to answer conditional GET by 304 Not Modified, when
+    If-None-Match or If-Modified-Since matches the version of resource,
+    before the resource is fetched. Entity tag and last modified date are set
+    on 200 OK and 304 Not Modified response.
+    :param version: function - Returns (entity tag, last modified) of the
+    resource for route arguments, or None if not known.
+    :return: Wrapper function.
+    """
+    def decorator(func):
+        @wraps(func)
+        def conditional_response(*args, **kwargs):
+            resource_version = version(*args, **kwargs)
+            if resource_version is None:
+                return func(*args, **kwargs)
+            etag, last_modified = resource_version
+            if is_resource_modified(
+                    request.environ, etag=etag, last_modified=last_modified):
+                result = func(*args, **kwargs)
+                if result.status_code != 200:
+                    return result
+            else:
+                result = Response(status=304)
+            # Weak, not strong validator: tag versions the details, while
+            # the bytes of body differ by negotiated compression (gzip,
+            # deflate or none), which a strong tag would have to tell apart.
+            # Weak comparison of If-None-Match still answers 304.
+            result.set_etag(etag, weak=True)
+            if last_modified is not None:
+                result.last_modified = last_modified
+            return result
+        return conditional_response
+    return decorator
+
+
+@app.after_request
+def compress_response(result):
+    """Compress the response by Accept-Encoding of request.
+    :param result: obj - Response.
+    :return: Compressed response.
+    """
+    return compression.compress_response(result, request.accept_encodings)
+
+
 @app.errorhandler(500)
 def internal_error(error):
     return response.create_fatal_response(
@@ -40,26 +111,75 @@ def health():
     return jsonify({'status': 'ok'})
 
 
+@app.route(configs.BASE_PATH + '/cache/stats', methods=['GET'])
+@validator.authorization(request)
+def cache_stats():
+    """Get the hit/miss statistics of employee and department cache.
+    :return: Cache statistics.
+    """
+    return jsonify(cache.entity_cache.stats())
+
+
 @app.route(
     configs.BASE_PATH + '/department/<department_id>', methods=['GET'])
 @validator.authorization(request)
+@conditional(lambda department_id: logic.get_department_version(
+    department_id, request.args.get('fields') or None,
+    request.args.get('expand') or None,
+    request.args.get('employees_limit') or None))
 def get_department(department_id):
-    """Get the department details against the given department id.
+    """Get the department details against the given department id, with
+    employees and / or employee count of department when expanded.
     :param department_id: str - Unique identification of department.
     :return: Department details against the given department id.
     """
-    return flaskify(logic.get_department(department_id))
+    return flaskify(logic.get_department(
+        department_id, request.args.get('fields') or None,
+        request.args.get('expand') or None,
+        request.args.get('employees_limit') or None),
+        encoder=serializer.JSONEncoder)
+
+
+@app.route(
+    configs.BASE_PATH + '/department/<department_id>/stats', methods=['GET'])
+@validator.authorization(request)
+@conditional(lambda department_id: logic.get_list_version(
+    'stats', [('department_id', department_id)]))
+def get_department_stats(department_id):
+    """Get the headcount and salary statistics of employees of the given
+    department.
+    :param department_id: str - Unique identification of department.
+    :return: Employee statistics of department.
+    """
+    return flaskify(logic.get_department_stats(department_id))
+
+
+@app.route(
+    configs.BASE_PATH + '/stats/employees', methods=['GET'])
+@validator.authorization(request)
+@conditional(lambda: logic.get_list_version(
+    'stats', request.args.items(multi=True)))
+def get_employee_stats():
+    """Get the headcount and salary statistics of employees grouped by
+    department and / or gender.
+    :return: Employee statistics of each group.
+    """
+    return flaskify(logic.get_employee_stats(
+        request.args.get('group_by') or None))
 
 
 @app.route(
     configs.BASE_PATH + '/employee/<employee_id>', methods=['GET'])
 @validator.authorization(request)
+@conditional(lambda employee_id: logic.get_employee_version(
+    employee_id, request.args.get('fields') or None))
 def get_employee(employee_id):
     """Get the employee details against the given employee id.
     :param employee_id: str - Unique identification of department.
     :return: Employee details against the given employee id.
     """
-    return flaskify(logic.get_employee(employee_id))
+    return flaskify(logic.get_employee(
+        employee_id, request.args.get('fields') or None))
 
 
 @app.route(
@@ -106,6 +226,60 @@ def post_employee():
     return flaskify(logic.post_employee(request.get_json()))
 
 
+@app.route(
+    configs.BASE_PATH + '/department/bulk', methods=['POST'])
+@validator.authorization(request)
+def post_departments():
+    """Add the departments detail in bulk.
+    :param: request json - JSON array or NDJSON of departments.
+    :return: Status of each department of request.
+    """
+    return flaskify(logic.post_departments(
+        bulk_payload(),
+        request.args.get('chunk_size') or configs.BULK_CHUNK_SIZE))
+
+
+@app.route(
+    configs.BASE_PATH + '/employee/bulk', methods=['POST'])
+@validator.authorization(request)
+def post_employees():
+    """Add the employees detail in bulk.
+    :param: request json - JSON array or NDJSON of employees.
+    :return: Status of each employee of request.
+    """
+    return flaskify(logic.post_employees(
+        bulk_payload(),
+        request.args.get('chunk_size') or configs.BULK_CHUNK_SIZE))
+
+
+def bulk_payload():
+    """Returns items of bulk request given as JSON array or NDJSON body.
+    Invalid NDJSON line is kept as text to report against its index.
+    :return: list
+    """
+    if request.mimetype != 'application/x-ndjson':
+        return request.get_json(silent=True)
+    items = []
+    for line in request.get_data(as_text=True).splitlines():
+        if line.strip():
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(line)
+    return items
+
+
+@app.route(
+    configs.BASE_PATH + '/batch', methods=['POST'])
+@validator.authorization(request)
+def post_batch():
+    """Run the operations of batch in single transaction.
+    :param: request json - Operations and mode of batch.
+    :return: Result of each operation and whether batch is committed.
+    """
+    return flaskify(logic.post_batch(request.get_json(silent=True)))
+
+
 @app.route(
     configs.BASE_PATH + '/department/<department_id>', methods=['PUT'])
 @validator.authorization(request)
@@ -128,11 +302,72 @@ def put_employee(employee_id):
     return flaskify(logic.put_employee(employee_id, request.get_json()))
 
 
+@app.route(
+    configs.BASE_PATH + '/department/<department_id>', methods=['PATCH'])
+@validator.authorization(request)
+def patch_department(department_id):
+    """Update the given fields of the department against the given department
+    id.
+    :param department_id: str - Unique identification of department.
+    :return: Success message on update of department details.
+    """
+    return flaskify(logic.patch_department(
+        department_id, request.get_json(silent=True)))
+
+
+@app.route(
+    configs.BASE_PATH + '/employee/<employee_id>', methods=['PATCH'])
+@validator.authorization(request)
+def patch_employee(employee_id):
+    """Update the given fields of the employee against the given employee id.
+    :param employee_id: str - Unique identification of employee.
+    :return: Success message on update of employee details.
+    """
+    return flaskify(logic.patch_employee(
+        employee_id, request.get_json(silent=True)))
+
+
+@app.route(
+    configs.BASE_PATH + '/employee', methods=['PATCH'])
+@validator.authorization(request)
+def patch_employees():
+    """Update the given fields of employees selected by ids or search filter.
+    :param: request json - Employee fields to update.
+    :return: Number of updated employees.
+    """
+    return flaskify(logic.patch_employees(
+        bulk_write_filter_data(), request.get_json(silent=True)))
+
+
+@app.route(
+    configs.BASE_PATH + '/employee', methods=['DELETE'])
+@validator.authorization(request)
+def delete_employees():
+    """Delete the employees selected by ids or search filter.
+    :return: Number of deleted employees.
+    """
+    return flaskify(logic.delete_employees(bulk_write_filter_data()))
+
+
+def bulk_write_filter_data():
+    """Returns selection of records for bulk PATCH and DELETE request.
+    :return: dict
+    """
+    return {
+        'ids': request.args.get('ids') or None,
+        'search_by': request.args.get('search_by') or None,
+        'search_for': request.args.get('search_for') or None
+    }
+
+
 @app.route(
     configs.BASE_PATH + '/department', methods=['GET'])
 @validator.authorization(request)
+@conditional(lambda: logic.get_list_version(
+    'expanded_department' if request.args.get('expand') else 'department',
+    request.args.items(multi=True)))
 def get_departments():
-    """Get the departments detail.
+    """Get the departments detail, or the departments of the given ids.
     :return: Departments detail.
     """
     filter_data = {
@@ -142,16 +377,27 @@ def get_departments():
         'sort_by': request.args.get('sort_by') or None,
         'order_by': request.args.get('order_by') or None,
         'search_by': request.args.get('search_by') or None,
-        'search_for': request.args.get('search_for') or None
+        'search_for': request.args.get('search_for') or None,
+        'search_mode': request.args.get('search_mode') or None,
+        'count': request.args.get('count') or None,
+        'fields': request.args.get('fields') or None,
+        # Ids select the records in their order, instead of filter.
+        'ids': request.args.get('ids') or None,
+        'expand': request.args.get('expand') or None,
+        'employees_limit': request.args.get('employees_limit') or None,
+        # Empty cursor requests first page of keyset pagination.
+        'cursor': request.args.get('cursor')
     }
-    return flaskify(logic.get_departments(filter_data))
+    return flaskify_rows(logic.get_departments(filter_data))
 
 
 @app.route(
     configs.BASE_PATH + '/employee', methods=['GET'])
 @validator.authorization(request)
+@conditional(lambda: logic.get_list_version(
+    'employee', request.args.items(multi=True)))
 def get_employees():
-    """Get the employees detail.
+    """Get the employees detail, or the employees of the given ids.
     :return: Employees detail.
     """
     filter_data = {
@@ -161,6 +407,112 @@ def get_employees():
         'sort_by': request.args.get('sort_by') or None,
         'order_by': request.args.get('order_by') or None,
         'search_by': request.args.get('search_by') or None,
-        'search_for': request.args.get('search_for') or None
+        'search_for': request.args.get('search_for') or None,
+        'search_mode': request.args.get('search_mode') or None,
+        'count': request.args.get('count') or None,
+        'fields': request.args.get('fields') or None,
+        # Ids select the records in their order, instead of filter.
+        'ids': request.args.get('ids') or None,
+        # Empty cursor requests first page of keyset pagination.
+        'cursor': request.args.get('cursor')
+    }
+    return flaskify_rows(logic.get_employees(filter_data))
+
+
+def flaskify_rows(result):
+    """Format the response same as flaskify(), encoding rows of list by their
+    compiled encoder.
+    :param result: obj - Response.
+    :return: Flask response.
+    """
+    data = result.errors or result.message
+    if not isinstance(data, dict):
+        return flaskify(result)
+    return Response(serializer.dumps(data), status=result.status,
+                    mimetype='application/json')
+
+
+@app.route(
+    configs.BASE_PATH + '/department/export', methods=['GET'])
+@validator.authorization(request)
+def export_departments():
+    """Export the departments detail as NDJSON or CSV stream.
+    :return: Departments detail.
+    """
+    filter_data = export_filter_data()
+    result = logic.export_departments(filter_data)
+    if not result:
+        return flaskify(result)
+    return Response(
+        result.message, mimetype=export.MIMETYPES[filter_data.get('format')])
+
+
+@app.route(
+    configs.BASE_PATH + '/employee/export', methods=['GET'])
+@validator.authorization(request)
+def export_employees():
+    """Export the employees detail as NDJSON or CSV stream.
+    :return: Employees detail.
+    """
+    filter_data = export_filter_data()
+    result = logic.export_employees(filter_data)
+    if not result:
+        return flaskify(result)
+    return Response(
+        result.message, mimetype=export.MIMETYPES[filter_data.get('format')])
+
+
+@app.route(
+    configs.BASE_PATH + '/department/import', methods=['POST'])
+@validator.authorization(request)
+def import_departments():
+    """Import the departments detail from CSV or NDJSON body.
+    :return: Import summary with rejected records.
+    """
+    return flaskify(logic.import_records(
+        import_lines(), 'department', import_format(),
+        request.args.get('batch_size') or configs.IMPORT_BATCH_SIZE))
+
+
+@app.route(
+    configs.BASE_PATH + '/employee/import', methods=['POST'])
+@validator.authorization(request)
+def import_employees():
+    """Import the employees detail from CSV or NDJSON body.
+    :return: Import summary with rejected records.
+    """
+    return flaskify(logic.import_records(
+        import_lines(), 'employee', import_format(),
+        request.args.get('batch_size') or configs.IMPORT_BATCH_SIZE))
+
+
+def import_lines():
+    """Returns lines of request body read incrementally from input stream.
+    :return: iterable
+    """
+    return io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+
+
+def import_format():
+    """Returns format of import from format parameter or content type.
+    :return: str
+    """
+    if request.args.get('format'):
+        return request.args.get('format')
+    if request.mimetype == 'text/csv':
+        return 'csv'
+    return 'ndjson'
+
+
+def export_filter_data():
+    """Returns data for filter the export.
+    :return: dict
+    """
+    return {
+        'format': request.args.get('format') or 'ndjson',
+        'sort_by': request.args.get('sort_by') or None,
+        'order_by': request.args.get('order_by') or None,
+        'search_by': request.args.get('search_by') or None,
+        'search_for': request.args.get('search_for') or None,
+        'search_mode': request.args.get('search_mode') or None
     }
-    return flaskify(logic.get_employees(filter_data))
@@ -0,0 +1,115 @@
+"""ASGI serving of the WSGI application, by WsgiToAsgi of asgiref.
+Connections are held by the event loop of ASGI server, so idle and slow
+clients cost no thread:
+   1) Request body - Received by the event loop (spooled to file when
+      large) before the request takes a thread.
+   2) Request - At most `threads` requests, sized to the database connection
+      pool, run at once, each on a thread of its own for the blocking
+      database calls of the models. Waiting requests hold no thread.
+   3) Response body - Sent chunk by chunk, the thread waits until each chunk
+      is sent, so streamed exports follow the speed of client.
+Whole request, including streamed response, runs on one thread as the
+database session is scoped to the thread.
+"""
+import asyncio
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+
+class ASGIApplication(WsgiToAsgi):
+    """ASGI application running WSGI application, at most the given number
+    of requests at once."""
+
+    def __init__(self, wsgi_app, threads):
+        super(ASGIApplication, self).__init__(closing(wsgi_app))
+        self.threads = threads
+        self.semaphore = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(
+                'Unsupported ASGI scope type {type}'.format(
+                    type=scope['type']))
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.threads)
+        await WSGIRequest(
+            self.wsgi_application, self.semaphore,
+            self.duplicate_header_limit)(scope, receive, send)
+
+
+class WSGIRequest(WsgiToAsgiInstance):
+    """WSGI request of ASGI connection, run once its body is received and
+    one of the request slots is free, with write callable of WSGI (PEP 3333)
+    returned by start_response."""
+
+    def __init__(self, wsgi_application, semaphore, duplicate_header_limit):
+        super(WSGIRequest, self).__init__(
+            wsgi_application, duplicate_header_limit)
+        self.semaphore = semaphore
+
+    def build_environ(self, scope, body):
+        environ = super(WSGIRequest, self).build_environ(scope, body)
+        # Body is received whole, also without Content-Length (chunked).
+        environ['wsgi.input_terminated'] = True
+        return environ
+
+    async def run_wsgi_app(self, body):
+        async with self.semaphore:
+            # Thread of its own, instead of the single thread which thread
+            # sensitive code of asgiref shares by default.
+            async with ThreadSensitiveContext():
+                await super(WSGIRequest, self).run_wsgi_app(body)
+
+    def start_response(self, status, response_headers, exc_info=None):
+        super(WSGIRequest, self).start_response(
+            status, response_headers, exc_info)
+        return self.write
+
+    def write(self, data):
+        """Send the data before the chunks of response body.
+        :param data: bytes
+        """
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        if data:
+            self.sync_send({
+                'type': 'http.response.body', 'body': data,
+                'more_body': True})
+
+
+def closing(wsgi_app):
+    """Returns WSGI application closing the response of the application once
+    it is sent (like, streamed export holding database connection), which
+    WsgiToAsgi leaves to garbage collection.
+    :param wsgi_app: function - WSGI application.
+    :return: function
+    """
+    def application(environ, start_response):
+        result = wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                yield chunk
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+    return application
+
+
+async def lifespan(receive, send):
+    """Complete startup and shutdown of ASGI server, nothing to prepare as
+    the application connects to database on first request.
+    :param receive: coroutine function - Receive ASGI event.
+    :param send: coroutine function - Send ASGI event.
+    """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
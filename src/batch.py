@@ -0,0 +1,233 @@
+"""Batch of operations run in single database transaction. Each operation
+runs in its own savepoint, so commit and rollback of operation by the model
+release or roll back its savepoint only, and the batch commits operations
+together.
+   1) all_or_nothing - Failed operation rolls back the whole batch.
+   2) best_effort - Failed operation is rolled back alone.
+Operation with ref names the id it creates, which later operations use as
+$<ref> in path or as value of body field.
+   Ex: {"method": "POST", "path": "/department", "body": {...}, "ref": "it"}
+       {"method": "POST", "path": "/employee",
+        "body": {"department_id": "$it", ...}}
+"""
+import re
+
+import configs
+import mysql_connector
+
+from oto import response
+from sqlalchemy import exc
+from src import cache, constants, counting, dialect
+from src.logic.models import department
+
+
+# Session of current request
+session = mysql_connector.Session
+
+# Reference to id created by earlier operation
+REFERENCE = re.compile(r'^\$([A-Za-z_][A-Za-z0-9_]*)$')
+# Name of reference of operation
+REFERENCE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+# Status of operation not run, as earlier operation failed
+STATUS_FAILED_DEPENDENCY = 424
+
+
+def run_operations(operations, mode, handlers):
+    """Run the operations of batch request in single transaction.
+    :param operations: list - Operations (method, path, body and ref).
+    :param mode: str - all_or_nothing or best_effort.
+    :param handlers: dict - Function of each (method, model, with id), called
+    with record id and body of operation.
+    :return: Result of each operation and whether batch is committed.
+    """
+    refs = {}
+    results = []
+    failed_index = None
+    try:
+        # Operations read and write on primary, in the transaction, and do
+        # not fill the shared caches with records not committed yet.
+        session.info['wrote'] = True
+        session.info['batch'] = True
+        dialect.get_dialect(session).begin_transaction(session)
+        for index, operation in enumerate(operations):
+            if failed_index is not None and mode == 'all_or_nothing':
+                results.append(operation_result(
+                    index, response.create_error_response(
+                        code=constants.ERROR_CODE_NOT_RUN,
+                        message=constants.ERROR_MESSAGE_BATCH_NOT_RUN.format(
+                            index=failed_index),
+                        status=STATUS_FAILED_DEPENDENCY)))
+                continue
+            result = run_operation(operation, handlers, refs)
+            if not result:
+                failed_index = index
+            elif operation.get('ref'):
+                refs[operation.get('ref')] = created_id(operation, result)
+            results.append(operation_result(index, result))
+        committed = failed_index is None or mode == 'best_effort'
+        if committed:
+            session.commit()
+        else:
+            session.rollback()
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        session.rollback()
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+    finally:
+        session.info.pop('batch', None)
+        invalidate()
+    return response.Response({
+        'mode': mode,
+        'committed': committed,
+        'results': results
+    })
+
+
+def run_operation(operation, handlers, refs):
+    """Run the operation in savepoint, rolled back when operation fails.
+    :param operation: dict - Method, path, body and ref of operation.
+    :param handlers: dict - Function of each (method, model, with id).
+    :param refs: dict - Ids created by earlier operations by ref name.
+    :return: Response of operation.
+    :raises: sqlalchemy exceptions.
+    """
+    validate = validate_operation(operation, refs)
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    model, record_id = parse_path(resolve(operation.get('path'), refs))
+    handler = handlers.get(
+        (operation.get('method').upper(), model, record_id is not None))
+    if handler is None:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST,
+            message=constants.ERROR_MESSAGE_BATCH_OPERATION.format(
+                method=operation.get('method'), path=operation.get('path')))
+    body = operation.get('body')
+    if isinstance(body, dict):
+        body = {key: resolve(value, refs) for key, value in body.items()}
+    savepoint = session.begin_nested()
+    try:
+        result = handler(record_id, body)
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        result = response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+    # Model commits or rolls back the savepoint, unless it failed before
+    # any write.
+    if savepoint.is_active:
+        if result:
+            savepoint.commit()
+        else:
+            savepoint.rollback()
+    return result
+
+
+def validate_operation(operation, refs):
+    """Validate operation of batch request.
+    :param operation: dict
+    :param refs: dict - Ids created by earlier operations by ref name.
+    :return: list
+    """
+    if not isinstance(operation, dict):
+        return [constants.ERROR_MESSAGE_BATCH_ITEM]
+    validation_message = []
+    if not isinstance(operation.get('method'), str) \
+            or not isinstance(operation.get('path'), str):
+        validation_message.append({'missing fields': ['method', 'path']})
+    if operation.get('body') is not None \
+            and not isinstance(operation.get('body'), dict):
+        validation_message.append(constants.ERROR_MESSAGE_BATCH_ITEM)
+    if operation.get('ref') is not None and (
+            not isinstance(operation.get('ref'), str)
+            or not REFERENCE_NAME.match(operation.get('ref'))):
+        validation_message.append({
+            'invalid ref value': 'ref should be letters, digits and _'})
+    unknown = [
+        name for value in [operation.get('path')] + list(
+            operation.get('body').values()
+            if isinstance(operation.get('body'), dict) else [])
+        for name in references(value) if name not in refs]
+    if unknown:
+        validation_message.append({'unknown references': unknown})
+    return validation_message
+
+
+def references(value):
+    """Returns names of references of path or body value.
+    :param value: mixed
+    :return: list
+    """
+    if not isinstance(value, str):
+        return []
+    return [match.group(1) for match in map(
+        REFERENCE.match, value.split('/')) if match]
+
+
+def resolve(value, refs):
+    """Returns value with references replaced by the referenced ids, in each
+    segment of path or as whole body value.
+    :param value: mixed - Path or body value.
+    :param refs: dict - Ids created by earlier operations by ref name.
+    :return: mixed
+    """
+    if not isinstance(value, str) or '$' not in value:
+        return value
+    match = REFERENCE.match(value)
+    if match:
+        return refs[match.group(1)]
+    return '/'.join(
+        str(resolve(segment, refs)) for segment in value.split('/'))
+
+
+def parse_path(path):
+    """Returns model and record id of operation path, with or without base
+    path.
+    :param path: str - Like /employee/12.
+    :return: tuple - (model, record id or None)
+    """
+    if path.startswith(configs.BASE_PATH + '/'):
+        path = path[len(configs.BASE_PATH):]
+    segments = path.strip('/').split('/')
+    if len(segments) == 1:
+        return segments[0], None
+    if len(segments) == 2:
+        return segments[0], segments[1]
+    return None, None
+
+
+def created_id(operation, result):
+    """Returns id of the record created by operation, for reference of later
+    operations.
+    :param operation: dict
+    :param result: obj - Response of operation.
+    :return: mixed - Record id or None if operation creates no record.
+    """
+    model, record_id = parse_path(operation.get('path'))
+    if record_id is not None or not isinstance(result.message, dict):
+        return record_id
+    return result.message.get(model, {}).get('{model}_id'.format(
+        model=model))
+
+
+def operation_result(index, result):
+    """Returns result of operation of batch response.
+    :param index: int - Index of operation in request.
+    :param result: obj - Response of operation.
+    :return: dict
+    """
+    return {
+        'index': index,
+        'status': result.status,
+        'response': result.errors or result.message
+    }
+
+
+def invalidate():
+    """Invalidate counts, caches and department names of the records which
+    operations wrote, after the batch is committed or rolled back, as
+    operations updated them before the transaction ended.
+    """
+    counting.invalidate('department', 'employee')
+    cache.entity_cache.invalidate_all('department')
+    cache.entity_cache.invalidate_all('employee')
+    department.department_names.invalidate()
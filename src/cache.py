@@ -0,0 +1,288 @@
+"""Read-through cache of single employee and department details.
+   1) LRUCache - In process cache with time to live (default).
+   2) CacheBackend - Interface to plug shared cache (like, Redis) by
+      configure().
+Details are filled only from reads of primary, as replica may lag behind the
+write which invalidated them. Fill started before an invalidation of its
+record is rejected, so details read before a write are not cached after its
+invalidation.
+"""
+import calendar
+import datetime
+import threading
+import time
+
+from collections import OrderedDict
+
+import configs
+
+# Number of invalidation counters, keys of records share counter by hash
+INVALIDATION_STRIPES = 1024
+# Maximum number of generations of a model written by this process, kept
+# until the next check of the generation
+MAX_WRITTEN_GENERATIONS = 10000
+
+
+class CacheBackend(object):
+    """Interface of cache backend. Shared backend must implement these
+    methods over its client."""
+    # In process backend, not invalidated by writes of other processes
+    local = False
+
+    def get(self, key):
+        """Get the cached value against the given key.
+        :param key: str
+        :return: mixed - Value or None if not cached or expired.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Cache the value against the given key.
+        :param key: str
+        :param value: mixed - JSON serializable value.
+        :param ttl: int - Time to live in seconds.
+        """
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        """Remove the cached values of the given keys.
+        :param keys: str
+        """
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix):
+        """Remove the cached values of keys starting with the given prefix.
+        :param prefix: str
+        """
+        raise NotImplementedError
+
+    def size(self):
+        """Returns number of cached values.
+        :return: mixed - Number or None if not known.
+        """
+        return None
+
+
+class LRUCache(CacheBackend):
+    """In process cache removing least recently used value when full."""
+    local = True
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.time() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self.lock:
+            for key in [key for key in self.entries if key.startswith(prefix)]:
+                del self.entries[key]
+
+    def size(self):
+        return len(self.entries)
+
+
+class EntityCache(object):
+    """Cache of record details by model and id, with hit/miss statistics."""
+
+    def __init__(self, backend, ttl, enabled=True, check_interval=1):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.stale_fills = 0
+        self.invalidations = [0] * INVALIDATION_STRIPES
+        self.model_invalidations = {}
+        self.generations = {}
+        self.written_generations = {}
+        self.lock = threading.Lock()
+
+    def key(self, model, record_id):
+        """Returns cache key of the record.
+        :param model: str - department or employee.
+        :param record_id: mixed - Unique identification of record.
+        :return: str
+        """
+        return '{model}:{id}'.format(model=model, id=int(record_id))
+
+    def get(self, model, record_id):
+        """Get the cached record details.
+        :param model: str - department or employee.
+        :param record_id: mixed - Unique identification of record.
+        :return: mixed - Record details or None on miss.
+        """
+        if not self.enabled:
+            return None
+        value = self.backend.get(self.key(model, record_id))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def fill_token(self, model, record_id):
+        """Returns invalidation count of the record, taken before the record
+        is read to fill the cache.
+        :param model: str - department or employee.
+        :param record_id: mixed - Unique identification of record.
+        :return: tuple
+        """
+        return (self.model_invalidations.get(model, 0), self.invalidations[
+            hash(self.key(model, record_id)) % INVALIDATION_STRIPES])
+
+    def set(self, model, record_id, value, token=None):
+        """Cache the record details, unless the record was invalidated since
+        the fill token was taken.
+        :param model: str - department or employee.
+        :param record_id: mixed - Unique identification of record.
+        :param value: dict - Record details.
+        :param token: tuple - Fill token taken before record was read, None
+        for details written by current request.
+        :return: boolean - True if cached.
+        """
+        if not self.enabled:
+            return False
+        with self.lock:
+            if token is not None and \
+                    token != self.fill_token(model, record_id):
+                self.stale_fills += 1
+                return False
+            self.backend.set(self.key(model, record_id), value, self.ttl)
+            return True
+
+    def invalidate(self, model, *record_ids):
+        """Remove the cached details of the given records.
+        :param model: str - department or employee.
+        :param record_ids: mixed - Unique identifications of records.
+        """
+        if self.enabled and record_ids:
+            keys = [self.key(model, record_id) for record_id in record_ids]
+            with self.lock:
+                for key in keys:
+                    self.invalidations[hash(key) % INVALIDATION_STRIPES] += 1
+                self.backend.delete(*keys)
+
+    def invalidate_all(self, model):
+        """Remove the cached details of all records of the model.
+        :param model: str - department or employee.
+        """
+        if self.enabled:
+            with self.lock:
+                self.model_invalidations[model] = \
+                    self.model_invalidations.get(model, 0) + 1
+                self.backend.delete_prefix(model + ':')
+
+    def checks_generations(self):
+        """Returns whether cache is invalidated by table generations, which
+        in process cache is.
+        :return: boolean
+        """
+        return self.enabled and self.backend.local
+
+    def written(self, model, generation):
+        """Record table generation of model committed by this process,
+        whose records are invalidated by the writing request itself.
+        :param model: str - department or employee.
+        :param generation: int - Table generation written.
+        """
+        with self.lock:
+            written = self.written_generations.setdefault(model, set())
+            if len(written) >= MAX_WRITTEN_GENERATIONS:
+                # Not checked for long, later check removes all records.
+                written.clear()
+            written.add(generation)
+
+    def check(self, model, read_generation):
+        """Remove the cached details of all records of the model when its
+        table generation changed since last check by write of other process,
+        at most once per check interval, so writes of other processes
+        invalidate in process cache. Generations written by this process are
+        not checked, as its writes invalidate their records. Shared backend
+        is invalidated by the writing process itself.
+        :param model: str - department or employee.
+        :param read_generation: function - Returns table generation of model.
+        """
+        if not self.checks_generations():
+            return
+        checked_at, generation = self.generations.get(model, (None, None))
+        now = time.time()
+        if checked_at is not None and now < checked_at + self.check_interval:
+            return
+        current = read_generation()
+        with self.lock:
+            written = self.written_generations.get(model, set())
+            other_writes = checked_at is not None and (
+                current < generation or not written.issuperset(
+                    range(generation + 1, current + 1)))
+            self.written_generations[model] = set(
+                value for value in written if value > current)
+        if other_writes:
+            self.invalidate_all(model)
+        self.generations[model] = (now, current)
+
+    def stats(self):
+        """Returns hit/miss statistics of cache.
+        :return: dict
+        """
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'stale_fills': self.stale_fills,
+            'entries': self.backend.size()
+        }
+
+
+# Instantiate cache
+entity_cache = EntityCache(
+    LRUCache(configs.ENTITY_CACHE_MAX_ENTRIES), configs.ENTITY_CACHE_TTL,
+    configs.ENTITY_CACHE_ENABLED, configs.ENTITY_CACHE_CHECK_INTERVAL)
+
+
+def timestamp(value):
+    """Returns date time as seconds since epoch, to cache it as JSON value.
+    :param value: obj - UTC date time.
+    :return: int
+    """
+    return calendar.timegm(value.utctimetuple())
+
+
+def from_timestamp(value):
+    """Returns UTC date time of cached seconds since epoch.
+    :param value: int - Seconds since epoch.
+    :return: obj - datetime
+    """
+    return datetime.datetime.utcfromtimestamp(value)
+
+
+def configure(backend):
+    """Use the given backend (like, shared cache across workers).
+    :param backend: obj - CacheBackend.
+    """
+    entity_cache.backend = backend
@@ -0,0 +1,154 @@
+"""Compression of responses negotiated by Accept-Encoding.
+   1) gzip - Always available.
+   2) br - When brotli package is installed.
+   3) zstd - When zstandard package is installed.
+"""
+import zlib
+
+import configs
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Content types worth compressing
+COMPRESSIBLE_MIMETYPES = [
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/plain']
+
+
+class GzipCompressor(object):
+    """Incremental gzip compression."""
+
+    def __init__(self):
+        self.compressor = zlib.compressobj(
+            configs.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(object):
+    """Incremental brotli compression."""
+
+    def __init__(self):
+        self.compressor = brotli.Compressor(
+            quality=configs.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdCompressor(object):
+    """Incremental zstd compression."""
+
+    def __init__(self):
+        self.compressor = zstandard.ZstdCompressor(
+            level=configs.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# Compressor of each available encoding
+COMPRESSORS = {'gzip': GzipCompressor}
+if brotli is not None:
+    COMPRESSORS['br'] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS['zstd'] = ZstdCompressor
+
+
+def negotiate(accept_encodings):
+    """Returns the available encoding of highest quality accepted by client,
+    the first of configured encodings on equal quality.
+    :param accept_encodings: obj - Parsed Accept-Encoding header.
+    :return: mixed - Encoding or None if none is accepted.
+    """
+    encoding = None
+    best_quality = 0
+    for name in configs.COMPRESSION_ENCODINGS:
+        if name not in COMPRESSORS:
+            continue
+        quality = accept_encodings.quality(name)
+        if quality > best_quality:
+            encoding = name
+            best_quality = quality
+    return encoding
+
+
+def compress_response(response, accept_encodings):
+    """Compress the response body by encoding negotiated with client. Body
+    smaller than min size is left as it is, and streamed body is compressed
+    chunk by chunk as it is generated.
+    :param response: obj - Flask response.
+    :param accept_encodings: obj - Parsed Accept-Encoding header.
+    :return: obj - Flask response.
+    """
+    if not configs.COMPRESSION_ENABLED or response.status_code != 200 \
+            or response.direct_passthrough \
+            or 'Content-Encoding' in response.headers \
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(accept_encodings)
+    if encoding is None:
+        return response
+    compressor = COMPRESSORS[encoding]()
+    if response.is_streamed:
+        response.response = compress_stream(compressor, response.response)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < configs.COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compressor.compress(data) + compressor.finish())
+    response.headers['Content-Encoding'] = encoding
+    # Compressed body differs byte by byte, so entity tag is weak.
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def compress_stream(compressor, chunks):
+    """Generate compressed chunks, flushed after each chunk so client
+    receives data as soon as it is generated.
+    :param compressor: obj - Compressor of negotiated encoding.
+    :param chunks: iterable - Chunks of body.
+    :return: generator - Compressed chunks.
+    """
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
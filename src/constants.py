@@ -5,6 +5,53 @@ SORT_ORDER = ['ASC', 'DESC']
 INTEGER_FIELDS_FILTER_REQUEST = ['page', 'page_size']
 FIELDS_FOR_SEARCH = ['search_by', 'search_for']
 FIELDS_FOR_SORT = ['sort_by', 'order_by']
+COUNT_MODES = ['exact', 'estimate', 'none']
+SEARCH_MODES = ['exact', 'prefix', 'contains', 'fulltext']
+# Text fields matched by search mode, indexed for prefix and full text search
+TEXT_SEARCH_FIELDS = {
+    'department': ['name'],
+    'employee': ['name', 'address']
+}
+# Sort by relevance of full text search
+SORT_BY_RELEVANCE = 'relevance'
+# Search operators (field:operator in search_by), range operators apply to
+# fields of ordered values. Multiple values are separated by |.
+SEARCH_OPERATORS = ['eq', 'gte', 'lte', 'between', 'in']
+RANGE_SEARCH_OPERATORS = ['gte', 'lte', 'between']
+MULTI_VALUE_SEARCH_OPERATORS = ['between', 'in']
+SEARCH_VALUES_SEPARATOR = '|'
+SEARCH_MAX_VALUES = 100
+RANGE_SEARCH_FIELDS = {
+    'department': ['department_id'],
+    'employee': ['employee_id', 'date_of_joining', 'salary']
+}
+# Fields of response details, which fields parameter selects from
+RESPONSE_FIELDS = {
+    'department': ['department_id', 'name'],
+    'employee': ['employee_id', 'name', 'department', 'date_of_joining',
+                 'gender', 'address', 'salary']
+}
+# Expanded fields of department details, and limit of expanded employees
+DEPARTMENT_EXPAND_FIELDS = ['employees', 'employee_count']
+DEFAULT_EXPAND_EMPLOYEES_LIMIT = 10
+MAX_EXPAND_EMPLOYEES_LIMIT = 100
+EXPORT_FORMATS = ['ndjson', 'csv']
+EXPORT_DEPARTMENT_FIELDS = ['department_id', 'name']
+EXPORT_EMPLOYEE_FIELDS = [
+    'employee_id', 'name', 'department', 'date_of_joining', 'gender',
+    'address', 'salary']
+# Fields to group employee statistics by
+STATS_GROUP_BY_FIELDS = ['department', 'gender']
+# Tables whose write generations version the list of each model
+VERSION_TABLES = {
+    'department': ['department'],
+    'employee': ['employee', 'department'],
+    'expanded_department': ['department', 'employee'],
+    'stats': ['employee', 'department']
+}
+# Lists with department names of the in process names map, versioned by
+# the department generation the map was loaded at
+NAME_MAP_MODELS = ['employee', 'stats']
 
 # HTTP response error messages
 ERROR_MESSAGE_NOT_FOUND = 'Requested {title} {id} not found.'
@@ -13,26 +60,64 @@ ERROR_MESSAGE_BAD_REQUEST = \
 ERROR_MESSAGE_INTERNAL_ERROR = 'Internal server error'
 ERROR_MESSAGE_UNAUTHORIZED_ACCESS = \
     'Authentication failed. Please use valid api key for access.'
+ERROR_MESSAGE_BULK_REQUEST = \
+    'Request should be non empty JSON array or NDJSON of at most {max} items'
+ERROR_MESSAGE_BULK_ITEM = 'Request item should be JSON object'
+ERROR_MESSAGE_BULK_WRITE_SELECTOR = \
+    'ids or search_by and search_for is required to select records'
+ERROR_MESSAGE_INVALID_CURSOR = \
+    'cursor is invalid or not issued for the given sort_by and order_by'
+ERROR_MESSAGE_EMPTY_REQUEST = 'Request should not be empty'
+ERROR_MESSAGE_BATCH_REQUEST = \
+    'Request should be JSON object with non empty operations array of at ' \
+    'most {max} operations'
+ERROR_MESSAGE_BATCH_ITEM = 'Operation and its body should be JSON object'
+ERROR_MESSAGE_BATCH_OPERATION = 'Operation {method} {path} is not supported'
+ERROR_MESSAGE_BATCH_NOT_RUN = \
+    'Operation not run, batch rolled back on failure of operation {index}'
+ERROR_MESSAGE_SORT_BY_RELEVANCE = \
+    'sort by relevance needs search_mode fulltext and page pagination'
 
 # HTTP response error codes
 ERROR_CODE_BAD_REQUEST = 'bad_request'
 ERROR_CODE_UNAUTHORIZED_REQUEST = 'unauthorized'
+ERROR_CODE_NOT_RUN = 'not_run'
 
 # HTTP response success messages
 DELETE_MESSAGE = '{module} detail successfully removed for {title} {id}'
 UPDATE_MESSAGE = '{module} detail successfully updated for {title} {id}'
+UNCHANGED_MESSAGE = '{module} detail already up to date for {title} {id}'
+
+# Bulk request item status
+BULK_STATUS_CREATED = 'created'
+BULK_STATUS_INVALID = 'invalid'
+BULK_STATUS_FAILED = 'failed'
+# Batch request modes, failed operation rolls back all or only itself
+BATCH_MODES = ['all_or_nothing', 'best_effort']
+# Multi-get item status of id not found
+MULTI_GET_STATUS_NOT_FOUND = 'not_found'
 
-# Constants for validation
-VALIDATION_DEPARTMENT_POST_AND_PUT = {
-    'required_fields': ['name']
+# Constants for validation, request bodies are validated by their definition
+# of Swagger specification
+VALIDATION_DEPARTMENT_PATCH = {
+    'fields': ['name']
+}
+VALIDATION_EMPLOYEE_PATCH = {
+    'fields': ['name', 'department_id', 'date_of_joining', 'gender',
+               'address', 'salary']
 }
-VALIDATION_EMPLOYEE_POST_AND_PUT = {
-    'required_fields': ['name', 'department_id'],
-    'integer_fields': ['department_id']
+# Message of invalid value of request body field
+FIELD_VALIDATION_MESSAGES = {
+    'date_of_joining': {
+        'invalid date format':
+            'Date of joining should be in valid YYYY-MM-DD format'},
+    'gender': {'invalid gender value': 'Gender should be male or female'},
+    'salary': {'invalid salary value': 'Salary should be like 2000.00'}
 }
 VALIDATION_DEPARTMENT_FIELDS_FOR_FILTER = ['department_id', 'name']
 VALIDATION_EMPLOYEE_FIELDS_FOR_FILTER = [
-    'employee_id', 'name', 'date_of_joining', 'gender', 'salary', 'department']
+    'employee_id', 'name', 'date_of_joining', 'gender', 'salary', 'department',
+    'address']
 
 # Application key for authentication
 API_KEY_IN_HEADER = 'Flask-Crud-Api-Key'
@@ -0,0 +1,113 @@
+"""Total records count of filtered results.
+   1) exact - COUNT(*) cached for short time against the search filter.
+   2) estimate - Row count from table statistics when nothing is searched.
+   3) none - No count, only has_more of the page is returned.
+"""
+import threading
+import time
+
+import configs
+
+from sqlalchemy import func
+from src import dialect
+
+
+class CountCache(object):
+    """In memory cache of total records with time to live."""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Get the cached count against the given key.
+        :param key: tuple
+        :return: mixed - Count or None if not cached or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self.entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key, count):
+        """Cache the count against the given key.
+        :param key: tuple
+        :param count: int
+        """
+        with self.lock:
+            if len(self.entries) >= self.max_entries:
+                self.entries.clear()
+            self.entries[key] = (time.time() + self.ttl, count)
+
+    def invalidate(self, table):
+        """Remove cached counts of the given table.
+        :param table: str - Table name.
+        """
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == table]:
+                del self.entries[key]
+
+
+# Instantiate cache
+cache = CountCache(configs.COUNT_CACHE_TTL, configs.COUNT_CACHE_MAX_ENTRIES)
+
+
+def search_key(filter_data):
+    """Returns normalized search filter to use as cache key.
+    :param filter_data: dict - Data for filter the result.
+    :return: tuple
+    """
+    if filter_data.get('search_by') and filter_data.get('search_for'):
+        key = tuple(sorted(dict(zip(
+            filter_data.get('search_by').split(','),
+            filter_data.get('search_for').split(','))).items()))
+        if filter_data.get('search_mode') not in (None, 'exact'):
+            key += (('search_mode', filter_data.get('search_mode')),)
+        return key
+    return ()
+
+
+def total_records(session, statement, model, filter_data, offset,
+                  page_length, has_more):
+    """Returns total number of records after filter data as per count mode.
+    :param session: obj - Database session.
+    :param statement: obj - Filtered select without order, offset and limit.
+    :param model: class - Model of the listed records.
+    :param filter_data: dict - Data for filter the result.
+    :param offset: int - Number of records before the page.
+    :param page_length: int - Number of records in the page.
+    :param has_more: boolean - Records exist after the page.
+    :return: mixed - Count or None if count is not requested.
+    :raises: sqlalchemy exceptions.
+    """
+    mode = filter_data.get('count') or 'exact'
+    if mode == 'none':
+        return None
+    # Last page gives exact count without query.
+    if not has_more and (page_length or not offset):
+        return offset + page_length
+    key = (model.__tablename__, search_key(filter_data))
+    if mode == 'estimate' and not key[1]:
+        return dialect.get_dialect(session).estimated_count(
+            session, model.__tablename__)
+    count = cache.get(key)
+    if count is None:
+        count = session.execute(statement.with_only_columns(
+            [func.count(model.__mapper__.primary_key[0])]
+        ).order_by(None)).scalar()
+        cache.set(key, count)
+    return count
+
+
+def invalidate(*tables):
+    """Remove cached counts of the given tables on write.
+    :param tables: str - Table names.
+    """
+    for table in tables:
+        cache.invalidate(table)
@@ -0,0 +1,500 @@
+"""Database dialect specific SQL.
+   1) MySQL - Development and production database.
+   2) SQLite - Test environment (file or in memory database).
+"""
+import datetime
+import re
+
+from sqlalchemy import Date, Float, Integer, String, bindparam, false, func, \
+    literal_column, or_, text
+from sqlalchemy.dialects import mysql
+
+
+class Dialect(object):
+    """SQL which differs between databases. Portable SQL by default."""
+    name = None
+
+    def collation_key(self, column):
+        """Returns sort key of text column by its collation, equal for values
+        which database compares as equal. Binary collation compares values.
+        :param column: obj - Column.
+        :return: obj - SQL expression.
+        """
+        return column
+
+    def create_search_indexes(self, engine, metadata, tables):
+        """Create indexes of text search fields, which MySQL database gets by
+        database dump and migrations.
+        :param engine: obj - Database engine.
+        :param metadata: obj - Metadata of tables.
+        :param tables: dict - Text search fields of each table.
+        :raises: sqlalchemy exceptions.
+        """
+
+    def search_clause(self, column, value, mode):
+        """Returns clause matching text column to search value by search mode.
+        Prefix is matched by LIKE, which uses index of column.
+        :param column: obj - Column.
+        :param value: str - Search value.
+        :param mode: str - exact, prefix, contains or fulltext.
+        :return: obj - SQLAlchemy clause.
+        """
+        if mode == 'prefix':
+            return column.like(escape_like(value) + '%', escape='/')
+        if mode == 'contains':
+            return column.like('%' + escape_like(value) + '%', escape='/')
+        if mode == 'fulltext':
+            return self.fulltext_clause(column, value)
+        return column == value
+
+    def fulltext_clause(self, column, value):
+        """Returns clause matching text column to full text search value,
+        by substring without full text index.
+        :param column: obj - Column.
+        :param value: str - Search value.
+        :return: obj - SQLAlchemy clause.
+        """
+        return self.search_clause(column, value, 'contains')
+
+    def relevance(self, columns):
+        """Returns relevance of row to full text search of columns, higher for
+        better match, none without full text index.
+        :param columns: list - (column, search value) pairs.
+        :return: obj - SQL expression.
+        """
+        return text('0')
+
+    def estimated_count(self, session, table):
+        """Returns estimated number of rows of table.
+        :param session: obj - Database session.
+        :param table: str - Table name.
+        :return: int
+        :raises: sqlalchemy exceptions.
+        """
+        return session.execute(
+            text('SELECT COUNT(*) FROM {table}'.format(table=table))
+        ).scalar() or 0
+
+    def first_inserted_id(self, result, count):
+        """Returns auto increment id of first row of multi-row INSERT.
+        :param result: obj - Result of INSERT statement.
+        :param count: int - Number of inserted rows.
+        :return: int
+        """
+        return result.lastrowid
+
+    def begin_transaction(self, session):
+        """Begin transaction of session on database, before SAVEPOINT of
+        nested transaction. Database begins it by first statement.
+        :param session: obj - Database session.
+        :raises: sqlalchemy exceptions.
+        """
+
+    def replica_lag(self, connection):
+        """Returns replication lag of the read replica in seconds.
+        :param connection: obj - Connection to the read replica.
+        :return: mixed - Lag or None if replica is not replicating.
+        :raises: sqlalchemy exceptions.
+        """
+        return 0
+
+    def upsert(self, session, table, rows):
+        """Insert rows or update the existing rows with same primary key, by
+        INSERT ... ON CONFLICT DO UPDATE.
+        :param session: obj - Database session.
+        :param table: obj - Table.
+        :param rows: list - Column values of rows, all with same columns.
+        :raises: sqlalchemy exceptions.
+        """
+        columns = list(rows[0])
+        keys = [column.name for column in table.primary_key]
+        updates = ['{column} = excluded.{column}'.format(column=column)
+                   for column in columns if column not in keys]
+        params = {}
+        for column, value in onupdate_values(table, columns).items():
+            if hasattr(value, 'compile'):
+                value = value.compile(
+                    dialect=session.get_bind().dialect,
+                    compile_kwargs={'literal_binds': True})
+            else:
+                params['onupdate_' + column] = value
+                value = ':onupdate_' + column
+            updates.append('{column} = {value}'.format(
+                column=column, value=value))
+        statement = text(
+            'INSERT INTO {table} ({columns}) VALUES ({values}) '
+            'ON CONFLICT ({keys}) DO UPDATE SET {updates}'.format(
+                table=table.name, columns=', '.join(columns),
+                values=', '.join(':' + column for column in columns),
+                keys=', '.join(keys), updates=', '.join(updates))
+        ).bindparams(
+            *[bindparam(column, type_=table.c[column].type)
+              for column in columns] +
+            [bindparam(param, type_=table.c[param[len('onupdate_'):]].type)
+             for param in params])
+        session.execute(statement, [dict(row, **params) for row in rows])
+
+    def merge(self, session, table, rows, merges):
+        """Insert rows or merge them into the existing rows with same primary
+        key, by INSERT ... ON CONFLICT DO UPDATE, in single statement so
+        concurrent merges of a new row do not race.
+        :param session: obj - Database session.
+        :param table: obj - Table.
+        :param rows: list - Column values of rows, all with same columns.
+        :param merges: dict - Function of each merged column, returning SQL
+        expression of its current and inserted values.
+        :raises: sqlalchemy exceptions.
+        """
+        columns = list(rows[0])
+        updates = [
+            '{column} = {value}'.format(column=column, value=merge(
+                table.c[column], literal_column('excluded.' + column)
+            ).compile(dialect=session.get_bind().dialect,
+                      compile_kwargs={'literal_binds': True}))
+            for column, merge in merges.items()]
+        statement = text(
+            'INSERT INTO {table} ({columns}) VALUES ({values}) '
+            'ON CONFLICT ({keys}) DO UPDATE SET {updates}'.format(
+                table=table.name, columns=', '.join(columns),
+                values=', '.join(':' + column for column in columns),
+                keys=', '.join(column.name for column in table.primary_key),
+                updates=', '.join(updates))
+        ).bindparams(*[bindparam(column, type_=table.c[column].type)
+                       for column in columns])
+        session.execute(statement, rows)
+
+
+class MySQLDialect(Dialect):
+    """MySQL specific SQL."""
+    name = 'mysql'
+
+    def collation_key(self, column):
+        """Returns sort key of text column by its collation, equal for values
+        which database compares as equal (like, case and accent insensitive
+        latin1_swedish_ci), by WEIGHT_STRING().
+        :param column: obj - Column.
+        :return: obj - SQL expression.
+        """
+        return func.weight_string(column)
+
+    def estimated_count(self, session, table):
+        """Returns estimated number of rows of table from table statistics.
+        :param session: obj - Database session.
+        :param table: str - Table name.
+        :return: int
+        :raises: sqlalchemy exceptions.
+        """
+        return session.execute(
+            text('SELECT TABLE_ROWS FROM information_schema.TABLES '
+                 'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table'),
+            {'table': table}).scalar() or 0
+
+    def fulltext_clause(self, column, value):
+        """Returns clause matching text column to full text search value by
+        FULLTEXT index of column, any of the words in natural language mode.
+        :param column: obj - Column.
+        :param value: str - Search value.
+        :return: obj - SQLAlchemy clause.
+        """
+        return self.relevance([(column, value)])
+
+    def relevance(self, columns):
+        """Returns relevance of row to full text search of columns, higher for
+        better match, by FULLTEXT index of each column.
+        :param columns: list - (column, search value) pairs.
+        :return: obj - SQL expression.
+        """
+        return text(' + '.join(
+            'MATCH ({table}.{column}) AGAINST '
+            '(:search_{index} IN NATURAL LANGUAGE MODE)'.format(
+                table=column.table.name, column=column.name, index=index)
+            for index, (column, value) in enumerate(columns)
+        )).bindparams(*[
+            bindparam('search_%d' % index, value, unique=True)
+            for index, (column, value) in enumerate(columns)])
+
+    def replica_lag(self, connection):
+        """Returns replication lag of the read replica in seconds.
+        :param connection: obj - Connection to the read replica.
+        :return: mixed - Lag or None if replica is not replicating.
+        :raises: sqlalchemy exceptions.
+        """
+        status = connection.execute(text('SHOW SLAVE STATUS')).first()
+        if status is None:
+            return None
+        return status['Seconds_Behind_Master']
+
+    def upsert(self, session, table, rows):
+        """Insert rows or update the existing rows with same primary key, by
+        single multi-row INSERT ... ON DUPLICATE KEY UPDATE.
+        :param session: obj - Database session.
+        :param table: obj - Table.
+        :param rows: list - Column values of rows, all with same columns.
+        :raises: sqlalchemy exceptions.
+        """
+        keys = [column.name for column in table.primary_key]
+        statement = mysql.insert(table).values(rows)
+        updates = onupdate_values(table, list(rows[0]))
+        updates.update({column: statement.inserted[column]
+                        for column in rows[0] if column not in keys})
+        session.execute(statement.on_duplicate_key_update(**updates))
+
+    def merge(self, session, table, rows, merges):
+        """Insert rows or merge them into the existing rows with same primary
+        key, by single multi-row INSERT ... ON DUPLICATE KEY UPDATE.
+        :param session: obj - Database session.
+        :param table: obj - Table.
+        :param rows: list - Column values of rows, all with same columns.
+        :param merges: dict - Function of each merged column, returning SQL
+        expression of its current and inserted values.
+        :raises: sqlalchemy exceptions.
+        """
+        statement = mysql.insert(table).values(rows)
+        session.execute(statement.on_duplicate_key_update(**{
+            column: merge(table.c[column], statement.inserted[column])
+            for column, merge in merges.items()}))
+
+
+class SQLiteDialect(Dialect):
+    """SQLite specific SQL."""
+    name = 'sqlite'
+
+    def begin_transaction(self, session):
+        """Begin transaction explicitly, as driver begins it only before
+        writes, so SAVEPOINT would begin and its RELEASE commit a transaction
+        of its own.
+        :param session: obj - Database session.
+        :raises: sqlalchemy exceptions.
+        """
+        if not session.connection().connection.in_transaction:
+            session.execute(text('BEGIN'))
+
+    def create_search_indexes(self, engine, metadata, tables):
+        """Create case insensitive index of text search fields for LIKE prefix
+        match, and FTS5 table of fields kept in sync with table by triggers.
+        :param engine: obj - Database engine.
+        :param metadata: obj - Metadata of tables.
+        :param tables: dict - Text search fields of each table.
+        :raises: sqlalchemy exceptions.
+        """
+        with engine.begin() as connection:
+            for table, fields in tables.items():
+                names = {
+                    'table': table, 'fts': table + '_fts',
+                    'key': primary_key(metadata.tables[table]).name,
+                    'fields': ', '.join(fields),
+                    'new': ', '.join('new.' + field for field in fields),
+                    'old': ', '.join('old.' + field for field in fields)}
+                for field in fields:
+                    connection.execute(text(
+                        'CREATE INDEX IF NOT EXISTS ix_{table}_{field} '
+                        'ON {table} ({field} COLLATE NOCASE)'.format(
+                            table=table, field=field)))
+                exists = connection.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE name = :name"),
+                    {'name': names['fts']}).scalar()
+                for statement in SQLITE_FTS_STATEMENTS:
+                    connection.execute(text(statement.format(**names)))
+                if not exists:
+                    connection.execute(text(
+                        "INSERT INTO {fts}({fts}) VALUES ('rebuild')".format(
+                            **names)))
+
+    def fulltext_clause(self, column, value):
+        """Returns clause matching text column to full text search value by
+        FTS5 table, any of the words.
+        :param column: obj - Column.
+        :param value: str - Search value.
+        :return: obj - SQLAlchemy clause.
+        """
+        query = fts_query(column, value)
+        if query is None:
+            return false()
+        return text(
+            '{table}.{key} IN (SELECT rowid FROM {table}_fts '
+            'WHERE {table}_fts MATCH :search)'.format(
+                table=column.table.name,
+                key=primary_key(column.table).name)
+        ).bindparams(bindparam('search', query, unique=True))
+
+    def relevance(self, columns):
+        """Returns relevance of row to full text search of columns, higher for
+        better match, by bm25 rank of FTS5 table.
+        :param columns: list - (column, search value) pairs.
+        :return: obj - SQL expression.
+        """
+        queries = [(column, fts_query(column, value))
+                   for column, value in columns]
+        queries = [(column, query) for column, query in queries if query]
+        if not queries:
+            return text('0')
+        return text(' + '.join(
+            'COALESCE((SELECT -rank FROM {table}_fts '
+            'WHERE {table}_fts MATCH :search_{index} '
+            'AND rowid = {table}.{key}), 0)'.format(
+                table=column.table.name,
+                key=primary_key(column.table).name, index=index)
+            for index, (column, query) in enumerate(queries)
+        )).bindparams(*[
+            bindparam('search_%d' % index, query, unique=True)
+            for index, (column, query) in enumerate(queries)])
+
+    def estimated_count(self, session, table):
+        """Returns estimated number of rows of table from ANALYZE statistics,
+        otherwise from the largest rowid.
+        :param session: obj - Database session.
+        :param table: str - Table name.
+        :return: int
+        :raises: sqlalchemy exceptions.
+        """
+        stat = None
+        if session.execute(text(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = 'sqlite_stat1'")).scalar():
+            stat = session.execute(
+                text('SELECT stat FROM sqlite_stat1 WHERE tbl = :table'),
+                {'table': table}).scalar()
+        if stat:
+            return int(stat.split()[0])
+        return session.execute(
+            text('SELECT MAX(rowid) FROM {table}'.format(table=table))
+        ).scalar() or 0
+
+    def first_inserted_id(self, result, count):
+        """Returns rowid of first row of multi-row INSERT, as SQLite returns
+        rowid of the last row.
+        :param result: obj - Result of INSERT statement.
+        :param count: int - Number of inserted rows.
+        :return: int
+        """
+        return result.lastrowid - count + 1
+
+
+# FTS5 table with external content and triggers which keep it in sync
+SQLITE_FTS_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+    "{fields}, content='{table}', content_rowid='{key}')",
+    "CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, {fields}) VALUES (new.{key}, {new}); END",
+    "CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, {fields}) "
+    "VALUES ('delete', old.{key}, {old}); END",
+    "CREATE TRIGGER IF NOT EXISTS {fts}_update "
+    "AFTER UPDATE OF {fields} ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, {fields}) "
+    "VALUES ('delete', old.{key}, {old}); "
+    "INSERT INTO {fts}(rowid, {fields}) VALUES (new.{key}, {new}); END"
+]
+
+
+DIALECTS = {dialect.name: dialect()
+            for dialect in (MySQLDialect, SQLiteDialect)}
+
+
+def get_dialect(session):
+    """Returns SQL dialect of the database bound to session.
+    :param session: obj - Database session.
+    :return: obj - Dialect.
+    """
+    return get_engine_dialect(session.get_bind())
+
+
+def get_engine_dialect(engine):
+    """Returns SQL dialect of the database of engine.
+    :param engine: obj - Database engine.
+    :return: obj - Dialect.
+    """
+    return DIALECTS.get(engine.dialect.name, Dialect())
+
+
+def onupdate_values(table, columns):
+    """Returns update values of the columns with onupdate default, which
+    INSERT ... ON CONFLICT/DUPLICATE KEY UPDATE does not apply by itself.
+    :param table: obj - Table.
+    :param columns: list - Column names given in rows.
+    :return: dict - SQL expression or python value of each column.
+    """
+    values = {}
+    for column in table.columns:
+        if column.onupdate is None or column.name in columns:
+            continue
+        if column.onupdate.is_clause_element:
+            values[column.name] = column.onupdate.arg
+        else:
+            values[column.name] = column.onupdate.arg(None)
+    return values
+
+
+def changed_values(model, values):
+    """Returns condition true when any of the columns differs from its value,
+    for UPDATE which leaves unchanged row alone. Comparison is null safe
+    (NOT <=> on MySQL, IS NOT on SQLite).
+    :param model: obj - Model class.
+    :param values: dict - Value of each column.
+    :return: obj - SQL expression.
+    """
+    return or_(*[getattr(model, column).is_distinct_from(value)
+                 for column, value in values.items()])
+
+
+def escape_like(value):
+    """Escape wildcards of LIKE pattern by escape character /.
+    :param value: str
+    :return: str
+    """
+    return value.replace('/', '//').replace('%', '/%').replace('_', '/_')
+
+
+def fts_query(column, value):
+    """Returns FTS5 query of any of the words of search value in column.
+    :param column: obj - Column.
+    :param value: str - Search value.
+    :return: mixed - Query or None if value has no words.
+    """
+    words = re.findall(r'\w+', value)
+    if not words:
+        return None
+    return '{column} : ({words})'.format(
+        column=column.name,
+        words=' OR '.join('"{word}"'.format(word=word) for word in words))
+
+
+def primary_key(table):
+    """Returns primary key column of table of single column key.
+    :param table: obj - Table.
+    :return: obj - Column.
+    """
+    return list(table.primary_key.columns)[0]
+
+
+def bind_value(column, value):
+    """Convert request value to python type of the column, as SQLite accepts
+    only python date objects for date columns.
+    :param column: obj - Column.
+    :param value: mixed
+    :return: mixed
+    :raises: ValueError
+    """
+    if isinstance(value, str) and isinstance(column.type, Date):
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    return value
+
+
+def stored_value(column, value):
+    """Convert validated value of created or updated row to python type of
+    the column, so values returned without reading the row back are the
+    stored ones (like, number given for text column is stored as text).
+    :param column: obj - Column.
+    :param value: mixed
+    :return: mixed
+    :raises: ValueError
+    """
+    if value is None:
+        return value
+    if isinstance(column.type, String) and not isinstance(value, str):
+        return str(value)
+    if isinstance(column.type, Float) and isinstance(value, (int, str)):
+        return float(value)
+    if isinstance(column.type, Integer) and isinstance(value, str):
+        return int(value)
+    return bind_value(column, value)
@@ -0,0 +1,49 @@
+"""Streaming export of records as NDJSON or CSV."""
+import csv
+import io
+import json
+
+
+# Content type of each export format
+MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def stream(connection, result, fields, detail, export_format, batch_size):
+    """Generate export of the result, one chunk per batch of rows, so rows are
+    never held in memory all together. Connection is closed once result is
+    consumed or client disconnects.
+    :param connection: obj - Database connection of the result.
+    :param result: obj - Result of query executed with server side cursor.
+    :param fields: list - Fields of exported record.
+    :param detail: function - Returns record details of a row.
+    :param export_format: str - ndjson or csv.
+    :param batch_size: int - Number of rows fetched per batch.
+    :return: generator - Chunks of export.
+    """
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        if export_format == 'csv':
+            writer.writerow(fields)
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                record = detail(row)
+                if export_format == 'csv':
+                    writer.writerow([record[field] for field in fields])
+                else:
+                    buffer.write(json.dumps(record))
+                    buffer.write('\n')
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        result.close()
+        connection.close()
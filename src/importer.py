@@ -0,0 +1,99 @@
+"""Streaming import of records from CSV or NDJSON."""
+import csv
+import json
+
+from sqlalchemy import exc
+from src import constants, validator
+from src.logic.models import department, employee
+
+
+# Batch import function of each model
+IMPORTERS = {
+    'department': department.import_departments,
+    'employee': employee.import_employees
+}
+
+
+def read_records(lines, import_format):
+    """Generate records of CSV or NDJSON lines, one at a time. Empty CSV
+    values are left out as missing fields. Invalid NDJSON line is kept as
+    text to report against its line number.
+    :param lines: iterable - Lines of text.
+    :param import_format: str - ndjson or csv.
+    :return: generator - (line number, record).
+    """
+    if import_format == 'csv':
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, {k: v for k, v in record.items()
+                                    if k is not None and v not in ('', None)}
+        return
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, line.rstrip('\r\n')
+
+
+def import_records(records, model, batch_size, reject):
+    """Validate and import records in batches, each batch in its own
+    transaction. Only one batch is held in memory, with the records of its
+    lines rejected by validation, so rejected records are reported in order
+    of line number.
+    :param records: iterable - (line number, record).
+    :param model: str - department or employee.
+    :param batch_size: int - Number of records imported per transaction.
+    :param reject: function - Called with line number, record and errors of
+    each rejected record.
+    :return: dict - Import summary.
+    """
+    summary = {'total_records': 0, 'total_imported': 0, 'total_rejected': 0}
+    batch = []
+    invalid = []
+    for line_number, record in records:
+        summary['total_records'] += 1
+        validate = validator.validate_import_item(record, model)
+        if validate:
+            invalid.append((line_number, record, validate))
+        else:
+            batch.append((line_number, record))
+        if len(batch) + len(invalid) >= batch_size:
+            import_batch(batch, invalid, model, summary, reject)
+            batch = []
+            invalid = []
+    if batch or invalid:
+        import_batch(batch, invalid, model, summary, reject)
+    return summary
+
+
+def import_batch(batch, invalid, model, summary, reject):
+    """Import a batch of validated records, rejecting the whole batch on
+    database error, and report the rejected records of the batch lines in
+    order of line number.
+    :param batch: list - (line number, record) of validated records.
+    :param invalid: list - (line number, record, errors) of records rejected
+    by validation.
+    :param model: str - department or employee.
+    :param summary: dict - Import summary to update.
+    :param reject: function - Called for each rejected record.
+    """
+    records = dict(batch)
+    imported = 0
+    rejected = []
+    if batch:
+        try:
+            imported, rejected = IMPORTERS[model](batch)
+        except (exc.SQLAlchemyError, exc.DBAPIError):
+            rejected = [
+                (line_number, [constants.ERROR_MESSAGE_INTERNAL_ERROR])
+                for line_number, record in batch]
+    rejected = sorted(
+        invalid + [(line_number, records[line_number], errors)
+                   for line_number, errors in rejected],
+        key=lambda item: item[0])
+    summary['total_imported'] += imported
+    summary['total_rejected'] += len(rejected)
+    for line_number, record, errors in rejected:
+        reject(line_number, record, errors)
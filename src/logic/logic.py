@@ -1,12 +1,25 @@
 """Application logic."""
+import hashlib
+import json
+
+from collections import OrderedDict
+
+import configs
+
 from oto import response
-from src.logic.models import department, employee
-from src import validator, constants
+from sqlalchemy import exc
+from src.logic.models import department, employee, generation, stats
+from src import batch, validator, constants, importer, serializer
 
 
-def get_department(department_id):
+def get_department(department_id, fields=None, expand=None,
+                   employees_limit=None):
     """Get the department details against the given department id.
     :param department_id: str - Unique identification of department.
+    :param fields: str - Fields of response comma separated, all when None.
+    :param expand: str - Expanded fields comma separated (employees,
+    employee_count), or None.
+    :param employees_limit: str - Maximum number of expanded employees.
     :return: Department details against the given department id.
     """
     if not validator.is_number(department_id):
@@ -14,12 +27,21 @@ def get_department(department_id):
             code=constants.ERROR_CODE_BAD_REQUEST,
             message=constants.ERROR_MESSAGE_BAD_REQUEST.format(
                 title='department id', id=department_id))
-    return department.get_department(department_id)
+    validate = validator.validate_fields(fields, 'department') + \
+        validator.validate_expand(expand, employees_limit)
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return expand_departments(
+        department.get_department(department_id, serializer.requested_fields(
+            expanded_fields(fields, expand))),
+        'department', expand, employees_limit)
 
 
-def get_employee(employee_id):
+def get_employee(employee_id, fields=None):
     """Get the employee details against the given employee id.
     :param employee_id: str - Unique identification of employee.
+    :param fields: str - Fields of response comma separated, all when None.
     :return: Employee details against the given employee id.
     """
     if not validator.is_number(employee_id):
@@ -27,7 +49,122 @@ def get_employee(employee_id):
             code=constants.ERROR_CODE_BAD_REQUEST,
             message=constants.ERROR_MESSAGE_BAD_REQUEST.format(
                 title='employee id', id=employee_id))
-    return employee.get_employee(employee_id)
+    validate = validator.validate_fields(fields, 'employee')
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return employee.get_employee(
+        employee_id, serializer.requested_fields(fields))
+
+
+def get_department_version(department_id, fields=None, expand=None,
+                           employees_limit=None):
+    """Get the entity tag and last modified date of the department details.
+    Expanded details are versioned by generation of department and employee
+    tables, as employees of department are included.
+    :param department_id: str - Unique identification of department.
+    :param fields: str - Fields of response comma separated, all when None.
+    :param expand: str - Expanded fields comma separated, or None.
+    :param employees_limit: str - Maximum number of expanded employees.
+    :return: mixed - (entity tag, last modified) or None if not known.
+    """
+    if not validator.is_number(department_id) \
+            or validator.validate_fields(fields, 'department'):
+        return None
+    if expand:
+        return get_list_version('expanded_department', [
+            ('department_id', department_id), ('fields', fields),
+            ('expand', expand), ('employees_limit', employees_limit)])
+    try:
+        return projected_version(
+            department.get_department_version(department_id), fields)
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        return None
+
+
+def get_employee_version(employee_id, fields=None):
+    """Get the entity tag and last modified date of the employee details.
+    :param employee_id: str - Unique identification of employee.
+    :param fields: str - Fields of response comma separated, all when None.
+    :return: mixed - (entity tag, last modified) or None if not known.
+    """
+    if not validator.is_number(employee_id) \
+            or validator.validate_fields(fields, 'employee'):
+        return None
+    try:
+        return projected_version(
+            employee.get_employee_version(employee_id), fields)
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        return None
+
+
+def projected_version(version, fields):
+    """Returns version of the details with the requested fields, as each
+    selection of fields is a different representation of the record.
+    :param version: mixed - (entity tag, last modified) or None.
+    :param fields: str - Fields of response comma separated, all when None.
+    :return: mixed - (entity tag, last modified) or None.
+    """
+    if version is None or not fields:
+        return version
+    etag, last_modified = version
+    return '{etag}-{fields}'.format(etag=etag, fields=fields), last_modified
+
+
+def get_department_stats(department_id):
+    """Get the statistics of employees of the given department.
+    :param department_id: str - Unique identification of department.
+    :return: Employee statistics of department.
+    """
+    if not validator.is_number(department_id):
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST,
+            message=constants.ERROR_MESSAGE_BAD_REQUEST.format(
+                title='department id', id=department_id))
+    return stats.get_department_stats(department_id)
+
+
+def get_employee_stats(group_by):
+    """Get the statistics of employees grouped by the given fields.
+    :param group_by: str - Fields comma separated to group statistics by.
+    :return: Employee statistics of each group.
+    """
+    validate = validator.validate_stats_request(group_by)
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    fields = group_by.split(',') if group_by else []
+    return stats.get_employee_stats(
+        [field for field in constants.STATS_GROUP_BY_FIELDS
+         if field in fields])
+
+
+def get_list_version(model, args):
+    """Get the entity tag and last modified date of the list of records, by
+    the generation of listed tables. Tag changes when any of the tables is
+    written or the query arguments differ.
+    Department names of the names map are versioned by the generation the
+    map was loaded at.
+    :param model: str - department or employee.
+    :param args: list - (name, value) of query arguments.
+    :return: mixed - (entity tag, last modified) or None if not known.
+    """
+    try:
+        generations = generation.get_generations(
+            constants.VERSION_TABLES[model])
+        if model in constants.NAME_MAP_MODELS:
+            generations['department'] = (
+                department.department_names.sync(
+                    generations['department'][0]),
+                generations['department'][1])
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        return None
+    etag = hashlib.sha1(json.dumps([
+        model, sorted(args),
+        sorted((table, value[0]) for table, value in generations.items())
+    ]).encode('utf-8')).hexdigest()
+    modified = [value[1] for value in generations.values() if value[1]]
+    return etag, max(modified) if modified else None
 
 
 def delete_department(department_id):
@@ -80,6 +217,54 @@ def post_employee(payload):
     return employee.post_employee(payload)
 
 
+def post_departments(payload, chunk_size):
+    """Add the departments detail in bulk.
+    :param payload: list - Departments detail.
+    :param chunk_size: str - Number of departments inserted per transaction.
+    :return: Status of each department of request.
+    """
+    validate = validator.validate_bulk_request(payload, chunk_size)
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    items, rejected = bulk_items(payload, 'department')
+    return department.post_departments(items, rejected, int(chunk_size))
+
+
+def post_employees(payload, chunk_size):
+    """Add the employees detail in bulk.
+    :param payload: list - Employees detail.
+    :param chunk_size: str - Number of employees inserted per transaction.
+    :return: Status of each employee of request.
+    """
+    validate = validator.validate_bulk_request(payload, chunk_size)
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    items, rejected = bulk_items(payload, 'employee')
+    return employee.post_employees(items, rejected, int(chunk_size))
+
+
+def bulk_items(payload, model):
+    """Validate each item of bulk request.
+    :param payload: list - Items of request.
+    :param model: str
+    :return: tuple - (index, item) of valid items and status of invalid items.
+    """
+    items = []
+    rejected = []
+    for index, item in enumerate(payload):
+        validate = validator.validate_bulk_item(item, model)
+        if validate:
+            rejected.append({
+                'index': index,
+                'status': constants.BULK_STATUS_INVALID,
+                'errors': validate})
+        else:
+            items.append((index, item))
+    return items, rejected
+
+
 def put_department(department_id, payload):
     """Update the department details against the given department id.
     :param department_id: str - Unique identification of department.
@@ -116,25 +301,277 @@ def put_employee(employee_id, payload):
     return employee.put_employee(employee_id, payload)
 
 
+def patch_department(department_id, payload):
+    """Update the given fields of the department against the given department
+    id.
+    :param department_id: str - Unique identification of department.
+    :param payload: json - Department fields to update.
+    :return: Success message on update of department details.
+    """
+    if not validator.is_number(department_id):
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST,
+            message=constants.ERROR_MESSAGE_BAD_REQUEST.format(
+                title='department id', id=department_id))
+    validate = validator.validate_partial_request(payload, 'department')
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return department.patch_department(department_id, payload)
+
+
+def patch_employee(employee_id, payload):
+    """Update the given fields of the employee against the given employee id.
+    :param employee_id: str - Unique identification of employee.
+    :param payload: json - Employee fields to update.
+    :return: Success message on update of employee details.
+    """
+    if not validator.is_number(employee_id):
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST,
+            message=constants.ERROR_MESSAGE_BAD_REQUEST.format(
+                title='employee id', id=employee_id))
+    validate = validator.validate_partial_request(payload, 'employee')
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return employee.patch_employee(employee_id, payload)
+
+
+def patch_employees(filter_data, payload):
+    """Update the given fields of employees selected by ids or search filter.
+    :param filter_data: dict - ids or search_by and search_for.
+    :param payload: json - Employee fields to update.
+    :return: Number of updated employees.
+    """
+    validate = validator.validate_bulk_write_request(filter_data, 'employee')
+    validate_payload = validator.validate_partial_request(payload, 'employee')
+    if isinstance(validate_payload, str):
+        validate.append(validate_payload)
+    else:
+        validate.extend(validate_payload)
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return employee.patch_employees(filter_data, payload)
+
+
+def delete_employees(filter_data):
+    """Delete the employees selected by ids or search filter.
+    :param filter_data: dict - ids or search_by and search_for.
+    :return: Number of deleted employees.
+    """
+    validate = validator.validate_bulk_write_request(filter_data, 'employee')
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return employee.delete_employees(filter_data)
+
+
 def get_departments(filter_data):
-    """Get the departments detail.
+    """Get the departments detail, or the departments of the given ids.
     :param filter_data: dict - Data for filter the result.
     :return: Departments detail.
     """
-    validate = validator.validate_filter_request(filter_data, 'department')
+    if filter_data.get('ids'):
+        return get_departments_by_ids(
+            filter_data.get('ids'), filter_data.get('fields'),
+            filter_data.get('expand'), filter_data.get('employees_limit'))
+    validate = validator.validate_filter_request(filter_data, 'department') \
+        + validator.validate_expand(
+            filter_data.get('expand'), filter_data.get('employees_limit'))
     if validate:
         return response.create_error_response(
             code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
-    return department.get_departments(filter_data)
+    return expand_departments(
+        department.get_departments(dict(filter_data, fields=expanded_fields(
+            filter_data.get('fields'), filter_data.get('expand')))),
+        'departments', filter_data.get('expand'),
+        filter_data.get('employees_limit'))
 
 
 def get_employees(filter_data):
-    """Get the employees detail.
+    """Get the employees detail, or the employees of the given ids.
     :param filter_data: dict - Data for filter the result.
     :return: Employees detail.
     """
+    if filter_data.get('ids'):
+        return get_employees_by_ids(
+            filter_data.get('ids'), filter_data.get('fields'))
     validate = validator.validate_filter_request(filter_data, 'employee')
     if validate:
         return response.create_error_response(
             code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
     return employee.get_employees(filter_data)
+
+
+def get_departments_by_ids(ids, fields, expand=None, employees_limit=None):
+    """Get the departments detail of the given ids.
+    :param ids: str - Ids comma separated.
+    :param fields: str - Fields of response comma separated, all when None.
+    :param expand: str - Expanded fields comma separated, or None.
+    :param employees_limit: str - Maximum number of expanded employees.
+    :return: Departments detail in order of ids.
+    """
+    validate = validator.validate_multi_get_request(
+        ids, fields, 'department') + validator.validate_expand(
+        expand, employees_limit)
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return expand_departments(department.get_departments_by_ids(
+        unique_ids(ids),
+        serializer.requested_fields(expanded_fields(fields, expand))),
+        'departments', expand, employees_limit)
+
+
+def expanded_fields(fields, expand):
+    """Returns fields of department details, with department id when the
+    details are expanded, to look up expanded fields of each department.
+    :param fields: str - Fields of response comma separated, or None.
+    :param expand: str - Expanded fields comma separated, or None.
+    :return: str
+    """
+    if expand and fields and 'department_id' not in fields.split(','):
+        return fields + ',department_id'
+    return fields
+
+
+def expand_departments(result, key, expand, employees_limit):
+    """Add the expanded fields to departments of the response, read for all
+    departments of the response together.
+    :param result: obj - Response of department details.
+    :param key: str - department or departments.
+    :param expand: str - Expanded fields comma separated, or None.
+    :param employees_limit: str - Maximum number of expanded employees.
+    :return: Response with expanded department details.
+    """
+    if not expand or not result:
+        return result
+    details = result.message[key]
+    if isinstance(details, dict):
+        details = [details]
+    # Details are copied, as they may be the cached details.
+    details = [dict(detail) for detail in details]
+    # Ids not found have status instead of details.
+    found = [detail for detail in details if 'status' not in detail]
+    expansions = employee.get_department_employees(
+        [detail['department_id'] for detail in found], expand.split(','),
+        int(employees_limit or constants.DEFAULT_EXPAND_EMPLOYEES_LIMIT))
+    if not expansions:
+        return expansions
+    for detail in found:
+        detail.update(expansions.message[detail['department_id']])
+    result.message[key] = details[0] if key == 'department' else details
+    return result
+
+
+def export_departments(filter_data):
+    """Export the departments detail.
+    :param filter_data: dict - Data for filter the result and export format.
+    :return: Generator of export chunks.
+    """
+    validate = validator.validate_filter_request(filter_data, 'department')
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return department.export_departments(filter_data)
+
+
+def get_employees_by_ids(ids, fields):
+    """Get the employees detail of the given ids.
+    :param ids: str - Ids comma separated.
+    :param fields: str - Fields of response comma separated, all when None.
+    :return: Employees detail in order of ids.
+    """
+    validate = validator.validate_multi_get_request(ids, fields, 'employee')
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return employee.get_employees_by_ids(
+        unique_ids(ids), serializer.requested_fields(fields))
+
+
+def unique_ids(ids):
+    """Returns ids of multi-get request without repeated ids, in order of
+    their first occurrence, so each record is read, returned and counted
+    once.
+    :param ids: str - Ids comma separated.
+    :return: list
+    """
+    return list(OrderedDict.fromkeys(int(record_id)
+                                     for record_id in ids.split(',')))
+
+
+def export_employees(filter_data):
+    """Export the employees detail.
+    :param filter_data: dict - Data for filter the result and export format.
+    :return: Generator of export chunks.
+    """
+    validate = validator.validate_filter_request(filter_data, 'employee')
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return employee.export_employees(filter_data)
+
+
+def import_records(lines, model, import_format, batch_size):
+    """Import the records of CSV or NDJSON lines.
+    :param lines: iterable - Lines of request body.
+    :param model: str - department or employee.
+    :param import_format: str - ndjson or csv.
+    :param batch_size: str - Number of records imported per transaction.
+    :return: Import summary with rejected records.
+    """
+    validate = validator.validate_import_request(import_format, batch_size)
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    rejects = []
+
+    def reject(line_number, record, errors):
+        if len(rejects) < configs.IMPORT_MAX_REJECTS_IN_RESPONSE:
+            rejects.append({
+                'line': line_number, 'record': record, 'errors': errors})
+
+    summary = importer.import_records(
+        importer.read_records(lines, import_format), model, int(batch_size),
+        reject)
+    summary['rejected'] = rejects
+    return response.Response(summary)
+
+
+def post_batch(payload):
+    """Run the operations of batch in single transaction.
+    :param payload: json - Operations and mode of batch.
+    :return: Result of each operation and whether batch is committed.
+    """
+    validate = validator.validate_batch_request(payload)
+    if validate:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST, message=validate)
+    return batch.run_operations(
+        payload.get('operations'), payload.get('mode') or 'all_or_nothing',
+        BATCH_OPERATIONS)
+
+
+# Function of each operation of batch by method, model and whether path
+# has record id, called with record id and body of operation
+BATCH_OPERATIONS = {
+    ('POST', 'department', False):
+        lambda record_id, body: post_department(body),
+    ('POST', 'employee', False):
+        lambda record_id, body: post_employee(body),
+    ('GET', 'department', True):
+        lambda record_id, body: get_department(record_id),
+    ('GET', 'employee', True):
+        lambda record_id, body: get_employee(record_id),
+    ('PUT', 'department', True): put_department,
+    ('PUT', 'employee', True): put_employee,
+    ('PATCH', 'department', True): patch_department,
+    ('PATCH', 'employee', True): patch_employee,
+    ('DELETE', 'department', True):
+        lambda record_id, body: delete_department(record_id),
+    ('DELETE', 'employee', True):
+        lambda record_id, body: delete_employee(record_id)
+}
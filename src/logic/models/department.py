@@ -1,15 +1,24 @@
 """Department model."""
+import datetime
 import math
+import threading
+import time
 
 from oto import response
-from sqlalchemy import Column, Integer, String, exc, asc, desc
+import configs
+
+from json.encoder import encode_basestring_ascii
+from sqlalchemy import Column, Integer, String, DateTime, exc, asc, desc, \
+    and_, case, func, literal_column, null, select
 from sqlalchemy.orm.exc import NoResultFound
-from mysql_connector import Base, Session
-from src import constants
+from mysql_connector import Base, Session, read_primary, read_replica
+from src import cache, constants, counting, dialect, export, pagination, \
+    search, serializer
+from src.logic.models import generation
 
 
-# Instantiate session
-session = Session()
+# Session of current request
+session = Session
 
 
 class Department(Base):
@@ -19,28 +28,191 @@ class Department(Base):
     department_id = Column(
         Integer, primary_key=True, nullable=False, autoincrement=True)
     name = Column(String(255), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default='1',
+                     onupdate=literal_column('version') + 1)
+    updated_at = Column(DateTime, nullable=False,
+                        default=datetime.datetime.utcnow,
+                        server_default=func.current_timestamp(),
+                        onupdate=datetime.datetime.utcnow)
 
     def __repr__(self):
         return "<Department(department_id=%s, name='%s')>" % (
             self.department_id, self.name)
 
 
-def get_department(department_id):
+# Columns of department details selected by list queries as plain rows, with
+# kind of their JSON encoding. Only columns of requested fields are selected.
+LIST_COLUMNS = serializer.ListColumns([
+    ('department_id', Department.department_id, 'integer'),
+    ('name', Department.name, 'string')
+])
+
+
+class NameMap(object):
+    """Names and ranks of departments of one load, replaced as a whole so
+    readers see names and ranks of the same load."""
+
+    def __init__(self, rows=(), department_generation=0):
+        """
+        :param rows: iterable - (department id, name, collation key) sorted
+        by name.
+        :param department_generation: int - Generation of department table
+        read before the rows.
+        """
+        self.generation = department_generation
+        self.names = {}
+        self.names_json = {}
+        self.ranks = {}
+        rank, previous_key = -1, None
+        for department_id, name, key in rows:
+            if rank < 0 or key != previous_key:
+                rank, previous_key = rank + 1, key
+            self.names[department_id] = name
+            self.names_json[department_id] = encode_basestring_ascii(name)
+            self.ranks[department_id] = rank
+
+
+class DepartmentNames(object):
+    """In process map of department id to name, for employee reads without
+    join of the small department table. Map is sorted by database, and
+    reloaded from primary on department write of this process, on refresh
+    interval, on newer generation of department table (for writes of other
+    processes) and on unknown department id. Names are matched by database,
+    by collation of name column."""
+
+    def __init__(self, refresh_interval):
+        self.refresh_interval = refresh_interval
+        self.expires_at = 0
+        self.map = NameMap()
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Reload the map when refresh interval is over or a department was
+        written.
+        :raises: sqlalchemy exceptions.
+        """
+        if self.expires_at < time.time():
+            self.refresh()
+
+    @read_primary
+    def refresh(self):
+        """Reload the map from primary, as replica may not have the written
+        department yet. Departments of same name (by collation key of
+        database) have same rank, as sorted by name.
+        :raises: sqlalchemy exceptions.
+        """
+        with self.lock:
+            # Generation is read first, so the map is not older than it.
+            department_generation = generation.primary_generation(
+                Department.__tablename__)
+            self.map = NameMap(session.execute(select([
+                Department.department_id, Department.name,
+                dialect.get_dialect(session).collation_key(
+                    Department.name).label('collation_key')
+            ]).order_by(Department.name, Department.department_id)),
+                department_generation)
+            self.expires_at = time.time() + self.refresh_interval
+
+    def sync(self, department_generation):
+        """Reload the map when due or when it was loaded before the given
+        generation of department table, like after department write of other
+        process, so the version of response is the one of its names.
+        :param department_generation: int - Generation of department table.
+        :return: int - Generation of department table the map was loaded at.
+        :raises: sqlalchemy exceptions.
+        """
+        self.load()
+        if self.map.generation < department_generation:
+            self.refresh()
+        return self.map.generation
+
+    def invalidate(self):
+        """Reload the map on next use, after department write."""
+        self.expires_at = 0
+
+    def ensure(self, department_ids):
+        """Reload the map if any of the given departments is not known, like
+        department added by other process.
+        :param department_ids: iterable - Unique identifications of
+        departments.
+        :raises: sqlalchemy exceptions.
+        """
+        if not set(department_ids).issubset(self.map.names):
+            self.refresh()
+
+    def value(self, department_id):
+        """Returns name of department.
+        :param department_id: int - Unique identification of department.
+        :return: mixed - Name or None if not known.
+        """
+        return self.map.names.get(department_id)
+
+    def json(self, department_id):
+        """Returns JSON of name of department.
+        :param department_id: int - Unique identification of department.
+        :return: str - JSON string or null if not known.
+        """
+        return self.map.names_json.get(department_id, 'null')
+
+    def name_rank(self, name):
+        """Returns rank of the given name in departments sorted by name, of
+        the departments which database matches to the name.
+        :param name: str - Department name.
+        :return: int
+        :raises: ValueError if no department has the name.
+        """
+        department_ids = [
+            department_id for department_id, in session.execute(select([
+                Department.department_id
+            ]).where(Department.name == name))
+        ] if isinstance(name, str) else []
+        if not department_ids:
+            raise ValueError('Unknown department name')
+        self.ensure(department_ids)
+        rank = self.map.ranks.get(department_ids[0])
+        if rank is None:
+            raise ValueError('Unknown department name')
+        return rank
+
+    def search_clause(self, column, names):
+        """Returns clause selecting rows of departments of the given names,
+        by subquery of departments matched by database.
+        :param column: obj - Department id column.
+        :param names: list - Department names.
+        :return: obj - SQLAlchemy clause.
+        """
+        return column.in_(select([Department.department_id]).where(
+            Department.name.in_(names)))
+
+    def rank_column(self, column):
+        """Returns rank of department name of rows, to sort by name.
+        :param column: obj - Department id column.
+        :return: obj - SQL expression.
+        """
+        ranks = self.map.ranks
+        if not ranks:
+            return null()
+        return case(ranks, value=column, else_=null())
+
+
+# Instantiate department names
+department_names = DepartmentNames(configs.DEPARTMENT_NAMES_REFRESH_INTERVAL)
+
+
+@read_replica
+def get_department(department_id, fields=None):
     """Get the department details against the given department id.
     :param department_id: int - Unique identification of department.
+    :param fields: list - Fields of response, all fields when None.
     :return: Department details against the given department id.
     :raises: sqlalchemy exceptions.
     """
     try:
-        result_set = session.query(Department). \
-            filter(Department.department_id == department_id).one()
-        result = {
-            'department': {
-                'department_id': result_set.department_id,
-                'name': result_set.name
-            }
-        }
-        return response.Response(result)
+        result = department_by_id(department_id)
+        if result is None:
+            raise NoResultFound
+        return response.Response({'department': serializer.project(
+            department_response(result), fields)})
     except NoResultFound:
         return response.create_not_found_response(
             constants.ERROR_MESSAGE_NOT_FOUND.format(
@@ -50,6 +222,104 @@ def get_department(department_id):
             constants.ERROR_MESSAGE_INTERNAL_ERROR)
 
 
+@read_replica
+def get_departments_by_ids(department_ids, fields=None):
+    """Get the departments details against the given department ids, in
+    order of ids. Departments not cached are read by IN query of each chunk
+    of ids.
+    :param department_ids: list - Unique identification of departments.
+    :param fields: list - Fields of response, all fields when None.
+    :return: Departments details, with not found status for missing ids.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        generation.check_cache(Department.__tablename__)
+        results = {}
+        missing_ids = []
+        for department_id in set(department_ids):
+            result = cache.entity_cache.get('department', department_id)
+            if result is None:
+                missing_ids.append(department_id)
+            else:
+                results[department_id] = result
+        results.update(fill_departments(missing_ids))
+        departments = [
+            serializer.project(
+                department_response(results[department_id]), fields)
+            if department_id in results else {
+                'department_id': department_id,
+                'status': constants.MULTI_GET_STATUS_NOT_FOUND}
+            for department_id in department_ids]
+        return response.Response({
+            'departments': departments,
+            'total_records': len([
+                department_id for department_id in department_ids
+                if department_id in results])
+        })
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def department_by_id(department_id):
+    """Get the department details from cache, otherwise from database and
+    cache them.
+    :param department_id: int - Unique identification of department.
+    :return: mixed - Department details or None if not found.
+    :raises: sqlalchemy exceptions.
+    """
+    generation.check_cache(Department.__tablename__)
+    result = cache.entity_cache.get('department', department_id)
+    if result is None:
+        result = fill_departments([int(department_id)]).get(
+            int(department_id))
+    return result
+
+
+@read_primary
+def fill_departments(department_ids):
+    """Get the departments details from primary, by IN query of each chunk of
+    ids, and cache them unless they were invalidated during the read or are
+    read in transaction of batch, not committed yet.
+    :param department_ids: list - Unique identification of departments.
+    :return: dict - Department details by id of found departments.
+    :raises: sqlalchemy exceptions.
+    """
+    results = {}
+    tokens = {department_id: cache.entity_cache.fill_token(
+        'department', department_id) for department_id in department_ids}
+    for start in range(0, len(department_ids), configs.MULTI_GET_CHUNK_SIZE):
+        for result_set in session.query(
+            Department.department_id, Department.name, Department.version,
+            Department.updated_at
+        ).filter(Department.department_id.in_(
+                department_ids[start:start + configs.MULTI_GET_CHUNK_SIZE])):
+            result = department_detail(result_set)
+            if not session.info.get('batch'):
+                cache.entity_cache.set(
+                    'department', result_set.department_id, result,
+                    tokens[result_set.department_id])
+            results[result_set.department_id] = result
+    return results
+
+
+@read_replica
+def get_department_version(department_id):
+    """Get the entity tag and last modified date of the department details
+    against the given department id, from the cached details the department
+    is served from, so the tag is not newer than the details.
+    :param department_id: int - Unique identification of department.
+    :return: mixed - (entity tag, last modified) or None if not found.
+    :raises: sqlalchemy exceptions.
+    """
+    result = department_by_id(department_id)
+    if result is None:
+        return None
+    return 'department-{id}-{version}'.format(
+        id=int(department_id), version=result['version']), \
+        cache.from_timestamp(result['updated_at'])
+
+
 def delete_department(department_id):
     """Delete the department details against the given department id.
     :param department_id: int - Unique identification of department.
@@ -60,7 +330,13 @@ def delete_department(department_id):
         result_set = session.query(Department). \
             filter(Department.department_id == department_id).one()
         session.delete(result_set)
+        generation.bump(Department.__tablename__, 'employee')
         session.commit()
+        counting.invalidate(Department.__tablename__, 'employee')
+        department_names.invalidate()
+        cache.entity_cache.invalidate('department', department_id)
+        # Employees of department are removed by cascade.
+        cache.entity_cache.invalidate_all('employee')
         return response.Response(message=constants.DELETE_MESSAGE.format(
             module='Department', title='department id', id=department_id))
     except NoResultFound:
@@ -73,24 +349,115 @@ def delete_department(department_id):
 
 
 def post_department(payload):
-    """Add the department details.
+    """Add the department details. Details are returned from the inserted
+    values, without reading the department back, and cached for lookup of
+    department name.
     :param payload: json - Department details.
     :return: Department details added against the given data.
     :raises: sqlalchemy exceptions.
     """
     try:
-        department = Department(
-            name=payload.get('name')
-        )
-        session.add(department)
+        name = department_row(payload)['name']
+        inserted = session.execute(Department.__table__.insert().values(
+            name=name))
+        generation.bump(Department.__tablename__)
         session.commit()
-        # Get department details via get_department() using last inserted id.
-        return get_department(department.department_id)
+        counting.invalidate(Department.__tablename__)
+        department_names.invalidate()
+        result = {
+            'department_id': inserted.inserted_primary_key[0],
+            'name': name,
+            'version': 1,
+            'updated_at': cache.timestamp(
+                inserted.last_inserted_params()['updated_at'])
+        }
+        # Commit of batch operation releases its savepoint only, department
+        # is cached once the batch is committed.
+        if not session.info.get('batch'):
+            cache.entity_cache.set(
+                'department', result['department_id'], result)
+        return response.Response({'department': department_response(result)})
     except(exc.SQLAlchemyError, exc.DBAPIError):
+        session.rollback()
         return response.create_fatal_response(
             constants.ERROR_MESSAGE_INTERNAL_ERROR)
 
 
+def post_departments(items, rejected, chunk_size):
+    """Add the departments detail in chunks. Each chunk is inserted by single
+    multi-row INSERT in its own transaction.
+    :param items: list - (index, payload) of validated department details.
+    :param rejected: list - Status of items rejected by validation.
+    :param chunk_size: int - Number of departments inserted per transaction.
+    :return: Status of each item of request.
+    """
+    result = list(rejected)
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        try:
+            inserted = session.execute(Department.__table__.insert().values(
+                [department_row(payload) for index, payload in chunk]))
+            first_id = dialect.get_dialect(session).first_inserted_id(
+                inserted, len(chunk))
+            generation.bump(Department.__tablename__)
+            session.commit()
+            result.extend({
+                'index': index,
+                'status': constants.BULK_STATUS_CREATED,
+                'department_id': first_id + offset
+            } for offset, (index, payload) in enumerate(chunk))
+        except (exc.SQLAlchemyError, exc.DBAPIError):
+            session.rollback()
+            result.extend({
+                'index': index,
+                'status': constants.BULK_STATUS_FAILED,
+                'errors': [constants.ERROR_MESSAGE_INTERNAL_ERROR]
+            } for index, payload in chunk)
+    counting.invalidate(Department.__tablename__)
+    department_names.invalidate()
+    return response.Response({
+        'departments': sorted(result, key=lambda item: item['index']),
+        'total_created': len([
+            item for item in result
+            if item['status'] == constants.BULK_STATUS_CREATED])
+    })
+
+
+def import_departments(items):
+    """Insert or update the departments of import batch in single
+    transaction. Departments with department_id are upserted, others are
+    inserted.
+    :param items: list - (line number, payload) of validated departments.
+    :return: tuple - Number of imported departments and (line number, errors)
+    of rejected departments.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        new_rows = [department_row(payload)
+                    for line_number, payload in items
+                    if payload.get('department_id') is None]
+        existing_rows = [
+            dict(department_row(payload),
+                 department_id=int(payload.get('department_id')))
+            for line_number, payload in items
+            if payload.get('department_id') is not None]
+        if new_rows:
+            session.execute(Department.__table__.insert().values(new_rows))
+        if existing_rows:
+            dialect.get_dialect(session).upsert(
+                session, Department.__table__, existing_rows)
+        generation.bump(Department.__tablename__)
+        session.commit()
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        session.rollback()
+        raise
+    counting.invalidate(Department.__tablename__, 'employee')
+    department_names.invalidate()
+    cache.entity_cache.invalidate(
+        'department', *[row['department_id'] for row in existing_rows])
+    return len(items), []
+
+
 def put_department(department_id, payload):
     """Update the department details against the given department id.
     :param department_id: int - Unique identification of department.
@@ -99,12 +466,16 @@ def put_department(department_id, payload):
     :raises: sqlalchemy exceptions.
     """
     try:
-        department = {'name': payload.get('name')}
+        department = department_row(payload)
         affected_row = session.query(Department).filter(
             Department.department_id == department_id).update(department)
         if not affected_row:
             raise NoResultFound
+        generation.bump(Department.__tablename__)
         session.commit()
+        counting.invalidate(Department.__tablename__, 'employee')
+        department_names.invalidate()
+        cache.entity_cache.invalidate('department', department_id)
         return response.Response(message=constants.UPDATE_MESSAGE.format(
             module='Department', title='department id', id=department_id))
     except NoResultFound:
@@ -116,6 +487,52 @@ def put_department(department_id, payload):
             constants.ERROR_MESSAGE_INTERNAL_ERROR)
 
 
+def patch_department(department_id, payload):
+    """Update the given fields of the department against the given department
+    id. UPDATE matches only when any of the fields changed, so unchanged
+    details are not written.
+    :param department_id: int - Unique identification of department.
+    :param payload: json - Department fields to update.
+    :return: Success message on update of department details.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        department = {
+            field: dialect.stored_value(
+                getattr(Department, field), payload.get(field))
+            for field in constants.VALIDATION_DEPARTMENT_PATCH['fields']
+            if field in payload}
+        affected_row = session.query(Department).filter(
+            Department.department_id == department_id,
+            dialect.changed_values(Department, department)
+        ).update(department, synchronize_session=False)
+        if not affected_row:
+            session.rollback()
+            if not session.query(Department.department_id).filter(
+                    Department.department_id == department_id).first():
+                raise NoResultFound
+            return response.Response(
+                message=constants.UNCHANGED_MESSAGE.format(
+                    module='Department', title='department id',
+                    id=department_id))
+        generation.bump(Department.__tablename__)
+        session.commit()
+        counting.invalidate(Department.__tablename__, 'employee')
+        department_names.invalidate()
+        cache.entity_cache.invalidate('department', department_id)
+        return response.Response(message=constants.UPDATE_MESSAGE.format(
+            module='Department', title='department id', id=department_id))
+    except NoResultFound:
+        return response.create_not_found_response(
+            constants.ERROR_MESSAGE_NOT_FOUND.format(
+                title='department id', id=department_id))
+    except(exc.SQLAlchemyError, exc.DBAPIError):
+        session.rollback()
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+@read_replica
 def get_departments(filter_data):
     """Get the departments detail against the given filter request.
     :param filter_data: dict - Data for filter the result.
@@ -123,45 +540,177 @@ def get_departments(filter_data):
     (sort / search / paginate).
     :raises: sqlalchemy exceptions.
     """
+    if filter_data.get('cursor') is not None:
+        return get_departments_by_cursor(filter_data)
     try:
-        result = []
-        result_set = session.query(
-            Department
-        ).prefix_with(
-            'SQL_CALC_FOUND_ROWS'
-        ).filter(
-            *fields_for_search(filter_data)
-        ).order_by(
+        page_size = int(filter_data.get('page_size'))
+        offset = (int(filter_data.get('page')) - 1) * page_size
+        columns = LIST_COLUMNS.select(
+            serializer.requested_fields(filter_data.get('fields')))
+        statement = select(
+            [column for name, column, kind in columns]
+        ).where(
+            and_(*fields_for_search(filter_data))
+        )
+        # Fetch one extra row to know whether next page exists.
+        result_set = session.execute(statement.order_by(
             *fields_for_sort(filter_data)
         ).offset(
-            (int(filter_data.get('page')) - 1) *
-            int(filter_data.get('page_size'))
+            offset
         ).limit(
-            filter_data.get('page_size')
-        ).all()
+            page_size + 1
+        )).fetchall()
+        result = serializer.Rows(
+            result_set[:page_size], LIST_COLUMNS.encoder(columns))
+        has_more = len(result_set) > page_size
         # Calculate total number of records after filter data.
-        total_rows = session.execute('SELECT FOUND_ROWS()').scalar()
-        for department in result_set:
-            result.append({
-                'department_id': department.department_id,
-                'name': department.name
-            })
+        total_rows = counting.total_records(
+            session, statement, Department, filter_data, offset, len(result),
+            has_more)
         departments = {
             'departments': result,
             'page': int(filter_data.get('page')),
-            'page_size':
-                int(filter_data.get('page_size')),
-            'total_pages': math.ceil(
-                total_rows / int(filter_data.get('page_size'))) or None,
+            'page_size': page_size,
+            'total_pages':
+                math.ceil(total_rows / page_size) if total_rows else None,
             'total_records': total_rows or None,
+            'total_records_per_page': len(result) or None,
+            'has_more': has_more
+        }
+        return response.Response(departments)
+    except(exc.SQLAlchemyError, exc.DBAPIError):
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def get_departments_by_cursor(filter_data):
+    """Get the departments detail against the given filter request using
+    keyset pagination. Each page continues after the row encoded in the
+    cursor, so database reads only the rows of the page instead of skipping
+    offset rows.
+    :param filter_data: dict - Data for filter the result.
+    :return: Department details against given filter data with next cursor.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        page_size = int(filter_data.get('page_size'))
+        fields = pagination.keyset_fields(filter_data, 'department_id')
+        columns = [getattr(Department, field) for field, order in fields]
+        orders = [order for field, order in fields]
+        list_columns = LIST_COLUMNS.select(
+            serializer.requested_fields(filter_data.get('fields')))
+        # Sort fields not requested are selected after requested fields, for
+        # the position of last row in next cursor.
+        key_columns = list_columns + LIST_COLUMNS.select([
+            field for field, order in fields
+            if field not in [name for name, column, kind in list_columns]])
+        statement = select(
+            [column for name, column, kind in key_columns]
+        ).where(
+            and_(*fields_for_search(filter_data))
+        )
+        if filter_data.get('cursor'):
+            statement = statement.where(pagination.keyset_filter(
+                columns, orders, pagination.decode_cursor(
+                    filter_data.get('cursor'), fields)))
+        # Fetch one extra row to know whether next page exists.
+        result_set = session.execute(statement.order_by(
+            *pagination.keyset_order(columns, orders)
+        ).limit(
+            page_size + 1
+        )).fetchall()
+        result = serializer.Rows(
+            result_set[:page_size], LIST_COLUMNS.encoder(list_columns))
+        next_cursor = None
+        if len(result_set) > page_size:
+            last_row = LIST_COLUMNS.encoder(key_columns).detail(
+                result_set[page_size - 1])
+            next_cursor = pagination.encode_cursor(
+                fields, [last_row[field] for field, order in fields])
+        departments = {
+            'departments': result,
+            'page_size': page_size,
+            'next_cursor': next_cursor,
             'total_records_per_page': len(result) or None
         }
         return response.Response(departments)
+    except ValueError:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST,
+            message=constants.ERROR_MESSAGE_INVALID_CURSOR)
     except(exc.SQLAlchemyError, exc.DBAPIError):
         return response.create_fatal_response(
             constants.ERROR_MESSAGE_INTERNAL_ERROR)
 
 
+@read_replica
+def export_departments(filter_data):
+    """Export the departments detail against the given filter request. Rows
+    are read through server side cursor and streamed in batches.
+    :param filter_data: dict - Data for filter the result and export format.
+    :return: Generator of export chunks.
+    :raises: sqlalchemy exceptions.
+    """
+    connection = None
+    try:
+        connection = session.get_bind().connect()
+        result = connection.execute(select([
+            Department.department_id, Department.name
+        ]).where(
+            and_(*fields_for_search(filter_data))
+        ).order_by(
+            *fields_for_sort(filter_data)
+        ).execution_options(
+            stream_results=True
+        ))
+        return response.Response(export.stream(
+            connection, result, constants.EXPORT_DEPARTMENT_FIELDS,
+            department_response, filter_data.get('format'),
+            configs.EXPORT_BATCH_SIZE))
+    except(exc.SQLAlchemyError, exc.DBAPIError):
+        if connection is not None:
+            connection.close()
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def department_row(payload):
+    """Returns column values of all department fields of request, converted
+    to python types of the columns as they are stored, same as employee_row.
+    :param payload: json - Department details.
+    :return: dict
+    """
+    return {field: dialect.stored_value(getattr(Department, field),
+                                        payload.get(field))
+            for field in constants.VALIDATION_DEPARTMENT_PATCH['fields']}
+
+
+def department_detail(department):
+    """Returns cached department details of the department object or row,
+    with version and last modified date of the details.
+    :param department: obj - Department object or row.
+    :return: dict
+    """
+    return {
+        'department_id': department.department_id,
+        'name': department.name,
+        'version': department.version,
+        'updated_at': cache.timestamp(department.updated_at)
+    }
+
+
+def department_response(result):
+    """Returns department details of response of the cached details or
+    row.
+    :param result: mixed - Cached department details or row.
+    :return: dict
+    """
+    return {
+        'department_id': result['department_id'],
+        'name': result['name']
+    }
+
+
 def fields_for_sort(filter_data):
     """Returns list of fields with order to sort result by given request.
     :param filter_data: dict - Data for filter the result.
@@ -170,27 +719,38 @@ def fields_for_sort(filter_data):
     fields_to_sort = [None]
     if filter_data.get('sort_by') and filter_data.get('order_by'):
         fields_to_sort = \
-            [desc(getattr(Department, k)) if v == 'DESC'
-             else asc(getattr(Department, k))
-             for k, v in dict(zip(
-                 filter_data.get('sort_by').split(','),
-                 filter_data.get('order_by').split(','))).items()
-             ]
+            [desc(sort_column(k, filter_data)) if v == 'DESC'
+             else asc(sort_column(k, filter_data))
+             for k, v in pagination.sort_fields(filter_data)]
     return fields_to_sort
 
 
+def sort_column(field, filter_data):
+    """Returns column to sort result by the given field.
+    :param field: str - Field name or relevance.
+    :param filter_data: dict - Data for filter the result.
+    :return: obj - Column or SQL expression.
+    """
+    if field == constants.SORT_BY_RELEVANCE:
+        return dialect.get_dialect(session).relevance(
+            [(getattr(Department, k), values[0])
+             for k, operator, values in search.search_filters(filter_data)
+             if operator == 'eq'
+             and k in constants.TEXT_SEARCH_FIELDS['department']])
+    return getattr(Department, field)
+
+
 def fields_for_search(filter_data):
     """Returns list of fields with their value to search result by given request.
+    Text fields are matched by search mode, others by search operator.
     :param filter_data: dict - Data for filter the result.
-    :return: mixed
-    """
-    # where 1 clause added if no fields found to search.
-    fields_to_search = '1'
-    if filter_data.get('search_by') and filter_data.get('search_for'):
-        fields_to_search = \
-            [getattr(Department, k) == v
-             for k, v in dict(zip(
-                filter_data.get('search_by').split(','),
-                filter_data.get('search_for').split(','))).items()
-             ]
-    return fields_to_search
+    :return: list
+    """
+    search_mode = filter_data.get('search_mode') or 'exact'
+    return [
+        dialect.get_dialect(session).search_clause(
+            getattr(Department, k), values[0], search_mode)
+        if operator == 'eq'
+        and k in constants.TEXT_SEARCH_FIELDS['department']
+        else search.operator_clause(getattr(Department, k), operator, values)
+        for k, operator, values in search.search_filters(filter_data)]
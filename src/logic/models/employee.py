@@ -1,22 +1,34 @@
 """Employee model."""
+import datetime
 import math
 
 from oto import response
-from sqlalchemy import Column, Integer, Float, String, Date, Enum, \
-    ForeignKey, exc, asc, desc
+import configs
+
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, \
+    Enum, ForeignKey, Index, exc, asc, desc, and_, case, cast, func, \
+    literal_column, select, type_coerce, union_all
 from sqlalchemy.orm import backref, relationship
 from sqlalchemy.orm.exc import NoResultFound
-from mysql_connector import Base, Session
-from src import constants
-from src.logic.models import department
+from mysql_connector import Base, Session, read_primary, read_replica
+from src import cache, constants, counting, dialect, export, pagination, \
+    search, serializer
+from src.logic.models import department, generation
 
 
-# Instantiate session
-session = Session()
+# Session of current request
+session = Session
 
 
 class Employee(Base):
     __tablename__ = 'employee'
+    # Indexes of range and multi-value search filters and their sort
+    __table_args__ = (
+        Index('ix_employee_department_date', 'department_id',
+              'date_of_joining'),
+        Index('ix_employee_date_of_joining', 'date_of_joining'),
+        Index('ix_employee_salary', 'salary')
+    )
 
     employee_id = Column(
         Integer, primary_key=True, nullable=False, autoincrement=True)
@@ -27,6 +39,12 @@ class Employee(Base):
     gender = Column(Enum(*constants.GENDER), nullable=False, default='male')
     address = Column(String(1000), nullable=True)
     salary = Column(Float(10, 2), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default='1',
+                     onupdate=literal_column('version') + 1)
+    updated_at = Column(DateTime, nullable=False,
+                        default=datetime.datetime.utcnow,
+                        server_default=func.current_timestamp(),
+                        onupdate=datetime.datetime.utcnow)
     parent = relationship(
         'Department', backref=backref('employee', cascade='all,delete'))
 
@@ -38,33 +56,88 @@ class Employee(Base):
                              self.salary)
 
 
-def get_employee(employee_id):
-    """Get the employee details against the given employee id.
+class EmployeeStats(Base):
+    """Headcount and salary summary of employees of department and gender,
+    maintained by deltas of single employee writes and inserts, recomputed
+    for the departments of bulk updates and deletes."""
+    __tablename__ = 'employee_stats'
+
+    department_id = Column(Integer, ForeignKey(
+        'department.department_id', ondelete='CASCADE'), primary_key=True,
+        nullable=False)
+    gender = Column(Enum(*constants.GENDER), primary_key=True, nullable=False)
+    headcount = Column(Integer, nullable=False)
+    salary_sum = Column(Float(53), nullable=False)
+    salary_min = Column(Float(10, 2), nullable=False)
+    salary_max = Column(Float(10, 2), nullable=False)
+
+    def __repr__(self):
+        return "<EmployeeStats(department_id='%s', gender='%s', " \
+            "headcount='%s', salary_sum='%s', salary_min='%s', " \
+            "salary_max='%s')>" % (self.department_id, self.gender,
+                                   self.headcount, self.salary_sum,
+                                   self.salary_min, self.salary_max)
+
+
+# Columns of employee details selected by list queries as plain rows, with
+# kind of their JSON encoding. Date is formatted by database, gender and
+# salary are read as they are, to skip conversion of each value. Department
+# name is looked up by department id in department names. Only columns of
+# requested fields are selected.
+LIST_COLUMNS = serializer.ListColumns([
+    ('employee_id', Employee.employee_id, 'integer'),
+    ('name', Employee.name, 'string'),
+    ('department', Employee.department_id, 'lookup'),
+    ('date_of_joining', cast(Employee.date_of_joining, String), 'string'),
+    ('gender', type_coerce(Employee.gender, String), 'string'),
+    ('address', Employee.address, 'string'),
+    ('salary', type_coerce(Employee.salary, Float(asdecimal=False)), 'money')
+], {'department': department.department_names})
+# Columns of keyset pagination differing from the field column. Salary is
+# compared rounded as in response, so rows of equal salary in response are
+# ordered by employee id (float salary may be stored with more decimals).
+KEYSET_COLUMNS = {
+    'salary': func.round(Employee.salary, 2)
+}
+# Merge of statistics of inserted employees into statistics of their group.
+STATS_MERGES = {
+    'headcount': lambda current, inserted: current + inserted,
+    'salary_sum': lambda current, inserted: current + inserted,
+    'salary_min': lambda current, inserted: case(
+        [(inserted < current, inserted)], else_=current),
+    'salary_max': lambda current, inserted: case(
+        [(inserted > current, inserted)], else_=current)
+}
+# Precision of stored salary
+STATS_PRECISION = 0.01
+# Departments whose employees are read by one UNION ALL statement, below the
+# limit of compound select terms of SQLite (500)
+EXPAND_DEPARTMENTS_PER_QUERY = 100
+
+
+@read_replica
+def get_employee(employee_id, fields=None):
+    """Get the employee details against the given employee id. Details are
+    cached with all fields, and projected to the requested fields. Department
+    name is read from the cached department, which versions the details
+    along with the employee.
     :param employee_id: int - Unique identification of employee.
+    :param fields: list - Fields of response, all fields when None.
     :return: Employee details against the given employee id.
     :raises: sqlalchemy exceptions.
     """
     try:
-        result_set = session.query(
-            Employee, department.Department.name
-        ).join(
-            department.Department,
-            Employee.department_id == department.Department.department_id
-        ).filter(
-            Employee.employee_id == employee_id
-        ).one()
-        result = {
-            'employee': {
-                'address': result_set[0].address,
-                'date_of_joining': str(result_set[0].date_of_joining),
-                'department': result_set[1],
-                'employee_id': result_set[0].employee_id,
-                'gender': result_set[0].gender,
-                'name': result_set[0].name,
-                'salary': float(str("%0.2f" % result_set[0].salary))
-            }
-        }
-        return response.Response(result)
+        result = employee_by_id(employee_id)
+        if result is None:
+            raise NoResultFound
+        department_name = None
+        if fields is None or 'department' in fields:
+            department_detail = department.department_by_id(
+                result['department_id'])
+            if department_detail is not None:
+                department_name = department_detail['name']
+        return response.Response({'employee': serializer.project(
+            cached_employee_detail(result, department_name), fields)})
     except NoResultFound:
         return response.create_not_found_response(
             constants.ERROR_MESSAGE_NOT_FOUND.format(
@@ -74,6 +147,220 @@ def get_employee(employee_id):
             constants.ERROR_MESSAGE_INTERNAL_ERROR)
 
 
+@read_replica
+def get_employees_by_ids(employee_ids, fields=None):
+    """Get the employees details against the given employee ids, in order of
+    ids. Employees not cached are read by IN query of each chunk of ids.
+    :param employee_ids: list - Unique identification of employees.
+    :param fields: list - Fields of response, all fields when None.
+    :return: Employees details, with not found status for missing ids.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        generation.check_cache(Employee.__tablename__)
+        results = {}
+        missing_ids = []
+        for employee_id in set(employee_ids):
+            result = cache.entity_cache.get('employee', employee_id)
+            if result is None:
+                missing_ids.append(employee_id)
+            else:
+                results[employee_id] = result
+        results.update(fill_employees(missing_ids))
+        with_department = fields is None or 'department' in fields
+        if with_department:
+            department.department_names.load()
+            department.department_names.ensure(
+                result['department_id'] for result in results.values())
+        employees = [
+            serializer.project(cached_employee_detail(
+                results[employee_id],
+                department.department_names.value(
+                    results[employee_id]['department_id'])
+                if with_department else None), fields)
+            if employee_id in results else {
+                'employee_id': employee_id,
+                'status': constants.MULTI_GET_STATUS_NOT_FOUND}
+            for employee_id in employee_ids]
+        return response.Response({
+            'employees': employees,
+            'total_records': len([
+                employee_id for employee_id in employee_ids
+                if employee_id in results])
+        })
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+@read_replica
+def get_department_employees(department_ids, expand, employees_limit):
+    """Get the employees and / or number of employees of each of the given
+    departments, for expanded department details. Counts are read by single
+    grouped query. Employees are read by single UNION ALL of limited query of
+    each department (in order of date of joining), each served by the
+    department and date of joining index.
+    :param department_ids: list - Unique identification of departments.
+    :param expand: list - employees and / or employee_count.
+    :param employees_limit: int - Maximum number of employees of department.
+    :return: Expanded fields of each department id.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        department_ids = sorted(set(department_ids))
+        expansions = {department_id: {} for department_id in department_ids}
+        if not department_ids:
+            return response.Response(expansions)
+        if 'employee_count' in expand:
+            counts = dict(session.execute(select([
+                Employee.department_id, func.count(Employee.employee_id)
+            ]).where(
+                Employee.department_id.in_(department_ids)
+            ).group_by(
+                Employee.department_id
+            )).fetchall())
+            for department_id in department_ids:
+                expansions[department_id]['employee_count'] = \
+                    counts.get(department_id, 0)
+        if 'employees' in expand:
+            # Department is the expanded department, it is not repeated.
+            columns = LIST_COLUMNS.select([
+                field for field in constants.RESPONSE_FIELDS['employee']
+                if field != 'department'])
+            encoder = LIST_COLUMNS.encoder(columns)
+            rows = {department_id: [] for department_id in department_ids}
+            for start in range(
+                    0, len(department_ids), EXPAND_DEPARTMENTS_PER_QUERY):
+                for row in session.execute(union_all(*[
+                    select(
+                        [column.label(name) for name, column, kind in columns]
+                        + [Employee.department_id.label('expand_department')]
+                    ).where(
+                        Employee.department_id == department_id
+                    ).order_by(
+                        Employee.date_of_joining, Employee.employee_id
+                    ).limit(
+                        employees_limit
+                    ).alias().select()
+                    for department_id in department_ids[
+                        start:start + EXPAND_DEPARTMENTS_PER_QUERY]])):
+                    rows[row[-1]].append(row)
+            for department_id in department_ids:
+                expansions[department_id]['employees'] = serializer.Rows(
+                    sorted(rows[department_id], key=lambda row: (
+                        row['date_of_joining'], row['employee_id'])),
+                    encoder)
+        return response.Response(expansions)
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def employee_by_id(employee_id):
+    """Get the cached employee details from cache, otherwise from database
+    and cache them.
+    :param employee_id: int - Unique identification of employee.
+    :return: mixed - Cached employee details or None if not found.
+    :raises: sqlalchemy exceptions.
+    """
+    generation.check_cache(Employee.__tablename__)
+    result = cache.entity_cache.get('employee', employee_id)
+    if result is None:
+        result = fill_employees([int(employee_id)]).get(int(employee_id))
+    return result
+
+
+@read_primary
+def fill_employees(employee_ids):
+    """Get the employees details from primary, by IN query of each chunk of
+    ids, and cache them unless they were invalidated during the read or are
+    read in transaction of batch, not committed yet. Department name is
+    looked up by department id, so rename of department needs no
+    invalidation of its employees.
+    :param employee_ids: list - Unique identification of employees.
+    :return: dict - Cached employee details by id of found employees.
+    :raises: sqlalchemy exceptions.
+    """
+    results = {}
+    tokens = {employee_id: cache.entity_cache.fill_token(
+        'employee', employee_id) for employee_id in employee_ids}
+    for start in range(0, len(employee_ids), configs.MULTI_GET_CHUNK_SIZE):
+        for result_set in session.query(
+            Employee.address, Employee.date_of_joining,
+            Employee.department_id, Employee.employee_id,
+            Employee.gender, Employee.name, Employee.salary,
+            Employee.version, Employee.updated_at
+        ).filter(Employee.employee_id.in_(
+                employee_ids[start:start + configs.MULTI_GET_CHUNK_SIZE])):
+            result = employee_cache_detail(result_set)
+            if not session.info.get('batch'):
+                cache.entity_cache.set(
+                    'employee', result_set.employee_id, result,
+                    tokens[result_set.employee_id])
+            results[result_set.employee_id] = result
+    return results
+
+
+def employee_cache_detail(result_set):
+    """Returns cached employee details of the employee object or row, with
+    department id instead of department name, and version and last modified
+    date of the details.
+    :param result_set: obj - Employee object or row.
+    :return: dict
+    """
+    return {
+        'address': result_set.address,
+        'date_of_joining': str(result_set.date_of_joining),
+        'department_id': result_set.department_id,
+        'employee_id': result_set.employee_id,
+        'gender': result_set.gender,
+        'name': result_set.name,
+        'salary': float(str("%0.2f" % result_set.salary)),
+        'version': result_set.version,
+        'updated_at': cache.timestamp(result_set.updated_at)
+    }
+
+
+@read_replica
+def get_employee_version(employee_id):
+    """Get the entity tag and last modified date of the employee details
+    against the given employee id, from the cached employee and department
+    the employee is served from, so the tag is not newer than the details.
+    Department version is included, as details have the department name.
+    :param employee_id: int - Unique identification of employee.
+    :return: mixed - (entity tag, last modified) or None if not found.
+    :raises: sqlalchemy exceptions.
+    """
+    result = employee_by_id(employee_id)
+    if result is None:
+        return None
+    department_detail = department.department_by_id(result['department_id'])
+    if department_detail is None:
+        return None
+    return 'employee-{id}-{version}-{department_version}'.format(
+        id=int(employee_id), version=result['version'],
+        department_version=department_detail['version']), \
+        cache.from_timestamp(max(
+            result['updated_at'], department_detail['updated_at']))
+
+
+def cached_employee_detail(result, department_name):
+    """Returns employee details of the cached employee with department name.
+    :param result: dict - Cached employee details with department id.
+    :param department_name: str - Name of department of employee.
+    :return: dict
+    """
+    return {
+        'address': result['address'],
+        'date_of_joining': result['date_of_joining'],
+        'department': department_name,
+        'employee_id': result['employee_id'],
+        'gender': result['gender'],
+        'name': result['name'],
+        'salary': result['salary']
+    }
+
+
 def delete_employee(employee_id):
     """Delete the employee details against the given employee id.
     :param employee_id: int - Unique identification of employee.
@@ -81,10 +368,19 @@ def delete_employee(employee_id):
     :raises: sqlalchemy exceptions.
     """
     try:
+        # Row is locked until commit, so concurrent delete does not remove
+        # the employee from statistics again.
         result_set = session.query(Employee). \
-            filter(Employee.employee_id == employee_id).one()
+            filter(Employee.employee_id == employee_id). \
+            with_for_update().one()
         session.delete(result_set)
+        session.flush()
+        remove_stats(result_set.department_id, result_set.gender,
+                     result_set.salary)
+        generation.bump(Employee.__tablename__)
         session.commit()
+        counting.invalidate(Employee.__tablename__)
+        cache.entity_cache.invalidate('employee', employee_id)
         return response.Response(message=constants.DELETE_MESSAGE.format(
             module='Employee', title='employee id', id=employee_id))
     except NoResultFound:
@@ -97,29 +393,297 @@ def delete_employee(employee_id):
 
 
 def post_employee(payload):
-    """Add an employee details.
+    """Add an employee details. Details are returned from the inserted values
+    and the cached department name, without reading the employee back.
     :param payload: json - Employee details.
     :return: Employee details added against the given data.
     :raises: sqlalchemy exceptions.
     """
     try:
-        employee = Employee(
-            address=payload.get('address'),
-            date_of_joining=payload.get('date_of_joining'),
-            department_id=payload.get('department_id'),
-            gender=payload.get('gender'),
-            name=payload.get('name'),
-            salary=payload.get('salary')
-        )
-        session.add(employee)
+        department_detail = department.department_by_id(
+            int(payload.get('department_id')))
+        if department_detail is None:
+            raise NoResultFound
+        employee = employee_row(payload)
+        inserted = session.execute(
+            Employee.__table__.insert().values(employee))
+        add_stats([(employee['department_id'], employee['gender'],
+                    employee['salary'])])
+        generation.bump(Employee.__tablename__)
         session.commit()
-        # Get employee details via get_employee() using last inserted id.
-        return get_employee(employee.employee_id)
+        counting.invalidate(Employee.__tablename__)
+        return response.Response({'employee': cached_employee_detail({
+            'address': employee['address'],
+            'date_of_joining': str(employee['date_of_joining']),
+            'employee_id': inserted.inserted_primary_key[0],
+            'gender': employee['gender'],
+            'name': employee['name'],
+            'salary': serializer.money(employee['salary'])
+        }, department_detail['name'])})
+    except NoResultFound:
+        return response.create_not_found_response(
+            constants.ERROR_MESSAGE_NOT_FOUND.format(
+                title='department id', id=payload.get('department_id')))
     except(exc.SQLAlchemyError, exc.DBAPIError):
+        session.rollback()
         return response.create_fatal_response(
             constants.ERROR_MESSAGE_INTERNAL_ERROR)
 
 
+def post_employees(items, rejected, chunk_size):
+    """Add the employees detail in chunks. Each chunk is inserted by single
+    multi-row INSERT in its own transaction.
+    :param items: list - (index, payload) of validated employee details.
+    :param rejected: list - Status of items rejected by validation.
+    :param chunk_size: int - Number of employees inserted per transaction.
+    :return: Status of each item of request.
+    """
+    result = list(rejected)
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        invalid = []
+        rows = []
+        try:
+            department_ids = existing_department_ids(chunk)
+            for index, payload in chunk:
+                if int(payload.get('department_id')) not in department_ids:
+                    invalid.append({
+                        'index': index,
+                        'status': constants.BULK_STATUS_INVALID,
+                        'errors': [constants.ERROR_MESSAGE_NOT_FOUND.format(
+                            title='department id',
+                            id=payload.get('department_id'))]})
+                    continue
+                rows.append((index, employee_row(payload)))
+            result.extend(invalid)
+            if not rows:
+                continue
+            inserted = session.execute(Employee.__table__.insert().values(
+                [row for index, row in rows]))
+            first_id = dialect.get_dialect(session).first_inserted_id(
+                inserted, len(rows))
+            add_stats((row['department_id'], row['gender'], row['salary'])
+                      for index, row in rows)
+            generation.bump(Employee.__tablename__)
+            session.commit()
+            result.extend({
+                'index': index,
+                'status': constants.BULK_STATUS_CREATED,
+                'employee_id': first_id + offset
+            } for offset, (index, row) in enumerate(rows))
+        except (exc.SQLAlchemyError, exc.DBAPIError):
+            session.rollback()
+            result.extend({
+                'index': index,
+                'status': constants.BULK_STATUS_FAILED,
+                'errors': [constants.ERROR_MESSAGE_INTERNAL_ERROR]
+            } for index, row in rows or chunk)
+    counting.invalidate(Employee.__tablename__)
+    return response.Response({
+        'employees': sorted(result, key=lambda item: item['index']),
+        'total_created': len([
+            item for item in result
+            if item['status'] == constants.BULK_STATUS_CREATED])
+    })
+
+
+def import_employees(items):
+    """Insert or update the employees of import batch in single transaction.
+    Employees with employee_id are upserted, others are inserted.
+    :param items: list - (line number, payload) of validated employees.
+    :return: tuple - Number of imported employees and (line number, errors)
+    of rejected employees.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        department_ids = existing_department_ids(items)
+        new_rows = []
+        existing_rows = []
+        rejected = []
+        for line_number, payload in items:
+            if int(payload.get('department_id')) not in department_ids:
+                rejected.append((line_number, [
+                    constants.ERROR_MESSAGE_NOT_FOUND.format(
+                        title='department id',
+                        id=payload.get('department_id'))]))
+                continue
+            row = employee_row(payload)
+            if payload.get('employee_id') is None:
+                new_rows.append(row)
+            else:
+                row['employee_id'] = int(payload.get('employee_id'))
+                existing_rows.append(row)
+        # Statistics of previous departments of upserted employees change too.
+        department_ids = employee_department_ids(Employee.employee_id.in_(
+            [row['employee_id'] for row in existing_rows])) \
+            if existing_rows else set()
+        if new_rows:
+            session.execute(Employee.__table__.insert().values(new_rows))
+        if existing_rows:
+            dialect.get_dialect(session).upsert(
+                session, Employee.__table__, existing_rows)
+        refresh_stats(department_ids | set(
+            row['department_id'] for row in existing_rows))
+        add_stats((row['department_id'], row['gender'], row['salary'])
+                  for row in new_rows)
+        generation.bump(Employee.__tablename__)
+        session.commit()
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        session.rollback()
+        raise
+    counting.invalidate(Employee.__tablename__)
+    cache.entity_cache.invalidate(
+        'employee', *[row['employee_id'] for row in existing_rows])
+    return len(new_rows) + len(existing_rows), rejected
+
+
+def existing_department_ids(items):
+    """Returns department ids of the given employees found in database, to
+    reject employees of missing department before insert, so foreign key
+    error does not fail the whole batch.
+    :param items: list - (index, payload) of employees.
+    :return: set
+    :raises: sqlalchemy exceptions.
+    """
+    return set(
+        department_id for department_id, in session.query(
+            department.Department.department_id
+        ).filter(
+            department.Department.department_id.in_(set(
+                int(payload.get('department_id'))
+                for index, payload in items))
+        ))
+
+
+def employee_department_ids(*criteria):
+    """Returns department ids of the employees matching criteria, whose
+    statistics change when the employees are written.
+    :param criteria: obj - SQLAlchemy clauses.
+    :return: set
+    :raises: sqlalchemy exceptions.
+    """
+    return set(
+        department_id for department_id, in session.query(
+            Employee.department_id
+        ).filter(*criteria).distinct())
+
+
+def employee_stats_row(employee_id):
+    """Returns department id, gender and salary of the employee, whose
+    statistics group changes when the employee is written. Row is locked
+    until commit, so concurrent writes of the employee do not both remove
+    the same old values from its group.
+    :param employee_id: int - Unique identification of employee.
+    :return: tuple - None if employee is not found.
+    :raises: sqlalchemy exceptions.
+    """
+    return session.query(
+        Employee.department_id, Employee.gender, Employee.salary
+    ).filter(Employee.employee_id == employee_id).with_for_update().first()
+
+
+def add_stats(rows):
+    """Add the employees to statistics of their department and gender, by
+    single INSERT ... ON CONFLICT/DUPLICATE KEY UPDATE adding to headcount
+    and salary sum of each group, so employees of the departments are not
+    read.
+    :param rows: iterable - (department_id, gender, salary) of employees.
+    :raises: sqlalchemy exceptions.
+    """
+    groups = {}
+    for department_id, gender, salary in rows:
+        key = (int(department_id), gender)
+        salary = float(salary)
+        if key in groups:
+            headcount, salary_sum, salary_min, salary_max = groups[key]
+            groups[key] = (headcount + 1, salary_sum + salary,
+                           min(salary_min, salary), max(salary_max, salary))
+        else:
+            groups[key] = (1, salary, salary, salary)
+    if not groups:
+        return
+    dialect.get_dialect(session).merge(session, EmployeeStats.__table__, [{
+        'department_id': department_id,
+        'gender': gender,
+        'headcount': headcount,
+        'salary_sum': salary_sum,
+        'salary_min': salary_min,
+        'salary_max': salary_max
+    } for (department_id, gender), (
+        headcount, salary_sum, salary_min, salary_max
+    ) in sorted(groups.items())], STATS_MERGES)
+
+
+def remove_stats(department_id, gender, salary):
+    """Remove the employee from statistics of its department and gender, by
+    subtracting from headcount and salary sum of the group. Minimum and
+    maximum salary are recomputed from employees of the group only when the
+    removed salary is the group minimum or maximum.
+    :param department_id: int - Department of removed employee.
+    :param gender: str - Gender of removed employee.
+    :param salary: float - Salary of removed employee.
+    :raises: sqlalchemy exceptions.
+    """
+    stats_table = EmployeeStats.__table__
+    group = and_(stats_table.c.department_id == department_id,
+                 stats_table.c.gender == gender)
+    stats = session.execute(select([
+        stats_table.c.headcount, stats_table.c.salary_min,
+        stats_table.c.salary_max
+    ]).where(group).with_for_update()).first()
+    if stats is None:
+        return
+    values = {
+        'headcount': stats_table.c.headcount - 1,
+        'salary_sum': stats_table.c.salary_sum - float(salary)
+    }
+    # Salaries are stored rounded to cents, so a group extreme within a cent
+    # of the removed salary may be the removed salary itself.
+    if stats.headcount > 1 and (
+            stats.salary_min > float(salary) - STATS_PRECISION or
+            stats.salary_max < float(salary) + STATS_PRECISION):
+        values['salary_min'], values['salary_max'] = session.execute(select([
+            func.min(Employee.salary), func.max(Employee.salary)
+        ]).where(and_(
+            Employee.department_id == department_id,
+            Employee.gender == gender
+        )).with_for_update(read=True)).first()
+    if stats.headcount <= 1 or values.get('salary_min', 0) is None:
+        session.execute(stats_table.delete().where(group))
+    else:
+        session.execute(stats_table.update().where(group).values(values))
+
+
+def refresh_stats(department_ids=None):
+    """Recompute statistics of employees of the given departments in current
+    transaction, from employees of the departments read by department index.
+    Statistics of all departments are rebuilt when no department is given.
+    :param department_ids: iterable - Department ids or None for all.
+    :return: int - Number of statistics groups.
+    :raises: sqlalchemy exceptions.
+    """
+    stats_table = EmployeeStats.__table__
+    statement = select([
+        Employee.department_id, Employee.gender,
+        func.count(Employee.employee_id), func.sum(Employee.salary),
+        func.min(Employee.salary), func.max(Employee.salary)
+    ]).group_by(
+        Employee.department_id, Employee.gender
+    )
+    delete = stats_table.delete()
+    if department_ids is not None:
+        department_ids = set(department_ids)
+        if not department_ids:
+            return 0
+        statement = statement.where(
+            Employee.department_id.in_(department_ids))
+        delete = delete.where(stats_table.c.department_id.in_(department_ids))
+    session.execute(delete)
+    return session.execute(stats_table.insert().from_select([
+        'department_id', 'gender', 'headcount', 'salary_sum', 'salary_min',
+        'salary_max'], statement)).rowcount
+
+
 def put_employee(employee_id, payload):
     """Update the employee details against the given employee id.
     :param employee_id: int - Unique identification of employee.
@@ -128,19 +692,67 @@ def put_employee(employee_id, payload):
     :raises: sqlalchemy exceptions.
     """
     try:
-        employee = {
-            'address': payload.get('address'),
-            'date_of_joining': payload.get('date_of_joining'),
-            'department_id': payload.get('department_id'),
-            'gender': payload.get('gender'),
-            'name': payload.get('name'),
-            'salary': payload.get('salary')
-        }
+        employee = employee_row(payload)
+        stats_row = employee_stats_row(employee_id)
         affected_row = session.query(Employee).filter(
             Employee.employee_id == employee_id).update(employee)
         if not affected_row:
             raise NoResultFound
+        remove_stats(*stats_row)
+        add_stats([(employee['department_id'], employee['gender'],
+                    employee['salary'])])
+        generation.bump(Employee.__tablename__)
+        session.commit()
+        counting.invalidate(Employee.__tablename__)
+        cache.entity_cache.invalidate('employee', employee_id)
+        return response.Response(message=constants.UPDATE_MESSAGE.format(
+            module='Employee', title='employee id', id=employee_id))
+    except NoResultFound:
+        return response.create_not_found_response(
+            constants.ERROR_MESSAGE_NOT_FOUND.format(
+                title='employee id', id=employee_id))
+    except(exc.SQLAlchemyError, exc.DBAPIError):
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def patch_employee(employee_id, payload):
+    """Update the given fields of the employee against the given employee id.
+    UPDATE matches only when any of the fields changed, so unchanged details
+    are not written.
+    :param employee_id: int - Unique identification of employee.
+    :param payload: json - Employee fields to update.
+    :return: Success message on update of employee details.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        if 'department_id' in payload and department.department_by_id(
+                int(payload.get('department_id'))) is None:
+            return response.create_not_found_response(
+                constants.ERROR_MESSAGE_NOT_FOUND.format(
+                    title='department id', id=payload.get('department_id')))
+        employee = employee_values(payload)
+        stats_row = employee_stats_row(employee_id)
+        affected_row = session.query(Employee).filter(
+            Employee.employee_id == employee_id,
+            dialect.changed_values(Employee, employee)
+        ).update(employee, synchronize_session=False)
+        if not affected_row:
+            session.rollback()
+            if not session.query(Employee.employee_id).filter(
+                    Employee.employee_id == employee_id).first():
+                raise NoResultFound
+            return response.Response(
+                message=constants.UNCHANGED_MESSAGE.format(
+                    module='Employee', title='employee id', id=employee_id))
+        remove_stats(*stats_row)
+        add_stats([(employee.get('department_id', stats_row.department_id),
+                    employee.get('gender', stats_row.gender),
+                    employee.get('salary', stats_row.salary))])
+        generation.bump(Employee.__tablename__)
         session.commit()
+        counting.invalidate(Employee.__tablename__)
+        cache.entity_cache.invalidate('employee', employee_id)
         return response.Response(message=constants.UPDATE_MESSAGE.format(
             module='Employee', title='employee id', id=employee_id))
     except NoResultFound:
@@ -148,10 +760,113 @@ def put_employee(employee_id, payload):
             constants.ERROR_MESSAGE_NOT_FOUND.format(
                 title='employee id', id=employee_id))
     except(exc.SQLAlchemyError, exc.DBAPIError):
+        session.rollback()
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def patch_employees(filter_data, payload):
+    """Update the given fields of employees selected by ids or search filter
+    with single UPDATE statement.
+    :param filter_data: dict - ids or search_by and search_for.
+    :param payload: json - Employee fields to update.
+    :return: Number of updated employees.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        if 'department_id' in payload and not session.query(
+                department.Department.department_id).filter(
+                department.Department.department_id ==
+                payload.get('department_id')).first():
+            raise NoResultFound
+        employee = employee_values(payload)
+        department_ids = employee_department_ids(
+            *fields_for_bulk_write(filter_data))
+        if 'department_id' in employee and department_ids:
+            department_ids.add(int(employee['department_id']))
+        affected_rows = session.query(Employee).filter(
+            *fields_for_bulk_write(filter_data)
+        ).update(employee, synchronize_session=False)
+        refresh_stats(department_ids)
+        generation.bump(Employee.__tablename__)
+        session.commit()
+        counting.invalidate(Employee.__tablename__)
+        invalidate_cache(filter_data)
+        return response.Response({'affected_rows': affected_rows})
+    except NoResultFound:
+        return response.create_not_found_response(
+            constants.ERROR_MESSAGE_NOT_FOUND.format(
+                title='department id', id=payload.get('department_id')))
+    except(exc.SQLAlchemyError, exc.DBAPIError):
+        session.rollback()
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def delete_employees(filter_data):
+    """Delete the employees selected by ids or search filter with single
+    DELETE statement.
+    :param filter_data: dict - ids or search_by and search_for.
+    :return: Number of deleted employees.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        department_ids = employee_department_ids(
+            *fields_for_bulk_write(filter_data))
+        affected_rows = session.query(Employee).filter(
+            *fields_for_bulk_write(filter_data)
+        ).delete(synchronize_session=False)
+        refresh_stats(department_ids)
+        generation.bump(Employee.__tablename__)
+        session.commit()
+        counting.invalidate(Employee.__tablename__)
+        invalidate_cache(filter_data)
+        return response.Response({'affected_rows': affected_rows})
+    except(exc.SQLAlchemyError, exc.DBAPIError):
+        session.rollback()
         return response.create_fatal_response(
             constants.ERROR_MESSAGE_INTERNAL_ERROR)
 
 
+def invalidate_cache(filter_data):
+    """Remove cached details of employees selected by ids, otherwise of all
+    employees as search filter may select any of them.
+    :param filter_data: dict - ids or search_by and search_for.
+    """
+    if filter_data.get('ids'):
+        cache.entity_cache.invalidate('employee', *[
+            int(employee_id)
+            for employee_id in filter_data.get('ids').split(',')])
+    else:
+        cache.entity_cache.invalidate_all('employee')
+
+
+def employee_row(payload):
+    """Returns column values of all employee fields of request, converted to
+    python types of the columns as they are stored, so details returned
+    without reading the employee back are the stored ones.
+    :param payload: json - Employee details.
+    :return: dict
+    """
+    return {field: dialect.stored_value(getattr(Employee, field),
+                                        payload.get(field))
+            for field in constants.VALIDATION_EMPLOYEE_PATCH['fields']}
+
+
+def employee_values(payload):
+    """Returns column values of the employee fields given in request.
+    :param payload: json - Employee fields.
+    :return: dict
+    """
+    values = {}
+    for field in constants.VALIDATION_EMPLOYEE_PATCH['fields']:
+        if field in payload:
+            values[field] = dialect.stored_value(
+                getattr(Employee, field), payload.get(field))
+    return values
+
+
+@read_replica
 def get_employees(filter_data):
     """Get the employees detail against the given filter request.
     :param filter_data: dict - Data for filter the result.
@@ -159,85 +874,311 @@ def get_employees(filter_data):
     (sort / search / paginate).
     :raises: sqlalchemy exceptions.
     """
+    if filter_data.get('cursor') is not None:
+        return get_employees_by_cursor(filter_data)
     try:
-        result = []
-        result_set = session.query(
-            Employee, department.Department.name
-        ).prefix_with(
-            'SQL_CALC_FOUND_ROWS'
-        ).join(
-            department.Department,
-            Employee.department_id == department.Department.department_id
-        ).filter(
-            *fields_for_search(filter_data)
-        ).order_by(
+        department.department_names.load()
+        page_size = int(filter_data.get('page_size'))
+        offset = (int(filter_data.get('page')) - 1) * page_size
+        columns = LIST_COLUMNS.select(
+            serializer.requested_fields(filter_data.get('fields')))
+        statement = select(
+            [column for name, column, kind in columns]
+        ).where(
+            and_(*fields_for_search(filter_data))
+        )
+        # Fetch one extra row to know whether next page exists.
+        result_set = session.execute(statement.order_by(
             *fields_for_sort(filter_data)
         ).offset(
-            (int(filter_data.get('page')) - 1) *
-            int(filter_data.get('page_size'))
+            offset
         ).limit(
-            filter_data.get('page_size')
-        ).all()
+            page_size + 1
+        )).fetchall()
+        ensure_department_names(result_set, columns)
+        result = serializer.Rows(
+            result_set[:page_size], LIST_COLUMNS.encoder(columns))
+        has_more = len(result_set) > page_size
         # Calculate total number of records after filter data.
-        total_rows = session.execute('SELECT FOUND_ROWS()').scalar()
-        for employee in result_set:
-            result.append({
-                'employee_id': employee[0].employee_id,
-                'name': employee[0].name,
-                'department': employee[1],
-                'date_of_joining': str(employee[0].date_of_joining),
-                'gender': employee[0].gender,
-                'address': employee[0].address,
-                'salary': float(str("%0.2f" % employee[0].salary))
-            })
+        total_rows = counting.total_records(
+            session, statement, Employee, filter_data, offset, len(result),
+            has_more)
         employees = {
             'employees': result,
             'page': int(filter_data.get('page')),
-            'page_size':
-                int(filter_data.get('page_size')),
-            'total_pages': math.ceil(
-                total_rows / int(filter_data.get('page_size'))) or None,
+            'page_size': page_size,
+            'total_pages':
+                math.ceil(total_rows / page_size) if total_rows else None,
             'total_records': total_rows or None,
+            'total_records_per_page': len(result) or None,
+            'has_more': has_more
+        }
+        return response.Response(employees)
+    except(exc.SQLAlchemyError, exc.DBAPIError):
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def get_employees_by_cursor(filter_data):
+    """Get the employees detail against the given filter request using keyset
+    pagination. Each page continues after the row encoded in the cursor, so
+    database reads only the rows of the page instead of skipping offset rows.
+    :param filter_data: dict - Data for filter the result.
+    :return: Employees details against given filter data with next cursor.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        department.department_names.load()
+        page_size = int(filter_data.get('page_size'))
+        fields = pagination.keyset_fields(filter_data, 'employee_id')
+        columns = [keyset_column(field) for field, order in fields]
+        orders = [order for field, order in fields]
+        list_columns = LIST_COLUMNS.select(
+            serializer.requested_fields(filter_data.get('fields')))
+        # Sort fields not requested are selected after requested fields, and
+        # keyset columns after them, for the position of last row in next
+        # cursor as compared by database.
+        key_columns = list_columns + LIST_COLUMNS.select([
+            field for field, order in fields
+            if field not in [name for name, column, kind in list_columns]])
+        statement = select(
+            [column for name, column, kind in key_columns] + [
+                column.label('keyset_{index}'.format(index=index))
+                for index, column in enumerate(columns)]
+        ).where(
+            and_(*fields_for_search(filter_data))
+        )
+        if filter_data.get('cursor'):
+            values = pagination.decode_cursor(
+                filter_data.get('cursor'), fields)
+            if values is not None:
+                # Position of department name is its rank.
+                values = [
+                    department.department_names.name_rank(value)
+                    if field == 'department' else value
+                    for (field, order), value in zip(fields, values)]
+            statement = statement.where(pagination.keyset_filter(
+                columns, orders, values))
+            if fields[0][0] == 'salary' \
+                    and isinstance(values[0], (int, float)):
+                statement = statement.where(
+                    salary_bound(orders[0], values[0]))
+        # Fetch one extra row to know whether next page exists.
+        result_set = session.execute(statement.order_by(
+            *pagination.keyset_order(columns, orders)
+        ).limit(
+            page_size + 1
+        )).fetchall()
+        ensure_department_names(result_set, key_columns)
+        result = serializer.Rows(
+            result_set[:page_size], LIST_COLUMNS.encoder(list_columns))
+        next_cursor = None
+        if len(result_set) > page_size:
+            next_cursor = pagination.encode_cursor(fields, cursor_values(
+                result_set[page_size - 1], key_columns, fields))
+        employees = {
+            'employees': result,
+            'page_size': page_size,
+            'next_cursor': next_cursor,
             'total_records_per_page': len(result) or None
         }
         return response.Response(employees)
+    except ValueError:
+        return response.create_error_response(
+            code=constants.ERROR_CODE_BAD_REQUEST,
+            message=constants.ERROR_MESSAGE_INVALID_CURSOR)
     except(exc.SQLAlchemyError, exc.DBAPIError):
         return response.create_fatal_response(
             constants.ERROR_MESSAGE_INTERNAL_ERROR)
 
 
+def keyset_column(field):
+    """Returns column to sort and compare the given field by cursor.
+    :param field: str - Field name.
+    :return: obj - Column or SQL expression.
+    """
+    if field in KEYSET_COLUMNS:
+        return KEYSET_COLUMNS[field]
+    return field_column(field)
+
+
+def salary_bound(order, value):
+    """Returns range of salary column of rows after the cursor salary rounded
+    to 2 decimals, so that database can use index range scan of salary.
+    :param order: str - ASC or DESC.
+    :param value: float - Rounded salary at cursor position.
+    :return: obj - SQLAlchemy clause.
+    """
+    if order == 'DESC':
+        return Employee.salary <= value + 0.01
+    return Employee.salary >= value - 0.01
+
+
+def cursor_values(row, columns, fields):
+    """Returns position of the row in next cursor, the values of keyset
+    columns selected after the given columns, and name of department (whose
+    position is its rank at the time of next request).
+    :param row: tuple - Row of the columns and keyset columns.
+    :param columns: list - (name, column, kind) of each value of row.
+    :param fields: list - (field, order) pairs.
+    :return: list
+    """
+    names = [name for name, column, kind in columns]
+    values = []
+    for index, (field, order) in enumerate(fields):
+        value = row[len(columns) + index]
+        if field == 'department':
+            value = department.department_names.value(
+                row[names.index(field)])
+        elif isinstance(value, datetime.date):
+            value = value.isoformat()
+        values.append(value)
+    return values
+
+
+def ensure_department_names(rows, columns):
+    """Ensure department names of the rows are in department names, when
+    department is selected.
+    :param rows: list - Rows of the given columns.
+    :param columns: list - (name, column, kind) of each value of row.
+    """
+    names = [name for name, column, kind in columns]
+    if 'department' in names:
+        index = names.index('department')
+        department.department_names.ensure(row[index] for row in rows)
+
+
+@read_replica
+def export_employees(filter_data):
+    """Export the employees detail against the given filter request. Rows are
+    read through server side cursor and streamed in batches.
+    :param filter_data: dict - Data for filter the result and export format.
+    :return: Generator of export chunks.
+    :raises: sqlalchemy exceptions.
+    """
+    connection = None
+    try:
+        # Departments are not looked up again while rows are streamed.
+        department.department_names.refresh()
+        connection = session.get_bind().connect()
+        result = connection.execute(select([
+            Employee.employee_id, Employee.name, Employee.department_id,
+            Employee.date_of_joining, Employee.gender, Employee.address,
+            Employee.salary
+        ]).where(
+            and_(*fields_for_search(filter_data))
+        ).order_by(
+            *fields_for_sort(filter_data)
+        ).execution_options(
+            stream_results=True
+        ))
+        return response.Response(export.stream(
+            connection, result, constants.EXPORT_EMPLOYEE_FIELDS,
+            employee_row_detail, filter_data.get('format'),
+            configs.EXPORT_BATCH_SIZE))
+    except(exc.SQLAlchemyError, exc.DBAPIError):
+        if connection is not None:
+            connection.close()
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def employee_row_detail(row):
+    """Returns employee details of the employee columns row.
+    :param row: tuple - Employee columns with department id.
+    :return: dict
+    """
+    return {
+        'employee_id': row[0],
+        'name': row[1],
+        'department': department.department_names.value(row[2]),
+        'date_of_joining': str(row[3]),
+        'gender': row[4],
+        'address': row[5],
+        'salary': float(str("%0.2f" % row[6]))
+    }
+
+
+def field_column(field):
+    """Returns column for the given field of employee details.
+    :param field: str - Field name.
+    :return: obj - Column.
+    """
+    if field == 'department':
+        return department.department_names.rank_column(Employee.department_id)
+    return getattr(Employee, field)
+
+
 def fields_for_sort(filter_data):
     """Returns list of fields with order to sort result by given request.
+    Relevance is relevance of full text search of the search filter.
     :param filter_data: dict - Data for filter the result.
     :return: list
     """
     fields_to_sort = [None]
     if filter_data.get('sort_by') and filter_data.get('order_by'):
         fields_to_sort = \
-            [desc(department.Department.name) if v == 'DESC'
-             else asc(department.Department.name) if k == 'department'
-             else desc(getattr(Employee, k)) if v == 'DESC'
-             else asc(getattr(Employee, k))
-             for k, v in dict(zip(
-                 filter_data.get('sort_by').split(','),
-                 filter_data.get('order_by').split(','))).items()
-             ]
+            [desc(sort_column(k, filter_data)) if v == 'DESC'
+             else asc(sort_column(k, filter_data))
+             for k, v in pagination.sort_fields(filter_data)]
     return fields_to_sort
 
 
+def sort_column(field, filter_data):
+    """Returns column to sort result by the given field.
+    :param field: str - Field name or relevance.
+    :param filter_data: dict - Data for filter the result.
+    :return: obj - Column or SQL expression.
+    """
+    if field == constants.SORT_BY_RELEVANCE:
+        return dialect.get_dialect(session).relevance(
+            [(getattr(Employee, k), values[0])
+             for k, operator, values in search.search_filters(filter_data)
+             if operator == 'eq'
+             and k in constants.TEXT_SEARCH_FIELDS['employee']])
+    return field_column(field)
+
+
 def fields_for_search(filter_data):
     """Returns list of fields with their value to search result by given request.
+    Text fields are matched by search mode, others by search operator.
     :param filter_data: dict - Data for filter the result.
-    :return: mixed
+    :return: list
+    """
+    search_mode = filter_data.get('search_mode') or 'exact'
+    return [
+        department.department_names.search_clause(
+            Employee.department_id, values)
+        if k == 'department'
+        else dialect.get_dialect(session).search_clause(
+            getattr(Employee, k), values[0], search_mode)
+        if operator == 'eq' and k in constants.TEXT_SEARCH_FIELDS['employee']
+        else search.operator_clause(getattr(Employee, k), operator, values)
+        for k, operator, values in search.search_filters(filter_data)]
+
+
+def fields_for_bulk_write(filter_data):
+    """Returns list of fields to select employees by ids or search filter.
+    Department name is matched by sub query, as UPDATE and DELETE statements
+    run on employee table only.
+    :param filter_data: dict - ids or search_by and search_for.
+    :return: list
     """
-    # where 1 clause added if no fields found to search.
-    fields_to_search = '1'
+    fields_to_search = []
+    if filter_data.get('ids'):
+        fields_to_search.append(Employee.employee_id.in_(
+            [int(employee_id)
+             for employee_id in filter_data.get('ids').split(',')]))
     if filter_data.get('search_by') and filter_data.get('search_for'):
-        fields_to_search = \
-            [department.Department.name == v if k == 'department'
-             else getattr(Employee, k) == v
+        fields_to_search.extend(
+            [Employee.department_id.in_(session.query(
+                department.Department.department_id
+            ).filter(department.Department.name == v).subquery())
+             if k == 'department'
+             else getattr(Employee, k) == dialect.bind_value(
+                 getattr(Employee, k), v)
              for k, v in dict(zip(
                 filter_data.get('search_by').split(','),
                 filter_data.get('search_for').split(','))).items()
-             ]
+             ])
     return fields_to_search
@@ -0,0 +1,113 @@
+"""Table generation model."""
+import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, event
+from mysql_connector import Base, RoutingSession, Session, read_primary, \
+    read_replica
+from src import cache, dialect
+
+
+# Session of current request
+session = Session
+
+
+# Merge of write into generation of table
+GENERATION_MERGES = {
+    'generation': lambda current, inserted: current + 1,
+    'updated_at': lambda current, inserted: inserted
+}
+
+
+class TableGeneration(Base):
+    """Change generation of table, incremented on every write of table."""
+    __tablename__ = 'table_generation'
+
+    table_name = Column(String(64), primary_key=True, nullable=False)
+    generation = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return "<TableGeneration(table_name='%s', generation=%s, " \
+            "updated_at='%s')>" % (self.table_name, self.generation,
+                                   self.updated_at)
+
+
+def bump(*tables):
+    """Increment generation of the given tables in current transaction, so
+    generation changes only when the write is committed. Generation row of
+    table never written is inserted by the same statement, so concurrent
+    first writes do not race. Generations written are read back in the
+    transaction, which holds their rows, so in process cache does not take
+    them for writes of other processes once committed.
+    :param tables: str - Table names.
+    :raises: sqlalchemy exceptions.
+    """
+    now = datetime.datetime.utcnow()
+    dialect.get_dialect(session).merge(session, TableGeneration.__table__, [{
+        'table_name': table,
+        'generation': 1,
+        'updated_at': now
+    } for table in sorted(set(tables))], GENERATION_MERGES)
+    if cache.entity_cache.checks_generations():
+        session.info.setdefault('generations', []).extend(session.query(
+            TableGeneration.table_name, TableGeneration.generation
+        ).filter(TableGeneration.table_name.in_(tables)))
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def record_generations(committed_session):
+    """Record generations written by committed transaction of the session,
+    not by release of its savepoint (like, operation of batch).
+    :param committed_session: obj - Session.
+    """
+    if committed_session.transaction.parent is None:
+        for table, value in committed_session.info.pop('generations', []):
+            cache.entity_cache.written(table, value)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def discard_generations(rolled_back_session):
+    """Forget generations written by rolled back transaction or savepoint
+    of the session, which are taken for writes of other processes then.
+    :param rolled_back_session: obj - Session.
+    """
+    rolled_back_session.info.pop('generations', None)
+
+
+@read_replica
+def get_generations(tables):
+    """Get the generation of the given tables.
+    :param tables: list - Table names.
+    :return: dict - (generation, updated_at) of each table, (0, None) for
+    table never written.
+    :raises: sqlalchemy exceptions.
+    """
+    generations = {table: (0, None) for table in tables}
+    for result_set in session.query(TableGeneration).filter(
+            TableGeneration.table_name.in_(tables)):
+        generations[result_set.table_name] = \
+            (result_set.generation, result_set.updated_at)
+    return generations
+
+
+def check_cache(table):
+    """Remove in process cached details of the table written by other
+    processes, by its generation read at most once per check interval.
+    :param table: str - Table name, same as its cache model.
+    :raises: sqlalchemy exceptions.
+    """
+    cache.entity_cache.check(table, lambda: primary_generation(table))
+
+
+@read_primary
+def primary_generation(table):
+    """Get the generation of the table from primary, as generation of replica
+    lags behind the writes.
+    :param table: str - Table name.
+    :return: int - 0 for table never written.
+    :raises: sqlalchemy exceptions.
+    """
+    result_set = session.query(TableGeneration.generation).filter(
+        TableGeneration.table_name == table).first()
+    return result_set[0] if result_set is not None else 0
@@ -0,0 +1,127 @@
+"""Employee statistics model. Statistics are aggregated from the summary of
+each department and gender, so reading them costs the number of groups
+instead of the number of employees."""
+from oto import response
+
+from sqlalchemy import exc, func, select
+from sqlalchemy.orm.exc import NoResultFound
+from mysql_connector import Session, read_replica
+from src import constants, serializer
+from src.logic.models import department
+from src.logic.models.employee import EmployeeStats
+
+
+# Session of current request
+session = Session
+
+# Summary columns of each statistics field to group by
+GROUP_BY_COLUMNS = {
+    'department': EmployeeStats.department_id,
+    'gender': EmployeeStats.gender
+}
+# Aggregates of summary of the groups
+AGGREGATES = [
+    func.sum(EmployeeStats.headcount), func.sum(EmployeeStats.salary_sum),
+    func.min(EmployeeStats.salary_min), func.max(EmployeeStats.salary_max)
+]
+
+
+@read_replica
+def get_department_stats(department_id):
+    """Get the statistics of employees of the given department, in total and
+    by gender.
+    :param department_id: int - Unique identification of department.
+    :return: Employee statistics of department.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        department_detail = department.department_by_id(department_id)
+        if department_detail is None:
+            raise NoResultFound
+        result_set = session.execute(select(
+            [EmployeeStats.gender] + AGGREGATES
+        ).where(
+            EmployeeStats.department_id == department_id
+        ).group_by(
+            EmployeeStats.gender
+        ).order_by(
+            EmployeeStats.gender
+        )).fetchall()
+        result = {
+            'department_id': department_detail['department_id'],
+            'department': department_detail['name']
+        }
+        result.update(stats_detail(
+            sum(row[1] for row in result_set),
+            sum(row[2] for row in result_set),
+            min([row[3] for row in result_set], default=None),
+            max([row[4] for row in result_set], default=None)))
+        result['genders'] = [
+            dict({'gender': row[0]}, **stats_detail(*row[1:]))
+            for row in result_set]
+        return response.Response({'stats': result})
+    except NoResultFound:
+        return response.create_not_found_response(
+            constants.ERROR_MESSAGE_NOT_FOUND.format(
+                title='department id', id=department_id))
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+@read_replica
+def get_employee_stats(group_by):
+    """Get the statistics of employees grouped by the given fields, or of
+    all employees when no field is given.
+    :param group_by: list - department and / or gender.
+    :return: Employee statistics of each group.
+    :raises: sqlalchemy exceptions.
+    """
+    try:
+        department.department_names.load()
+        columns = [GROUP_BY_COLUMNS[field] for field in group_by]
+        result_set = session.execute(select(
+            columns + AGGREGATES
+        ).group_by(
+            *columns
+        ).order_by(
+            *columns
+        )).fetchall()
+        if 'department' in group_by:
+            department.department_names.ensure(
+                row[group_by.index('department')] for row in result_set)
+        result = []
+        for row in result_set:
+            detail = {}
+            for field, value in zip(group_by, row):
+                if field == 'department':
+                    detail['department_id'] = value
+                    value = department.department_names.value(value)
+                detail[field] = value
+            detail.update(stats_detail(*row[len(group_by):]))
+            result.append(detail)
+        return response.Response({'stats': result, 'group_by': group_by})
+    except (exc.SQLAlchemyError, exc.DBAPIError):
+        return response.create_fatal_response(
+            constants.ERROR_MESSAGE_INTERNAL_ERROR)
+
+
+def stats_detail(headcount, salary_sum, salary_min, salary_max):
+    """Returns statistics details of the aggregated summary, salary amounts
+    rounded same as salary of employee details.
+    :param headcount: int - Number of employees, None if there is none.
+    :param salary_sum: float - Sum of salaries.
+    :param salary_min: float - Lowest salary.
+    :param salary_max: float - Highest salary.
+    :return: dict
+    """
+    if not headcount:
+        return {'headcount': 0, 'salary_min': None, 'salary_max': None,
+                'salary_avg': None, 'salary_sum': 0.0}
+    return {
+        'headcount': int(headcount),
+        'salary_min': serializer.money(float(salary_min)),
+        'salary_max': serializer.money(float(salary_max)),
+        'salary_avg': serializer.money(float(salary_sum) / int(headcount)),
+        'salary_sum': serializer.money(float(salary_sum))
+    }
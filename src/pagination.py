@@ -0,0 +1,150 @@
+"""Keyset (cursor) pagination."""
+import base64
+import binascii
+import json
+
+from sqlalchemy import and_, or_, asc, desc, false
+from src import dialect
+
+
+def sort_fields(filter_data):
+    """Returns list of fields with their order to sort result by given request.
+    :param filter_data: dict - Data for filter the result.
+    :return: list - (field, order) pairs.
+    """
+    if filter_data.get('sort_by') and filter_data.get('order_by'):
+        return list(dict(zip(
+            filter_data.get('sort_by').split(','),
+            filter_data.get('order_by').split(','))).items())
+    return []
+
+
+def keyset_fields(filter_data, primary_key):
+    """Returns sort fields with primary key as tiebreaker, so every row has
+    unique position in the result.
+    :param filter_data: dict - Data for filter the result.
+    :param primary_key: str - Primary key field of the model.
+    :return: list - (field, order) pairs.
+    """
+    fields = sort_fields(filter_data)
+    if primary_key not in [field for field, order in fields]:
+        fields.append((primary_key, 'ASC'))
+    return fields
+
+
+def signature(fields):
+    """Returns signature of sort fields embedded in the cursor.
+    :param fields: list - (field, order) pairs.
+    :return: str
+    """
+    return ','.join(
+        '{field}:{order}'.format(field=field, order=order)
+        for field, order in fields)
+
+
+def encode_cursor(fields, values):
+    """Encode position of the last row of page as opaque cursor.
+    :param fields: list - (field, order) pairs.
+    :param values: list - Values of the fields for last row of page.
+    :return: str
+    """
+    cursor = json.dumps({'s': signature(fields), 'v': values})
+    return base64.urlsafe_b64encode(
+        cursor.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    """Decode the cursor issued for given sort fields.
+    :param cursor: str - Opaque cursor.
+    :param fields: list - (field, order) pairs.
+    :return: mixed - List of values or None if cursor is invalid.
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(
+            (cursor + padding).encode('ascii')).decode('utf-8'))
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('s') != signature(fields) \
+            or not isinstance(data.get('v'), list) \
+            or len(data.get('v')) != len(fields):
+        return None
+    return data.get('v')
+
+
+def keyset_order(columns, orders):
+    """Returns list of columns with order to sort result.
+    :param columns: list - Columns to sort.
+    :param orders: list - ASC or DESC order of each column.
+    :return: list
+    """
+    return [desc(column) if order == 'DESC' else asc(column)
+            for column, order in zip(columns, orders)]
+
+
+def keyset_filter(columns, orders, values):
+    """Returns clause selecting rows placed after the cursor position.
+    Rows are compared as (c1 > v1) OR (c1 = v1 AND c2 > v2) ..., with a
+    leading bound on the first column so database can use index range scan.
+    NULL values are placed first in ascending order as by MySQL and SQLite.
+    :param columns: list - Columns to sort.
+    :param orders: list - ASC or DESC order of each column.
+    :param values: list - Values of the columns at cursor position.
+    :return: obj - SQLAlchemy clause.
+    :raises: ValueError if cursor is invalid or value can not be converted to
+    column type.
+    """
+    if values is None:
+        raise ValueError('Invalid cursor')
+    values = [dialect.bind_value(column, value)
+              for column, value in zip(columns, values)]
+    clauses = []
+    for index, (column, order, value) in enumerate(
+            zip(columns, orders, values)):
+        clauses.append(and_(
+            *[equal(columns[i], values[i]) for i in range(index)],
+            after(column, order, value)))
+    keyset = or_(*clauses)
+    first_column, first_order, first_value = columns[0], orders[0], values[0]
+    if first_value is not None and not nullable(first_column):
+        bound = first_column <= first_value if first_order == 'DESC' \
+            else first_column >= first_value
+        keyset = and_(bound, keyset)
+    return keyset
+
+
+def equal(column, value):
+    """Returns clause for column equal to value.
+    :param column: obj - Column.
+    :param value: mixed
+    :return: obj - SQLAlchemy clause.
+    """
+    if value is None:
+        return column.is_(None)
+    return column == value
+
+
+def after(column, order, value):
+    """Returns clause for column placed after value in given order.
+    :param column: obj - Column.
+    :param order: str - ASC or DESC.
+    :param value: mixed
+    :return: obj - SQLAlchemy clause.
+    """
+    if order == 'DESC':
+        if value is None:
+            return false()
+        if nullable(column):
+            return or_(column < value, column.is_(None))
+        return column < value
+    if value is None:
+        return column.isnot(None)
+    return column > value
+
+
+def nullable(column):
+    """Returns whether column may be NULL, True for SQL expression.
+    :param column: obj - Column or SQL expression.
+    :return: bool
+    """
+    return getattr(column, 'nullable', True)
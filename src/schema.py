@@ -0,0 +1,146 @@
+"""Request body validators compiled from Swagger specification once at start.
+Each POST, PUT and PATCH route of department and employee gets a closure of
+the fields of its body definition, checking the body in single pass:
+   1) required - Missing fields.
+   2) type integer - Non integer or negative fields.
+   3) enum, format and type number - Invalid value of field, reported by its
+      message of constants.
+PATCH body is checked for unknown fields and null fields (fields without
+x-nullable), and values only of the given fields.
+"""
+import os
+
+import configs
+import yaml
+
+from src import constants
+
+
+def load_spec(path):
+    """Returns Swagger specification, path relative to the application.
+    :param path: str - Specification file path.
+    :return: dict
+    """
+    if not os.path.isabs(path):
+        path = os.path.join(
+            os.path.dirname(os.path.abspath(configs.__file__)), path)
+    with open(path) as spec_file:
+        return yaml.safe_load(spec_file)
+
+
+def compile_body_validators(spec, checks):
+    """Returns validator of request body of each route of the models.
+    :param spec: dict - Swagger specification.
+    :param checks: dict - Function checking value of each field type or
+    format (integer, number, date).
+    :return: dict - Validator by (method, model).
+    """
+    validators = {}
+    for path, operations in spec['paths'].items():
+        model = path.strip('/').split('/')[0]
+        if model not in constants.RESPONSE_FIELDS:
+            continue
+        for method, operation in operations.items():
+            definition = body_definition(spec, operation)
+            if definition is not None:
+                validators[(method.upper(), model)] = compile_body_validator(
+                    definition, method.upper() == 'PATCH', checks)
+    return validators
+
+
+def body_definition(spec, operation):
+    """Returns definition of request body of route, None if its body is not
+    an object definition (like, array of bulk request).
+    :param spec: dict - Swagger specification.
+    :param operation: dict - Route method of specification.
+    :return: dict
+    """
+    for parameter in operation.get('parameters', []):
+        reference = parameter.get('schema', {}).get('$ref')
+        if parameter.get('in') == 'body' and reference:
+            return spec['definitions'][reference.split('/')[-1]]
+    return None
+
+
+def compile_body_validator(definition, partial, checks):
+    """Returns validator of request body of the definition.
+    :param definition: dict - Body definition of specification.
+    :param partial: boolean - Only given fields are checked (PATCH).
+    :param checks: dict - Function checking value of each field type or
+    format.
+    :return: function - Validator returning list of validation messages.
+    """
+    properties = definition.get('properties', {})
+    required = tuple(definition.get('required', []))
+    fields = frozenset(properties)
+    unknown_message = '. request contains {fields}'.format(
+        fields=','.join(properties))
+    not_null_fields = tuple(
+        field for field, field_property in properties.items()
+        if not field_property.get('x-nullable'))
+    is_integer = checks['integer']
+    integer_fields = tuple(
+        field for field, field_property in properties.items()
+        if field_property.get('type') == 'integer')
+    value_checks = tuple(
+        (field, value_check(field_property, checks),
+         constants.FIELD_VALIDATION_MESSAGES[field])
+        for field, field_property in properties.items()
+        if field_property.get('type') != 'integer'
+        and value_check(field_property, checks))
+
+    def validate(payload):
+        if not payload:
+            return constants.ERROR_MESSAGE_EMPTY_REQUEST
+        validation_message = []
+        missing = [key for key in required if key not in payload]
+        if missing:
+            validation_message.append({'missing fields': missing})
+        non_numeric_fields = [key for key in integer_fields
+                              if not is_integer(payload.get(key))]
+        if non_numeric_fields:
+            validation_message.append({
+                'non integer or negative fields list': non_numeric_fields})
+        for field, check, message in value_checks:
+            if not check(payload.get(field)):
+                validation_message.append(message)
+        return validation_message
+
+    def validate_partial(payload):
+        if not payload or not isinstance(payload, dict):
+            return constants.ERROR_MESSAGE_EMPTY_REQUEST
+        validation_message = []
+        unknown = [key for key in payload if key not in fields]
+        if unknown:
+            validation_message.append({'invalid fields': [
+                ','.join(unknown) + unknown_message]})
+        null_fields = [key for key in not_null_fields
+                       if key in payload and payload[key] in (None, '')]
+        if null_fields:
+            validation_message.append({'missing fields': null_fields})
+        non_numeric_fields = [key for key in integer_fields
+                              if key in payload
+                              and not is_integer(payload[key])]
+        if non_numeric_fields:
+            validation_message.append({
+                'non integer or negative fields list': non_numeric_fields})
+        for field, check, message in value_checks:
+            if field in payload and not check(payload[field]):
+                validation_message.append(message)
+        return validation_message
+
+    return validate_partial if partial else validate
+
+
+def value_check(field_property, checks):
+    """Returns function checking value of field, None if any value is valid.
+    :param field_property: dict - Field of body definition.
+    :param checks: dict - Function checking value of each field type or
+    format.
+    :return: function
+    """
+    if 'enum' in field_property:
+        values = tuple(field_property['enum'])
+        return lambda value: value in values
+    return checks.get(field_property.get('format')) \
+        or checks.get(field_property.get('type'))
@@ -0,0 +1,45 @@
+"""Search filter of list requests. Field of search_by may have an operator
+(field:operator), eq by default, and values of between and in operators are
+separated by | in search_for.
+   Ex: search_by=salary:between,department:in&search_for=1000|5000,HR|Sales
+"""
+from src import constants, dialect
+
+
+def search_filters(filter_data):
+    """Returns fields of search filter with their operator and values.
+    :param filter_data: dict - Data for filter the result.
+    :return: list - (field, operator, values) of each field.
+    """
+    if not (filter_data.get('search_by') and filter_data.get('search_for')):
+        return []
+    filters = []
+    for key, value in dict(zip(
+            filter_data.get('search_by').split(','),
+            filter_data.get('search_for').split(','))).items():
+        field, separator, operator = key.partition(':')
+        operator = operator or 'eq'
+        values = value.split(constants.SEARCH_VALUES_SEPARATOR) \
+            if operator in constants.MULTI_VALUE_SEARCH_OPERATORS else [value]
+        filters.append((field, operator, values))
+    return filters
+
+
+def operator_clause(column, operator, values):
+    """Returns clause comparing column to values by operator, which database
+    answers by index range scan of column.
+    :param column: obj - Column.
+    :param operator: str - eq, gte, lte, between or in.
+    :param values: list - Search values.
+    :return: obj - SQLAlchemy clause.
+    """
+    values = [dialect.bind_value(column, value) for value in values]
+    if operator == 'gte':
+        return column >= values[0]
+    if operator == 'lte':
+        return column <= values[0]
+    if operator == 'between':
+        return column.between(values[0], values[1])
+    if operator == 'in':
+        return column.in_(values)
+    return column == values[0]
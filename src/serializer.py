@@ -0,0 +1,190 @@
+"""Fast JSON serialization of list responses. Rows are selected as plain
+tuples and encoded by an encoder compiled once per list of fields, giving the
+same bytes as json.dumps() of the record details without building them.
+"""
+import decimal
+import json
+
+from json.encoder import encode_basestring_ascii
+
+
+# JSON expression of each kind of field, for value of row at index {i}
+ENCODINGS = {
+    'integer': "('null' if row[{i}] is None else '%d' % row[{i}])",
+    'string': "('null' if row[{i}] is None else encode(row[{i}]))",
+    'money': "('null' if row[{i}] is None else money_json(row[{i}]))",
+    'lookup': "json_{i}(row[{i}])"
+}
+# Python value of each kind of field, for value of row at index {i}
+VALUES = {
+    'integer': 'row[{i}]',
+    'string': 'row[{i}]',
+    'money': '(None if row[{i}] is None else money(row[{i}]))',
+    'lookup': 'value_{i}(row[{i}])'
+}
+
+
+def money(value):
+    """Returns amount rounded to 2 decimals, same as float(str("%0.2f" % d))
+    of the Decimal d (of 10 decimals) which Float(10, 2) column returns, from
+    the float value of database. Rounding of float differs from rounding of
+    Decimal only on ties, which take the Decimal path.
+    :param value: float
+    :return: float
+    """
+    if abs(abs(value * 100) % 1 - 0.5) > 1e-6:
+        return round(value, 2)
+    return float('%0.2f' % decimal.Decimal('%.10f' % value))
+
+
+def money_json(value):
+    """Returns JSON of money() of the amount, formatted directly when float
+    rounding applies and the amount is small enough for 2 decimals to be its
+    shortest representation.
+    :param value: float
+    :return: str
+    """
+    if abs(value) < 1e12 and abs(abs(value * 100) % 1 - 0.5) > 1e-6:
+        text = '%.2f' % value
+        # Shortest representation keeps one decimal at least, like 1.0
+        return text[:-1] if text[-1] == '0' else text
+    return repr(money(value))
+
+
+class RowEncoder(object):
+    """Encoder of rows of the given fields to JSON object and to dict, with
+    keys in the order of fields."""
+
+    def __init__(self, fields, lookups=None):
+        """
+        :param fields: list - (name, kind) of each value of row, kind is
+        integer, string, money or lookup.
+        :param lookups: dict - Lookup of each field of lookup kind, giving
+        value and JSON of the field by value of row (like, name by id).
+        """
+        self.names = [name for name, kind in fields]
+        template = '{' + ', '.join(
+            encode_basestring_ascii(name).replace('%', '%%') + ': %s'
+            for name in self.names) + '}'
+        scope = {'encode': encode_basestring_ascii, 'money': money,
+                 'money_json': money_json}
+        for i, (name, kind) in enumerate(fields):
+            if kind == 'lookup':
+                scope['json_%d' % i] = lookups[name].json
+                scope['value_%d' % i] = lookups[name].value
+        self.encode = eval('lambda row: {template!r} % ({values},)'.format(
+            template=template, values=', '.join(
+                ENCODINGS[kind].format(i=i)
+                for i, (name, kind) in enumerate(fields))), scope)
+        self.detail = eval('lambda row: {{{values}}}'.format(
+            values=', '.join(
+                '{name!r}: {value}'.format(
+                    name=name, value=VALUES[kind].format(i=i))
+                for i, (name, kind) in enumerate(fields))), scope)
+
+
+class ListColumns(object):
+    """Columns of list rows with kind of their JSON encoding, selected by the
+    requested fields (sparse fieldset), with encoder of each selection
+    compiled on its first request."""
+
+    def __init__(self, columns, lookups=None):
+        """
+        :param columns: list - (name, column, kind) of each field, in order of
+        fields of the response.
+        :param lookups: dict - Lookup of each field of lookup kind.
+        """
+        self.columns = columns
+        self.lookups = lookups
+        self.encoders = {}
+
+    def select(self, fields=None):
+        """Returns columns of the given fields, in order of list columns.
+        :param fields: list - Field names, all fields when None.
+        :return: list - (name, column, kind) of each field.
+        """
+        return [(name, column, kind) for name, column, kind in self.columns
+                if fields is None or name in fields]
+
+    def encoder(self, columns):
+        """Returns encoder of rows of the given columns.
+        :param columns: list - (name, column, kind) of each value of row.
+        :return: obj - RowEncoder
+        """
+        key = tuple(name for name, column, kind in columns)
+        encoder = self.encoders.get(key)
+        if encoder is None:
+            encoder = RowEncoder(
+                [(name, kind) for name, column, kind in columns],
+                self.lookups)
+            self.encoders[key] = encoder
+        return encoder
+
+
+def requested_fields(fields):
+    """Returns list of the requested fields of response.
+    :param fields: str - Fields comma separated, or None for all fields.
+    :return: mixed - List of fields or None for all fields.
+    """
+    return fields.split(',') if fields else None
+
+
+def project(detail, fields):
+    """Returns the record details with the requested fields only.
+    :param detail: dict - Record details.
+    :param fields: list - Field names, all fields when None.
+    :return: dict
+    """
+    if fields is None:
+        return detail
+    return {key: value for key, value in detail.items() if key in fields}
+
+
+class Rows(object):
+    """Rows of list response, encoded to JSON by their encoder. Indexing and
+    iteration give the record details as dict."""
+
+    def __init__(self, rows, encoder):
+        self.rows = rows
+        self.encoder = encoder
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.encoder.detail(self.rows[index])
+
+    def __iter__(self):
+        return (self.encoder.detail(row) for row in self.rows)
+
+    def to_json(self):
+        """Returns JSON array of rows.
+        :return: str
+        """
+        return '[' + ', '.join(map(self.encoder.encode, self.rows)) + ']'
+
+
+class JSONEncoder(json.JSONEncoder):
+    """JSON encoder of responses with rows, for flaskify()."""
+
+    def default(self, o):
+        if isinstance(o, Rows):
+            return list(o)
+        return super(JSONEncoder, self).default(o)
+
+
+def dumps(data):
+    """Returns JSON of data, same as json.dumps(), encoding rows by their
+    compiled encoder.
+    :param data: mixed - Response message.
+    :return: str
+    """
+    if isinstance(data, Rows):
+        return data.to_json()
+    if isinstance(data, dict):
+        return '{' + ', '.join(
+            encode_basestring_ascii(key) + ': ' + dumps(value)
+            for key, value in data.items()) + '}'
+    if isinstance(data, list):
+        return '[' + ', '.join(dumps(value) for value in data) + ']'
+    return json.dumps(data)
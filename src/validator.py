@@ -1,9 +1,17 @@
 """Validation for API methods."""
 import datetime
+import re
+import configs
+
 from functools import wraps
 from oto import response, status as oto_status
 from oto.adaptors.flask import flaskify
-from src import constants
+from src import constants, pagination, schema, search
+
+
+# Date in Y-m-d format with zero padded month and day, checked without parsing
+# by strptime
+ISO_DATE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
 
 
 def is_number(value):
@@ -38,95 +46,177 @@ def validate_request(payload, request_type, model):
     :param model: str
     :return: list
     """
+    return REQUEST_VALIDATORS[(request_type, model)](payload)
+
+
+def validate_partial_request(payload, model):
+    """Validate PATCH request, only fields given in the request.
+    :param payload: json
+    :param model: str
+    :return: list
+    """
+    return REQUEST_VALIDATORS[('PATCH', model)](payload)
+
+
+def validate_bulk_write_request(filter_data, model):
+    """Validate selection of records for bulk PATCH and DELETE request.
+    :param filter_data: dict - ids or search_by and search_for.
+    :param model: str
+    :return: list
+    """
     validation_message = []
-    if not payload:
-        return 'Request should not be empty'
-    if request_type == 'POST' and model == 'department':
-        missing_fields_list = missing_fields(
-            payload,
-            constants.VALIDATION_DEPARTMENT_POST_AND_PUT['required_fields'])
-        if missing_fields_list:
-            validation_message.append(missing_fields_list)
-    elif request_type == 'POST' and model == 'employee':
-        missing_fields_list = missing_fields(
-            payload,
-            constants.VALIDATION_EMPLOYEE_POST_AND_PUT['required_fields'])
-        if missing_fields_list:
-            validation_message.append(missing_fields_list)
-        non_numeric_fields = numeric_fields(
-            payload,
-            constants.VALIDATION_EMPLOYEE_POST_AND_PUT['integer_fields'])
-        if non_numeric_fields:
-            validation_message.append(non_numeric_fields)
-        if not validate_date(payload.get('date_of_joining')):
-            validation_message.append({
-                'invalid date format':
-                    'Date of joining should be in valid YYYY-MM-DD format'})
-        if payload.get('gender') not in constants.GENDER:
-            validation_message.append({
-                'invalid gender value': 'Gender should be male or female'})
-        if not is_float(str(payload.get('salary'))):
-            validation_message.append({
-                'invalid salary value': 'Salary should be like 2000.00'})
-    elif request_type == 'PUT' and model == 'department':
-        missing_fields_list = missing_fields(
-            payload,
-            constants.VALIDATION_DEPARTMENT_POST_AND_PUT['required_fields'])
-        if missing_fields_list:
-            validation_message.append(missing_fields_list)
-    elif request_type == 'PUT' and model == 'employee':
-        missing_fields_list = missing_fields(
-            payload,
-            constants.VALIDATION_EMPLOYEE_POST_AND_PUT['required_fields'])
-        if missing_fields_list:
-            validation_message.append(missing_fields_list)
-        non_numeric_fields = numeric_fields(
-            payload,
-            constants.VALIDATION_EMPLOYEE_POST_AND_PUT['integer_fields'])
-        if non_numeric_fields:
-            validation_message.append(non_numeric_fields)
-        if not validate_date(payload.get('date_of_joining')):
-            validation_message.append({
-                'invalid date format':
-                    'Date of joining should be in valid YYYY-MM-DD format'})
-        if payload.get('gender') not in constants.GENDER:
-            validation_message.append({
-                'invalid gender value': 'Gender should be male or female'})
-        if not is_float(str(payload.get('salary'))):
-            validation_message.append({
-                'invalid salary value': 'Salary should be like 2000.00'})
+    if not filter_data.get('ids') and not (
+            filter_data.get('search_by') and filter_data.get('search_for')):
+        validation_message.append(constants.ERROR_MESSAGE_BULK_WRITE_SELECTOR)
+    if filter_data.get('ids'):
+        validation_message.extend(
+            validate_ids(filter_data.get('ids'), configs.BULK_MAX_ITEMS))
+    missing_fields_list = missing_fields_for_filters(filter_data)
+    if missing_fields_list:
+        validation_message.append({'missing fields': missing_fields_list})
+    if filter_data.get('search_by'):
+        invalid_fields_list = invalid_fields(
+            filter_data.get('search_by'), 'search_by',
+            constants.VALIDATION_DEPARTMENT_FIELDS_FOR_FILTER
+            if model == 'department'
+            else constants.VALIDATION_EMPLOYEE_FIELDS_FOR_FILTER)
+        if invalid_fields_list:
+            validation_message.append(
+                {'invalid fields': [invalid_fields_list]})
+        for field, operator, values in search.search_filters(filter_data):
+            validation_message.extend(validate_search_numbers(field, values))
+    if not validate_search_date(filter_data):
+        validation_message.append({
+            'invalid date format':
+                'Date of joining should be in valid YYYY-MM-DD format'})
     return validation_message
 
 
-def missing_fields(payload, key_list):
-    """Check missing fields.
+def validate_ids(ids, max_ids):
+    """Validate comma separated ids of request.
+    :param ids: str - Ids comma separated.
+    :param max_ids: int - Maximum number of ids.
+    :return: list
+    """
+    validation_message = []
+    ids = ids.split(',')
+    if not all(is_number(value) for value in ids):
+        validation_message.append({
+            'non integer or negative fields list': ['ids']})
+    if len(ids) > max_ids:
+        validation_message.append({
+            'invalid ids value': 'ids should have at most {max} ids'.
+            format(max=max_ids)})
+    return validation_message
+
+
+def validate_multi_get_request(ids, fields, model):
+    """Validate GET request of records by ids.
+    :param ids: str - Ids comma separated.
+    :param fields: str - Fields of response comma separated, or None.
+    :param model: str
+    :return: list
+    """
+    return validate_ids(ids, configs.MULTI_GET_MAX_IDS) + \
+        validate_fields(fields, model)
+
+
+def validate_bulk_request(payload, chunk_size):
+    """Validate bulk POST request.
+    :param payload: list - Items of request.
+    :param chunk_size: str - Number of items inserted per transaction.
+    :return: list
+    """
+    validation_message = []
+    if not isinstance(payload, list) or not payload \
+            or len(payload) > configs.BULK_MAX_ITEMS:
+        validation_message.append(constants.ERROR_MESSAGE_BULK_REQUEST.format(
+            max=configs.BULK_MAX_ITEMS))
+    if not is_number(str(chunk_size)) or not int(chunk_size):
+        validation_message.append({
+            'non integer or negative fields list': ['chunk_size']})
+    return validation_message
+
+
+def validate_batch_request(payload):
+    """Validate batch request.
+    :param payload: json - Operations and mode of batch.
+    :return: list
+    """
+    validation_message = []
+    if not isinstance(payload, dict) \
+            or not isinstance(payload.get('operations'), list) \
+            or not payload.get('operations') \
+            or len(payload.get('operations')) > configs.BATCH_MAX_OPERATIONS:
+        return [constants.ERROR_MESSAGE_BATCH_REQUEST.format(
+            max=configs.BATCH_MAX_OPERATIONS)]
+    if payload.get('mode') is not None \
+            and payload.get('mode') not in constants.BATCH_MODES:
+        validation_message.append({
+            'invalid mode value':
+                'mode value should be all_or_nothing or best_effort'})
+    return validation_message
+
+
+def validate_bulk_item(payload, model):
+    """Validate an item of bulk POST request.
     :param payload: json
-    :param key_list: list
-    :return: mixed
+    :param model: str
+    :return: list
     """
-    missing_fields_list = []
-    for key in key_list:
-        if key not in payload:
-            missing_fields_list.append(key)
-    if missing_fields_list:
-        return {'missing fields': [key for key in missing_fields_list]}
-    return missing_fields_list
+    if not isinstance(payload, dict):
+        return [constants.ERROR_MESSAGE_BULK_ITEM]
+    validation_message = validate_request(payload, 'POST', model)
+    if isinstance(validation_message, str):
+        return [validation_message]
+    return validation_message
 
 
-def numeric_fields(payload, key_list):
-    """Check fields are numeric.
+def validate_import_item(payload, model):
+    """Validate a record of import, primary key is optional to update the
+    existing record.
     :param payload: json
-    :param key_list: list
-    :return: mixed
+    :param model: str
+    :return: list
     """
-    non_numeric_fields = []
-    for key in key_list:
-        if not is_number(str(payload.get(key))):
-            non_numeric_fields.append(key)
-    if non_numeric_fields:
-        return {'non integer or negative fields list':
-                [key for key in non_numeric_fields]}
-    return non_numeric_fields
+    validation_message = validate_bulk_item(payload, model)
+    primary_key = '{model}_id'.format(model=model)
+    if isinstance(payload, dict) and payload.get(primary_key) is not None \
+            and not is_number(str(payload.get(primary_key))):
+        validation_message.append({
+            'non integer or negative fields list': [primary_key]})
+    return validation_message
+
+
+def validate_stats_request(group_by):
+    """Validate employee statistics request.
+    :param group_by: str - Fields comma separated to group statistics by.
+    :return: list
+    """
+    validation_message = []
+    if group_by:
+        invalid_fields_list = invalid_fields(
+            group_by, 'group_by', constants.STATS_GROUP_BY_FIELDS)
+        if invalid_fields_list:
+            validation_message.append(
+                {'invalid fields': [invalid_fields_list]})
+    return validation_message
+
+
+def validate_import_request(import_format, batch_size):
+    """Validate import request.
+    :param import_format: str - ndjson or csv.
+    :param batch_size: str - Number of records imported per transaction.
+    :return: list
+    """
+    validation_message = []
+    if import_format not in constants.EXPORT_FORMATS:
+        validation_message.append({
+            'invalid format value': 'format value should be ndjson or csv'})
+    if not is_number(str(batch_size)) or not int(batch_size):
+        validation_message.append({
+            'non integer or negative fields list': ['batch_size']})
+    return validation_message
 
 
 def validate_date(date):
@@ -135,9 +225,12 @@ def validate_date(date):
     :return: boolean
     """
     try:
-        datetime.datetime.strptime(date, '%Y-%m-%d')
+        if ISO_DATE.fullmatch(date):
+            datetime.date(int(date[:4]), int(date[5:7]), int(date[8:]))
+        else:
+            datetime.datetime.strptime(date, '%Y-%m-%d')
         return True
-    except ValueError:
+    except (TypeError, ValueError):
         return False
 
 
@@ -176,51 +269,233 @@ def validate_filter_request(filter_data, model):
     :param model: str
     :return: list
     """
-    validation_message = []
-    invalid_fields_message = []
-    non_numeric_fields = numeric_fields(
-        filter_data, constants.INTEGER_FIELDS_FILTER_REQUEST)
-    if non_numeric_fields:
-        validation_message.append(non_numeric_fields)
-    if filter_data.get('order_by') \
-            and filter_data.get('order_by') not in constants.SORT_ORDER:
-        validation_message.append({
+    return FILTER_VALIDATORS[model](filter_data)
+
+
+def compile_filter_validator(model):
+    """Returns validator of GET request for filter records of the model, with
+    valid values and messages of the parameters prepared once.
+    :param model: str
+    :return: function - Validator returning list of validation messages.
+    """
+    filter_fields = constants.VALIDATION_DEPARTMENT_FIELDS_FOR_FILTER \
+        if model == 'department' \
+        else constants.VALIDATION_EMPLOYEE_FIELDS_FOR_FILTER
+    validate_sort_by = compile_fields_validator(
+        filter_fields + [constants.SORT_BY_RELEVANCE], 'sort_by')
+    validate_search_by = compile_fields_validator(filter_fields, 'search_by')
+    validate_response_fields = compile_fields_validator(
+        constants.RESPONSE_FIELDS[model], 'fields')
+    key_field = '{model}_id'.format(model=model)
+    # Parameter, its valid values, whether checked when given as None, and
+    # message of invalid value
+    value_parameters = (
+        ('format', frozenset(constants.EXPORT_FORMATS), True, {
+            'invalid format value': 'format value should be ndjson or csv'}),
+        ('order_by', frozenset(constants.SORT_ORDER), False, {
             'invalid order by value':
-                'order_by value should be ASC or DESC'})
-    missing_fields_list = missing_fields_for_filters(filter_data)
-    if missing_fields_list:
-        validation_message.append({'missing fields': missing_fields_list})
-    if model == 'department':
-        if filter_data.get('sort_by'):
-            invalid_fields_list = invalid_fields(
-                filter_data.get('sort_by'), 'sort_by',
-                constants.VALIDATION_DEPARTMENT_FIELDS_FOR_FILTER)
+                'order_by value should be ASC or DESC'}),
+        ('count', frozenset(constants.COUNT_MODES), False, {
+            'invalid count value':
+                'count value should be exact, estimate or none'}),
+        ('search_mode', frozenset(constants.SEARCH_MODES), False, {
+            'invalid search mode value':
+                'search_mode value should be exact, prefix, contains or '
+                'fulltext'})
+    )
+
+    def validate(filter_data):
+        validation_message = []
+        invalid_fields_message = []
+        non_numeric_fields = [
+            field for field in constants.INTEGER_FIELDS_FILTER_REQUEST
+            if field in filter_data and not is_number(str(filter_data[field]))]
+        if non_numeric_fields:
+            validation_message.append({
+                'non integer or negative fields list': non_numeric_fields})
+        for parameter, values, checks_none, message in value_parameters:
+            value = filter_data.get(parameter)
+            if (parameter in filter_data if checks_none else value) \
+                    and value not in values:
+                validation_message.append(message)
+        sort_by = filter_data.get('sort_by')
+        if sort_by and constants.SORT_BY_RELEVANCE in sort_by.split(',') and (
+                filter_data.get('search_mode') != 'fulltext'
+                or filter_data.get('cursor') is not None):
+            validation_message.append({
+                'invalid sort by value':
+                    constants.ERROR_MESSAGE_SORT_BY_RELEVANCE})
+        missing_fields_list = missing_fields_for_filters(filter_data)
+        if missing_fields_list:
+            validation_message.append({'missing fields': missing_fields_list})
+        if sort_by:
+            invalid_fields_list = validate_sort_by(sort_by)
             if invalid_fields_list:
                 invalid_fields_message.append(invalid_fields_list)
         if filter_data.get('search_by'):
-            invalid_fields_list = invalid_fields(
-                filter_data.get('search_by'), 'search_by',
-                constants.VALIDATION_DEPARTMENT_FIELDS_FOR_FILTER)
+            invalid_fields_list = validate_search_by(
+                search_by_fields(filter_data))
             if invalid_fields_list:
                 invalid_fields_message.append(invalid_fields_list)
-    if model == 'employee':
-        if filter_data.get('sort_by'):
-            invalid_fields_list = invalid_fields(
-                filter_data.get('sort_by'), 'sort_by',
-                constants.VALIDATION_EMPLOYEE_FIELDS_FOR_FILTER)
-            if invalid_fields_list:
-                invalid_fields_message.append(invalid_fields_list)
-        if filter_data.get('search_by'):
-            invalid_fields_list = invalid_fields(
-                filter_data.get('search_by'), 'search_by',
-                constants.VALIDATION_EMPLOYEE_FIELDS_FOR_FILTER)
+        if filter_data.get('fields'):
+            invalid_fields_list = validate_response_fields(
+                filter_data.get('fields'))
             if invalid_fields_list:
                 invalid_fields_message.append(invalid_fields_list)
-    if invalid_fields_message:
-        validation_message.append({'invalid fields': invalid_fields_message})
+        validation_message.extend(validate_search_filters(filter_data, model))
+        if invalid_fields_message:
+            validation_message.append(
+                {'invalid fields': invalid_fields_message})
+        if filter_data.get('cursor') and not pagination.decode_cursor(
+                filter_data.get('cursor'),
+                pagination.keyset_fields(filter_data, key_field)):
+            validation_message.append({
+                'invalid cursor': constants.ERROR_MESSAGE_INVALID_CURSOR})
+        return validation_message
+
+    return validate
+
+
+def compile_fields_validator(valid_fields, operation):
+    """Returns validator of comma separated fields, same as invalid_fields
+    with the message of valid fields prepared once.
+    :param valid_fields: list
+    :param operation: str
+    :return: function - Validator returning message of invalid fields, or
+    empty list.
+    """
+    valid = frozenset(valid_fields)
+    message = '. {operation} contains {valid_fields}'.format(
+        operation=operation, valid_fields=','.join(valid_fields))
+
+    def validate(fields):
+        invalid_fields_list = [
+            field for field in fields.split(',') if field not in valid]
+        if invalid_fields_list:
+            return ','.join(invalid_fields_list) + message
+        return []
+
+    return validate
+
+
+def validate_fields(fields, model):
+    """Validate fields of response requested by fields parameter.
+    :param fields: str - Fields comma separated, or None for all fields.
+    :param model: str
+    :return: list
+    """
+    validation_message = []
+    if fields:
+        invalid_fields_list = invalid_fields(
+            fields, 'fields', constants.RESPONSE_FIELDS[model])
+        if invalid_fields_list:
+            validation_message.append(
+                {'invalid fields': [invalid_fields_list]})
+    return validation_message
+
+
+def validate_expand(expand, employees_limit):
+    """Validate expanded fields of department details and limit of expanded
+    employees.
+    :param expand: str - Fields comma separated, or None.
+    :param employees_limit: str - Maximum number of employees of department.
+    :return: list
+    """
+    validation_message = []
+    if expand:
+        invalid_fields_list = invalid_fields(
+            expand, 'expand', constants.DEPARTMENT_EXPAND_FIELDS)
+        if invalid_fields_list:
+            validation_message.append(
+                {'invalid fields': [invalid_fields_list]})
+    if employees_limit is not None and (
+            not is_number(str(employees_limit)) or not int(employees_limit)
+            or int(employees_limit) > constants.MAX_EXPAND_EMPLOYEES_LIMIT):
+        validation_message.append({
+            'invalid employees limit value':
+                'employees_limit should be integer from 1 to {max}'.format(
+                    max=constants.MAX_EXPAND_EMPLOYEES_LIMIT)})
+    return validation_message
+
+
+def search_by_fields(filter_data):
+    """Returns fields of search_by without their search operator.
+    :param filter_data: dict
+    :return: str - Comma separated fields.
+    """
+    return ','.join(key.partition(':')[0]
+                    for key in filter_data.get('search_by').split(','))
+
+
+def validate_search_filters(filter_data, model):
+    """Validate operator and values of each field of search filter.
+    :param filter_data: dict
+    :param model: str
+    :return: list
+    """
+    validation_message = []
+    range_fields = constants.RANGE_SEARCH_FIELDS[model]
+    for field, operator, values in search.search_filters(filter_data):
+        if operator not in constants.SEARCH_OPERATORS:
+            validation_message.append({
+                'invalid search operator':
+                    'search operator should be eq, gte, lte, between or in'})
+            continue
+        if operator in constants.RANGE_SEARCH_OPERATORS \
+                and field not in range_fields:
+            validation_message.append({
+                'invalid search operator':
+                    'gte, lte and between are supported for {fields}'.format(
+                        fields=', '.join(range_fields))})
+        if operator == 'between' and len(values) != 2:
+            validation_message.append({
+                'invalid search value':
+                    'between needs two values separated by {separator}'.
+                    format(separator=constants.SEARCH_VALUES_SEPARATOR)})
+        if operator == 'in' and len(values) > constants.SEARCH_MAX_VALUES:
+            validation_message.append({
+                'invalid search value':
+                    'in takes at most {max} values separated by {separator}'.
+                    format(max=constants.SEARCH_MAX_VALUES,
+                           separator=constants.SEARCH_VALUES_SEPARATOR)})
+        if field == 'date_of_joining' \
+                and not all(validate_date(value) for value in values):
+            validation_message.append({
+                'invalid date format':
+                    'Date of joining should be in valid YYYY-MM-DD format'})
+        validation_message.extend(validate_search_numbers(field, values))
     return validation_message
 
 
+def validate_search_numbers(field, values):
+    """Validate search values of salary and id fields are numbers.
+    :param field: str
+    :param values: list
+    :return: list
+    """
+    if field == 'salary' \
+            and not all(is_float(value) for value in values) \
+            or field.endswith('_id') \
+            and not all(is_number(value) for value in values):
+        return [{'invalid search value':
+                 '{field} values should be numbers'.format(field=field)}]
+    return []
+
+
+def validate_search_date(filter_data):
+    """Validate date given in search_for against date_of_joining field.
+    :param filter_data: dict
+    :return: boolean
+    """
+    if filter_data.get('search_by') and filter_data.get('search_for'):
+        for k, v in dict(zip(
+                filter_data.get('search_by').split(','),
+                filter_data.get('search_for').split(','))).items():
+            if k == 'date_of_joining' and not validate_date(v):
+                return False
+    return True
+
+
 def invalid_fields(fields, operation, valid_fields):
     """Validate invalid fields.
     :param fields: str
@@ -259,3 +534,17 @@ def missing_fields_for_filters(filter_data):
     if len(missing_field_sort) == 2:
         missing_field_sort.clear()
     return missing_field_search + missing_field_sort
+
+
+# Validators of request bodies compiled from Swagger specification, and of
+# filter requests of each model, once at start
+REQUEST_VALIDATORS = schema.compile_body_validators(
+    schema.load_spec(configs.SWAGGER_SPEC_PATH), {
+        'integer': lambda value: is_number(str(value)),
+        'number': lambda value: is_float(str(value)),
+        'date': validate_date
+    })
+FILTER_VALIDATORS = {
+    model: compile_filter_validator(model)
+    for model in constants.RESPONSE_FIELDS
+}
@@ -0,0 +1,77 @@
+"""Fixtures of the tests, the api runs on in memory SQLite database of test
+environment, emptied before each test."""
+import json
+import os
+
+os.environ['ENVIRONMENT'] = 'test'
+os.environ.pop('SQLITE_URI', None)
+
+import pytest  # noqa: E402
+
+import mysql_connector  # noqa: E402
+
+from src import cache, constants, counting  # noqa: E402
+from src.api import app  # noqa: E402
+from src.logic.models import department  # noqa: E402
+
+
+class Client(object):
+    """Test client sending JSON requests with api key."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def request(self, method, url, body=None, headers=None):
+        """Send request and return response, with its JSON body as json.
+        :param method: str
+        :param url: str
+        :param body: mixed - JSON body.
+        :param headers: dict - Additional headers.
+        :return: obj - Response.
+        """
+        request_headers = {
+            constants.API_KEY_IN_HEADER: constants.API_KEY,
+            'Content-Type': 'application/json'
+        }
+        request_headers.update(headers or {})
+        result = self.client.open(
+            url, method=method, headers=request_headers,
+            data=None if body is None else json.dumps(body))
+        try:
+            result.json = json.loads(result.get_data(as_text=True))
+        except ValueError:
+            result.json = None
+        return result
+
+
+@pytest.fixture
+def client():
+    """Test client of the api on empty database and caches."""
+    session = mysql_connector.Session
+    for table in reversed(mysql_connector.Base.metadata.sorted_tables):
+        session.execute(table.delete())
+    session.commit()
+    session.remove()
+    counting.invalidate('department', 'employee')
+    cache.entity_cache.invalidate_all('department')
+    cache.entity_cache.invalidate_all('employee')
+    # Generations of emptied database start again.
+    cache.entity_cache.generations.clear()
+    cache.entity_cache.written_generations.clear()
+    department.department_names.invalidate()
+    app.testing = True
+    return Client(app.test_client())
+
+
+@pytest.fixture
+def employee_payload():
+    """Returns employee details of the given department."""
+    def payload(department_id, **fields):
+        details = {
+            'name': 'Ann', 'department_id': department_id,
+            'date_of_joining': '2017-01-02', 'gender': 'female',
+            'address': 'House 1', 'salary': 2000.5
+        }
+        details.update(fields)
+        return details
+    return payload
@@ -0,0 +1,113 @@
+"""Tests of the ASGI entry point serving the WSGI application."""
+import asyncio
+import json
+import threading
+import time
+
+from src import asgi, constants
+from src.api import app
+
+
+def http_scope(method, path, headers=()):
+    """Returns ASGI scope of HTTP request with api key.
+    :param method: str
+    :param path: str
+    :param headers: iterable - (name, value) of additional headers.
+    :return: dict
+    """
+    return {
+        'type': 'http', 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode('ascii'),
+        'query_string': b'', 'root_path': '', 'server': ('test', 80),
+        'client': ('127.0.0.1', 1234),
+        'headers': [
+            (constants.API_KEY_IN_HEADER.lower().encode('ascii'),
+             constants.API_KEY.encode('ascii'))
+        ] + [(name, value) for name, value in headers]}
+
+
+async def call(application, scope, chunks=(b'',)):
+    """Send request of the given body chunks to ASGI application.
+    :param application: obj - ASGI application.
+    :param scope: dict - ASGI scope.
+    :param chunks: iterable - Chunks of request body.
+    :return: tuple - Status, headers and body of response.
+    """
+    messages = [{'type': 'http.request', 'body': chunk,
+                 'more_body': index < len(chunks) - 1}
+                for index, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    headers = dict(sent[0]['headers'])
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return sent[0]['status'], headers, body
+
+
+def test_api_routes_through_asgi(client):
+    application = asgi.ASGIApplication(app, 2)
+    # Body without Content-Length, received in chunks.
+    status, headers, body = asyncio.run(call(
+        application, http_scope(
+            'POST', '/v1/department',
+            [(b'content-type', b'application/json')]),
+        [b'{"name":', b' "HR"}']))
+    assert status == 200
+    assert json.loads(body.decode('utf-8'))['department']['name'] == 'HR'
+    status, headers, body = asyncio.run(call(
+        application, http_scope('GET', '/v1/department/1')))
+    assert status == 200
+    assert headers[b'etag'].startswith(b'W/')
+    status, headers, body = asyncio.run(call(
+        application, http_scope('GET', '/v1/department/x')))
+    assert status == 400
+
+
+def test_requests_run_at_most_threads_at_once():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def wsgi_app(environ, start_response):
+        with lock:
+            running.append(threading.get_ident())
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(threading.get_ident())
+        write = start_response('200 OK', [('Content-Type', 'text/plain')])
+        write(b'written ')
+        return [b'chunk']
+
+    async def serve():
+        application = asgi.ASGIApplication(wsgi_app, 3)
+        return await asyncio.gather(*[
+            call(application, http_scope('GET', '/')) for index in range(9)])
+
+    responses = asyncio.run(serve())
+    assert [body for status, headers, body in responses] == \
+        [b'written chunk'] * 9
+    assert max(peak) == 3
+
+
+def test_lifespan():
+    events = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return events.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(asgi.ASGIApplication(app, 1)(
+        {'type': 'lifespan'}, receive, send))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
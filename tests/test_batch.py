@@ -0,0 +1,59 @@
+"""Tests of the batch of operations run in single transaction."""
+import mysql_connector
+
+from src import batch, cache
+from src.logic.models import employee
+
+
+def batch_operations(employee_payload):
+    """Returns operations creating department and employee, then failing.
+    :param employee_payload: function - Employee details of department.
+    :return: list
+    """
+    return [
+        {'method': 'POST', 'path': '/department', 'body': {'name': 'HR'},
+         'ref': 'hr'},
+        {'method': 'POST', 'path': '/employee',
+         'body': employee_payload('$hr')},
+        {'method': 'PATCH', 'path': '/department/$hr', 'body': {}},
+        {'method': 'GET', 'path': '/department/$hr'}]
+
+
+def test_failed_operation_rolls_back_batch(client, employee_payload):
+    result = client.request('POST', '/v1/batch', {
+        'operations': batch_operations(employee_payload)})
+    assert result.json['committed'] is False
+    assert [item['status'] for item in result.json['results']] == [
+        200, 200, 400, 424]
+    # Details cached by the rolled back operations are dropped.
+    assert cache.entity_cache.get('department', 1) is None
+    assert cache.entity_cache.get('employee', 1) is None
+    assert client.request('GET', '/v1/department/1').status_code == 404
+    assert client.request('GET', '/v1/employee/1').status_code == 404
+    assert client.request('GET', '/v1/employee').json['employees'] == []
+    assert mysql_connector.Session.query(employee.EmployeeStats).count() == 0
+
+
+def test_best_effort_rolls_back_failed_operation(client, employee_payload):
+    result = client.request('POST', '/v1/batch', {
+        'operations': batch_operations(employee_payload),
+        'mode': 'best_effort'})
+    assert result.json['committed'] is True
+    assert [item['status'] for item in result.json['results']] == [
+        200, 200, 400, 200]
+    result = client.request('GET', '/v1/employee/1')
+    assert result.json['employee']['department'] == 'HR'
+    assert mysql_connector.Session.query(employee.EmployeeStats).count() == 1
+
+
+def test_operations_do_not_cache_uncommitted_records(client,
+                                                     employee_payload,
+                                                     monkeypatch):
+    # Cache as other requests see it before the batch ends.
+    monkeypatch.setattr(batch, 'invalidate', lambda: None)
+    operations = batch_operations(employee_payload)
+    operations.insert(2, {'method': 'GET', 'path': '/employee/1'})
+    result = client.request('POST', '/v1/batch', {'operations': operations})
+    assert result.json['results'][2]['status'] == 200
+    assert cache.entity_cache.get('department', 1) is None
+    assert cache.entity_cache.get('employee', 1) is None
@@ -0,0 +1,66 @@
+"""Tests of bulk update and delete of employees selected by filter."""
+import mysql_connector
+
+from src.logic.models import employee
+
+
+def stats_rows():
+    """Returns department, gender, headcount and salary sum of each group.
+    :return: list
+    """
+    return sorted(
+        (row.department_id, row.gender, row.headcount,
+         round(float(row.salary_sum), 2))
+        for row in mysql_connector.Session.query(employee.EmployeeStats))
+
+
+def add_employees(client, employee_payload):
+    """Add departments HR and Sales with two employees each."""
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/department', {'name': 'Sales'})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1, salary=1000), employee_payload(1, salary=2000),
+        employee_payload(2, salary=1000), employee_payload(2, salary=3000)])
+
+
+def test_patch_employees_of_filter(client, employee_payload):
+    add_employees(client, employee_payload)
+    result = client.request(
+        'PATCH', '/v1/employee?search_by=department&search_for=HR',
+        {'department_id': 2})
+    assert result.json['affected_rows'] == 2
+    assert stats_rows() == [(2, 'female', 4, 7000.0)]
+    result = client.request(
+        'PATCH', '/v1/employee?search_by=salary&search_for=1000',
+        {'salary': 1500})
+    assert result.json['affected_rows'] == 2
+    assert client.request(
+        'GET', '/v1/employee/3').json['employee']['salary'] == 1500
+    assert stats_rows() == [(2, 'female', 4, 8000.0)]
+
+
+def test_delete_employees_of_filter(client, employee_payload):
+    add_employees(client, employee_payload)
+    result = client.request(
+        'DELETE', '/v1/employee?search_by=salary&search_for=1000')
+    assert result.json['affected_rows'] == 2
+    assert client.request('GET', '/v1/employee/1').status_code == 404
+    assert stats_rows() == [(1, 'female', 1, 2000.0), (2, 'female', 1, 3000.0)]
+    result = client.request('DELETE', '/v1/employee?ids=2,4')
+    assert result.json['affected_rows'] == 2
+    assert stats_rows() == []
+
+
+def test_invalid_filter_is_rejected(client, employee_payload):
+    add_employees(client, employee_payload)
+    for query in ['search_by=salary&search_for=abc',
+                  'search_by=employee_id&search_for=1x',
+                  'search_by=date_of_joining&search_for=2017',
+                  'search_by=salary:gte&search_for=1000',
+                  'ids=a,b', '']:
+        assert client.request(
+            'PATCH', '/v1/employee?' + query,
+            {'name': 'Bob'}).status_code == 400
+        assert client.request(
+            'DELETE', '/v1/employee?' + query).status_code == 400
+    assert len(client.request('GET', '/v1/employee').json['employees']) == 4
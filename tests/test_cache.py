@@ -0,0 +1,118 @@
+"""Tests of the read-through cache of employee and department details."""
+import pytest
+
+from sqlalchemy import create_engine
+
+import mysql_connector
+
+from src import cache
+from src.logic.models import employee, generation
+
+
+@pytest.fixture
+def employee_id(client, employee_payload):
+    """Returns id of employee added to department HR."""
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    result = client.request('POST', '/v1/employee', employee_payload(1))
+    return result.json['employee']['employee_id']
+
+
+def test_write_invalidates_cached_employee(client, employee_payload,
+                                           employee_id):
+    url = '/v1/employee/%d' % employee_id
+    assert client.request('GET', url).json['employee']['name'] == 'Ann'
+    assert cache.entity_cache.get('employee', employee_id) is not None
+    client.request('PUT', url, employee_payload(1, name='Bob'))
+    assert client.request('GET', url).json['employee']['name'] == 'Bob'
+    client.request('PATCH', url, {'name': 'Eve'})
+    assert client.request('GET', url).json['employee']['name'] == 'Eve'
+    client.request('DELETE', url)
+    assert client.request('GET', url).status_code == 404
+
+
+def test_fill_started_before_invalidation_is_rejected(client, employee_id):
+    token = cache.entity_cache.fill_token('employee', employee_id)
+    cache.entity_cache.invalidate('employee', employee_id)
+    assert not cache.entity_cache.set(
+        'employee', employee_id, {'name': 'Stale'}, token)
+    assert cache.entity_cache.get('employee', employee_id) is None
+    token = cache.entity_cache.fill_token('employee', employee_id)
+    cache.entity_cache.invalidate_all('employee')
+    assert not cache.entity_cache.set(
+        'employee', employee_id, {'name': 'Stale'}, token)
+
+
+def test_cache_is_filled_from_primary(client, employee_id, monkeypatch):
+    # Replica which has not replicated the employee yet.
+    replica = create_engine('sqlite://')
+    mysql_connector.Base.metadata.create_all(replica)
+
+    class Router(object):
+        def engine(self):
+            return replica
+
+    monkeypatch.setattr(mysql_connector, 'replica_router', Router())
+    result = client.request('GET', '/v1/employee/%d' % employee_id)
+    assert result.status_code == 200
+    assert result.json['employee']['name'] == 'Ann'
+    assert cache.entity_cache.get('employee', employee_id)['name'] == 'Ann'
+
+
+def test_write_of_other_process_invalidates_cache(client, employee_id,
+                                                  monkeypatch):
+    monkeypatch.setattr(cache.entity_cache, 'check_interval', 0)
+    url = '/v1/employee/%d' % employee_id
+    assert client.request('GET', url).json['employee']['name'] == 'Ann'
+    # Write of other process, which does not invalidate cache of this one
+    # nor record its generation.
+    session = mysql_connector.Session
+    session.query(employee.Employee).filter(
+        employee.Employee.employee_id == employee_id).update({'name': 'Bob'})
+    generation.bump('employee')
+    session.info.pop('generations', None)
+    session.commit()
+    session.remove()
+    assert client.request('GET', url).json['employee']['name'] == 'Bob'
+
+
+def test_created_details_are_stored_values(client, employee_payload):
+    result = client.request('POST', '/v1/department', {'name': 42})
+    assert result.json['department']['name'] == '42'
+    assert client.request('GET', '/v1/department/1').json == result.json
+    result = client.request('POST', '/v1/employee', employee_payload(
+        '1', name=123, salary='2000.555'))
+    assert result.json['employee']['name'] == '123'
+    assert result.json['employee']['salary'] == 2000.56
+    assert client.request('GET', '/v1/employee/1').json == result.json
+
+
+def test_own_writes_keep_other_cached_records(client, employee_payload,
+                                              monkeypatch):
+    monkeypatch.setattr(cache.entity_cache, 'check_interval', 0)
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    for name in ['Ann', 'Bob']:
+        client.request('POST', '/v1/employee', employee_payload(1, name=name))
+    client.request('GET', '/v1/employee/1')
+    client.request('PATCH', '/v1/employee/2', {'name': 'Eve'})
+    assert client.request(
+        'GET', '/v1/employee/2').json['employee']['name'] == 'Eve'
+    assert cache.entity_cache.get('employee', 1) is not None
+    # Generation of rolled back write is taken for write of other process.
+    generation.bump('employee')
+    mysql_connector.Session.rollback()
+    generation.bump('employee')
+    mysql_connector.Session.info.pop('generations')
+    mysql_connector.Session.commit()
+    client.request('GET', '/v1/employee/2')
+    assert cache.entity_cache.get('employee', 1) is None
+
+
+def test_bulk_created_departments_are_stored_values(client):
+    result = client.request(
+        'POST', '/v1/department/bulk', [{'name': 42}, {'name': 'HR'}])
+    assert result.json['total_created'] == 2
+    assert client.request(
+        'GET', '/v1/department/1').json['department']['name'] == '42'
+    client.request('PATCH', '/v1/department/2', {'name': 7})
+    assert client.request(
+        'GET', '/v1/department/2').json['department']['name'] == '7'
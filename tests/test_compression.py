@@ -0,0 +1,56 @@
+"""Tests of response compression negotiated by Accept-Encoding."""
+import gzip
+import json
+
+import configs
+
+
+def add_employees(client, employee_payload, count):
+    """Add department HR with the given number of employees."""
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1, name='Employee %d' % number)
+        for number in range(count)])
+
+
+def test_list_is_compressed_when_accepted(client, employee_payload,
+                                          monkeypatch):
+    monkeypatch.setattr(configs, 'COMPRESSION_ENCODINGS', ['gzip'])
+    add_employees(client, employee_payload, 20)
+    url = '/v1/employee?page_size=20'
+    plain = client.request('GET', url)
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+    result = client.request(
+        'GET', url, headers={'Accept-Encoding': 'gzip, deflate'})
+    assert result.headers['Content-Encoding'] == 'gzip'
+    assert result.headers['Vary'] == 'Accept-Encoding'
+    body = gzip.decompress(result.get_data())
+    assert json.loads(body.decode('utf-8')) == plain.json
+    assert int(result.headers['Content-Length']) < len(body)
+    result = client.request(
+        'GET', url, headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in result.headers
+
+
+def test_small_and_error_responses_are_not_compressed(client,
+                                                      employee_payload):
+    add_employees(client, employee_payload, 1)
+    for url in ['/v1/employee/1', '/v1/employee?count=all']:
+        result = client.request(
+            'GET', url, headers={'Accept-Encoding': 'gzip'})
+        assert len(result.get_data()) < configs.COMPRESSION_MIN_SIZE
+        assert 'Content-Encoding' not in result.headers
+
+
+def test_export_is_compressed_as_streamed(client, employee_payload,
+                                          monkeypatch):
+    monkeypatch.setattr(configs, 'COMPRESSION_ENCODINGS', ['gzip'])
+    monkeypatch.setattr(configs, 'EXPORT_BATCH_SIZE', 2)
+    add_employees(client, employee_payload, 5)
+    plain = client.request('GET', '/v1/employee/export')
+    result = client.request(
+        'GET', '/v1/employee/export', headers={'Accept-Encoding': 'gzip'})
+    assert result.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in result.headers
+    assert gzip.decompress(result.get_data()) == plain.get_data()
@@ -0,0 +1,102 @@
+"""Tests of conditional GET answered by entity tag."""
+import mysql_connector
+
+from src import cache
+from src.logic.models import department, employee, generation
+
+
+def test_not_modified_until_employee_is_written(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee', employee_payload(1))
+    result = client.request('GET', '/v1/employee/1')
+    etag = result.headers['ETag']
+    assert result.status_code == 200
+    assert etag.startswith('W/')
+    result = client.request(
+        'GET', '/v1/employee/1', headers={'If-None-Match': etag})
+    assert result.status_code == 304
+    assert result.headers['ETag'] == etag
+
+    client.request('PATCH', '/v1/employee/1', {'name': 'Bob'})
+    result = client.request(
+        'GET', '/v1/employee/1', headers={'If-None-Match': etag})
+    assert result.status_code == 200
+    assert result.json['employee']['name'] == 'Bob'
+    assert result.headers['ETag'] != etag
+
+    # Rename of department changes the details of its employees.
+    etag = result.headers['ETag']
+    client.request('PUT', '/v1/department/1', {'name': 'Sales'})
+    result = client.request(
+        'GET', '/v1/employee/1', headers={'If-None-Match': etag})
+    assert result.status_code == 200
+    assert result.json['employee']['department'] == 'Sales'
+
+
+def test_etag_of_compressed_and_not_modified_response(client,
+                                                      employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1, name='Employee %d' % number)
+        for number in range(20)])
+    result = client.request(
+        'GET', '/v1/employee?page_size=20',
+        headers={'Accept-Encoding': 'gzip'})
+    assert result.headers['Content-Encoding'] == 'gzip'
+    etag = result.headers['ETag']
+    result = client.request(
+        'GET', '/v1/employee?page_size=20',
+        headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert result.status_code == 304
+    assert result.headers['ETag'] == etag
+
+
+def test_etag_is_version_of_served_details(client, employee_payload,
+                                           monkeypatch):
+    monkeypatch.setattr(cache.entity_cache, 'check_interval', 3600)
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee', employee_payload(1))
+    etag = client.request('GET', '/v1/employee/1').headers['ETag']
+    # Write of other process, not yet seen by cache of this process.
+    session = mysql_connector.Session
+    session.query(employee.Employee).filter(
+        employee.Employee.employee_id == 1).update({'name': 'Bob'})
+    generation.bump('employee')
+    session.commit()
+    session.remove()
+    result = client.request('GET', '/v1/employee/1')
+    assert result.json['employee']['name'] == 'Ann'
+    assert result.headers['ETag'] == etag
+
+
+def test_bump_inserts_and_increments_generation(client):
+    generation.bump('employee', 'department')
+    generation.bump('employee')
+    mysql_connector.Session.commit()
+    generations = generation.get_generations(['employee', 'department'])
+    assert generations['employee'][0] == 2
+    assert generations['department'][0] == 1
+
+
+def test_list_etag_follows_renamed_department(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee', employee_payload(1))
+    result = client.request('GET', '/v1/employee')
+    etag = result.headers['ETag']
+    assert result.json['employees'][0]['department'] == 'HR'
+    # Rename of other process, which does not reload names of this one.
+    session = mysql_connector.Session
+    session.query(department.Department).filter(
+        department.Department.department_id == 1).update({'name': 'Sales'})
+    generation.bump('department')
+    session.commit()
+    session.remove()
+    result = client.request(
+        'GET', '/v1/employee', headers={'If-None-Match': etag})
+    assert result.status_code == 200
+    assert result.json['employees'][0]['department'] == 'Sales'
+    assert result.headers['ETag'] != etag
+    result = client.request(
+        'GET', '/v1/employee',
+        headers={'If-None-Match': result.headers['ETag']})
+    assert result.status_code == 304
@@ -0,0 +1,56 @@
+"""Tests of total records count modes of lists."""
+import datetime
+
+import mysql_connector
+
+from src.logic.models import employee
+
+
+def add_employees(client, employee_payload, count):
+    """Add department HR with the given number of employees."""
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1, name='Employee %d' % number)
+        for number in range(count)])
+
+
+def test_count_modes(client, employee_payload):
+    add_employees(client, employee_payload, 5)
+    for mode in ['exact', 'estimate']:
+        result = client.request(
+            'GET', '/v1/employee?page_size=2&count=' + mode)
+        assert result.json['total_records'] == 5
+        assert result.json['total_pages'] == 3
+        assert result.json['has_more'] is True
+    result = client.request('GET', '/v1/employee?page_size=2&count=none')
+    assert result.json['total_records'] is None
+    assert result.json['total_pages'] is None
+    assert result.json['has_more'] is True
+    result = client.request(
+        'GET', '/v1/employee?page_size=2&page=3&count=none')
+    assert len(result.json['employees']) == 1
+    assert result.json['has_more'] is False
+    result = client.request('GET', '/v1/employee?count=all')
+    assert result.status_code == 400
+    assert result.json['message'] == [{
+        'invalid count value':
+            'count value should be exact, estimate or none'}]
+
+
+def test_exact_count_is_cached_by_search_filter(client, employee_payload):
+    add_employees(client, employee_payload, 3)
+    url = '/v1/employee?page_size=1&search_by=department&search_for=HR'
+    assert client.request('GET', url).json['total_records'] == 3
+    # Insert which does not invalidate counts, like write of other process.
+    session = mysql_connector.Session
+    session.add(employee.Employee(
+        name='Eve', department_id=1, gender='female', address='House 2',
+        salary=1000, date_of_joining=datetime.date(2017, 1, 2)))
+    session.commit()
+    session.remove()
+    assert client.request('GET', url).json['total_records'] == 3
+    assert client.request(
+        'GET', '/v1/employee?page_size=1').json['total_records'] == 4
+    client.request('DELETE', '/v1/employee/4')
+    client.request('DELETE', '/v1/employee/3')
+    assert client.request('GET', url).json['total_records'] == 2
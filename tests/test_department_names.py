@@ -0,0 +1,48 @@
+"""Tests of the in process map of department names."""
+from sqlalchemy import create_engine
+
+import mysql_connector
+
+from src.logic.models import department
+
+
+def test_names_are_loaded_from_primary(client, monkeypatch):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    # Replica which has not replicated the department yet.
+    replica = create_engine('sqlite://')
+    mysql_connector.Base.metadata.create_all(replica)
+
+    class Router(object):
+        def engine(self):
+            return replica
+
+    monkeypatch.setattr(mysql_connector, 'replica_router', Router())
+    session = mysql_connector.Session()
+    session.info['replica'] = True
+    try:
+        department.department_names.load()
+    finally:
+        mysql_connector.Session.remove()
+    assert department.department_names.value(1) == 'HR'
+
+
+def test_departments_of_same_name_share_rank(client, employee_payload):
+    for name in ['Sales', 'HR', 'Sales']:
+        client.request('POST', '/v1/department', {'name': name})
+    for department_id in [3, 2, 1]:
+        client.request('POST', '/v1/employee', employee_payload(
+            department_id))
+    result = client.request(
+        'GET', '/v1/employee?search_by=department:in&search_for=Sales|HR'
+        '&sort_by=department&order_by=ASC&page_size=1&cursor=')
+    ids = [row['employee_id'] for row in result.json['employees']]
+    while result.json['next_cursor']:
+        result = client.request(
+            'GET', '/v1/employee?search_by=department:in'
+            '&search_for=Sales|HR&sort_by=department&order_by=ASC'
+            '&page_size=1&cursor=' + result.json['next_cursor'])
+        ids += [row['employee_id'] for row in result.json['employees']]
+    assert ids == [2, 1, 3]
+    department.department_names.load()
+    assert department.department_names.name_rank('Sales') == 1
+    assert department.department_names.map.ranks == {2: 0, 1: 1, 3: 1}
@@ -0,0 +1,56 @@
+"""Tests of list queries and schema portable to SQLite."""
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import mysql_connector
+
+from src import constants, dialect
+
+
+def test_lists_page_sort_and_search(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/department', {'name': 'Sales'})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1 + number % 2, name='Employee %d' % number,
+                         salary=1000 + number)
+        for number in range(5)])
+    result = client.request(
+        'GET', '/v1/employee?sort_by=salary&order_by=DESC&page_size=2&page=2')
+    assert [row['salary'] for row in result.json['employees']] == [
+        1002.0, 1001.0]
+    assert result.json['total_records'] == 5
+    result = client.request(
+        'GET', '/v1/employee?search_by=department&search_for=Sales'
+        '&sort_by=name&order_by=ASC')
+    assert [row['name'] for row in result.json['employees']] == [
+        'Employee 1', 'Employee 3']
+    result = client.request(
+        'GET', '/v1/department?sort_by=name&order_by=DESC&page_size=1')
+    assert result.json['departments'] == [{'department_id': 2,
+                                           'name': 'Sales'}]
+    assert result.json['total_pages'] == 2
+
+
+def test_schema_of_file_database(tmp_path):
+    engine = create_engine('sqlite:///' + str(tmp_path / 'employees.db'))
+    sqlite = dialect.get_engine_dialect(engine)
+    assert sqlite.name == 'sqlite'
+    mysql_connector.Base.metadata.create_all(engine)
+    for created in range(2):
+        # Creating search indexes again keeps the existing ones.
+        sqlite.create_search_indexes(
+            engine, mysql_connector.Base.metadata,
+            constants.TEXT_SEARCH_FIELDS)
+    session = sessionmaker(bind=engine)()
+    try:
+        inserted = session.execute(text(
+            "INSERT INTO department (name) VALUES ('HR'), ('Sales')"))
+        assert sqlite.first_inserted_id(inserted, 2) == 1
+        session.commit()
+        assert sqlite.estimated_count(session, 'department') == 2
+        assert session.execute(text(
+            "SELECT rowid FROM department_fts WHERE department_fts "
+            "MATCH 'sales'")).fetchall() == [(2,)]
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,61 @@
+"""Tests of department responses expanded with their employees."""
+from sqlalchemy import event
+
+import mysql_connector
+
+
+def add_departments(client, employee_payload, count):
+    """Add the given number of departments, department n with n employees.
+    """
+    for number in range(count):
+        client.request('POST', '/v1/department', {'name': 'D%d' % number})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(number + 1, name='E%d.%d' % (number, index))
+        for number in range(count) for index in range(number)])
+
+
+def test_expand_single_department(client, employee_payload):
+    add_departments(client, employee_payload, 3)
+    result = client.request(
+        'GET', '/v1/department/3?expand=employees,employee_count'
+        '&employees_limit=1')
+    assert result.json['department']['employee_count'] == 2
+    assert [row['name'] for row in result.json['department']['employees']] \
+        == ['E2.0']
+    assert 'department' not in result.json['department']['employees'][0]
+    result = client.request('GET', '/v1/department/1?expand=employees')
+    assert result.json['department']['employees'] == []
+
+
+def test_expand_list_without_query_per_department(client, employee_payload):
+    add_departments(client, employee_payload, 6)
+    statements = []
+
+    def count(*args):
+        statements.append(args)
+
+    url = '/v1/department?page_size=%d&count=none' \
+        '&expand=employees,employee_count'
+    event.listen(mysql_connector.engine, 'before_cursor_execute', count)
+    try:
+        result = client.request('GET', url % 2)
+        two_departments = len(statements)
+        del statements[:]
+        result = client.request('GET', url % 6)
+        assert len(statements) == two_departments
+    finally:
+        event.remove(mysql_connector.engine, 'before_cursor_execute', count)
+    assert [row['employee_count'] for row in result.json['departments']] \
+        == [0, 1, 2, 3, 4, 5]
+    assert [len(row['employees']) for row in result.json['departments']] \
+        == [0, 1, 2, 3, 4, 5]
+
+
+def test_invalid_expand_is_rejected(client):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    for query in ['expand=manager', 'expand=employees&employees_limit=0',
+                  'expand=employees&employees_limit=101']:
+        assert client.request(
+            'GET', '/v1/department/1?' + query).status_code == 400
+        assert client.request(
+            'GET', '/v1/department?' + query).status_code == 400
@@ -0,0 +1,57 @@
+"""Tests of the streaming export of employees and departments."""
+import csv
+import io
+import json
+
+import configs
+
+from src import constants
+
+
+def add_employees(client, employee_payload):
+    """Add departments HR and Sales with employees."""
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/department', {'name': 'Sales'})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1 + number % 2, name='Employee %d' % number)
+        for number in range(5)])
+
+
+def test_ndjson_export_of_search(client, employee_payload, monkeypatch):
+    monkeypatch.setattr(configs, 'EXPORT_BATCH_SIZE', 2)
+    add_employees(client, employee_payload)
+    result = client.request(
+        'GET', '/v1/employee/export?search_by=department&search_for=HR'
+        '&sort_by=name&order_by=DESC')
+    assert result.status_code == 200
+    assert result.mimetype == 'application/x-ndjson'
+    # Streamed in chunks, length is not known in advance.
+    assert 'Content-Length' not in result.headers
+    records = [json.loads(line)
+               for line in result.get_data(as_text=True).splitlines()]
+    assert [record['name'] for record in records] == [
+        'Employee 4', 'Employee 2', 'Employee 0']
+    assert records[0] == {
+        'employee_id': 5, 'name': 'Employee 4', 'department': 'HR',
+        'date_of_joining': '2017-01-02', 'gender': 'female',
+        'address': 'House 1', 'salary': 2000.5}
+
+
+def test_csv_export(client, employee_payload):
+    add_employees(client, employee_payload)
+    result = client.request('GET', '/v1/employee/export?format=csv')
+    assert result.mimetype == 'text/csv'
+    rows = list(csv.reader(io.StringIO(result.get_data(as_text=True))))
+    assert rows[0] == constants.EXPORT_EMPLOYEE_FIELDS
+    assert len(rows) == 6
+    assert rows[2][:3] == ['2', 'Employee 1', 'Sales']
+    result = client.request('GET', '/v1/department/export?format=csv')
+    assert result.get_data(as_text=True) == \
+        'department_id,name\n1,HR\n2,Sales\n'
+
+
+def test_invalid_export_format(client):
+    result = client.request('GET', '/v1/employee/export?format=xml')
+    assert result.status_code == 400
+    assert result.json['message'] == [{
+        'invalid format value': 'format value should be ndjson or csv'}]
@@ -0,0 +1,62 @@
+"""Tests of fields parameter selecting returned fields of reads."""
+from src.logic.models import department
+
+
+def add_employee(client, employee_payload):
+    """Add department HR with one employee."""
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee', employee_payload(1))
+
+
+def test_fields_of_employee_reads(client, employee_payload):
+    add_employee(client, employee_payload)
+    result = client.request(
+        'GET', '/v1/employee?fields=employee_id,department')
+    assert result.json['employees'] == [
+        {'employee_id': 1, 'department': 'HR'}]
+    result = client.request('GET', '/v1/employee/1?fields=name,salary')
+    assert result.json == {'employee': {'name': 'Ann', 'salary': 2000.5}}
+    result = client.request('GET', '/v1/employee?ids=1&fields=name')
+    assert result.json['employees'] == [{'name': 'Ann'}]
+
+
+def test_employees_without_department_skip_names(client, employee_payload,
+                                                 monkeypatch):
+    add_employee(client, employee_payload)
+
+    def fail(*args):
+        raise AssertionError('department names looked up')
+
+    for method in ['ensure', 'json', 'value']:
+        monkeypatch.setattr(department.department_names, method, fail)
+    result = client.request('GET', '/v1/employee?fields=employee_id,name')
+    assert result.json['employees'] == [{'employee_id': 1, 'name': 'Ann'}]
+    result = client.request('GET', '/v1/employee/1?fields=gender')
+    assert result.json == {'employee': {'gender': 'female'}}
+
+
+def test_fields_of_department_reads(client):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    result = client.request('GET', '/v1/department?fields=name')
+    assert result.json['departments'] == [{'name': 'HR'}]
+    result = client.request('GET', '/v1/department/1?fields=department_id')
+    assert result.json == {'department': {'department_id': 1}}
+
+
+def test_fields_have_own_entity_tag(client, employee_payload):
+    add_employee(client, employee_payload)
+    tags = set(client.request('GET', url).headers['ETag'] for url in [
+        '/v1/employee/1', '/v1/employee/1?fields=name',
+        '/v1/employee/1?fields=salary'])
+    assert len(tags) == 3
+
+
+def test_invalid_fields_are_rejected(client, employee_payload):
+    add_employee(client, employee_payload)
+    for url in ['/v1/employee?fields=name,password',
+                '/v1/employee/1?fields=password',
+                '/v1/department?fields=department',
+                '/v1/department/1?fields=employees']:
+        result = client.request('GET', url)
+        assert result.status_code == 400
+        assert 'invalid fields' in result.json['message'][0]
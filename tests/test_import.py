@@ -0,0 +1,23 @@
+"""Tests of the streaming import of records."""
+import json
+
+from src import constants
+
+
+def test_rejects_are_reported_in_line_order(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    # Line 2 is rejected by database, line 3 by validation, in one batch.
+    records = [
+        employee_payload(1), employee_payload(2),
+        employee_payload(1, gender='unknown'), employee_payload(1),
+        employee_payload(2), employee_payload(1)]
+    result = client.client.open(
+        '/v1/employee/import?batch_size=3', method='POST',
+        headers={constants.API_KEY_IN_HEADER: constants.API_KEY},
+        content_type='application/x-ndjson',
+        data='\n'.join(json.dumps(record) for record in records) + '\n')
+    summary = json.loads(result.get_data(as_text=True))
+    assert summary['total_records'] == 6
+    assert summary['total_imported'] == 3
+    assert summary['total_rejected'] == 3
+    assert [item['line'] for item in summary['rejected']] == [2, 3, 5]
@@ -0,0 +1,14 @@
+"""Tests of multi-get of records by ids."""
+
+
+def test_repeated_ids_are_returned_once(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    for number in range(3):
+        client.request('POST', '/v1/employee', employee_payload(1))
+    result = client.request('GET', '/v1/employee?ids=3,99,1,3&fields=name')
+    assert [row.get('status') for row in result.json['employees']] == [
+        None, 'not_found', None]
+    assert result.json['total_records'] == 2
+    result = client.request('GET', '/v1/department?ids=1,1')
+    assert result.json['departments'] == [{'department_id': 1, 'name': 'HR'}]
+    assert result.json['total_records'] == 1
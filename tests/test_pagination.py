@@ -0,0 +1,76 @@
+"""Tests of keyset (cursor) pagination of lists."""
+import pytest
+
+
+def follow_cursor(client, url, pages=10):
+    """Returns ids of employees of the pages read by following next cursor.
+    :param client: obj - Test client.
+    :param url: str - List url without cursor.
+    :param pages: int - Maximum number of pages read.
+    :return: list
+    """
+    ids = []
+    cursor = ''
+    for page in range(pages):
+        result = client.request('GET', url + '&cursor=' + cursor)
+        assert result.status_code == 200
+        ids += [row['employee_id'] for row in result.json['employees']]
+        cursor = result.json['next_cursor']
+        if not cursor:
+            break
+    return ids
+
+
+@pytest.mark.parametrize('order', ['ASC', 'DESC'])
+def test_cursor_over_tied_fractional_salaries(client, employee_payload,
+                                              order):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    for number in range(5):
+        client.request('POST', '/v1/employee', employee_payload(
+            1, name='Employee %d' % number, salary=1000.555))
+    ids = follow_cursor(
+        client, '/v1/employee?page_size=2&sort_by=salary&order_by=' + order)
+    assert ids == [1, 2, 3, 4, 5]
+
+
+def test_cursor_over_distinct_salaries(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    salaries = [3000.125, 1000.555, 2000.1, 1000.554, 2000.1]
+    for salary in salaries:
+        client.request('POST', '/v1/employee', employee_payload(
+            1, salary=salary))
+    ids = follow_cursor(
+        client, '/v1/employee?page_size=2&sort_by=salary&order_by=DESC')
+    assert ids == [1, 3, 5, 2, 4]
+
+
+@pytest.mark.parametrize('sort_by, expected', [
+    ('date_of_joining', [3, 2, 5, 1, 4]),
+    ('department', [2, 4, 1, 3, 5]),
+    ('name', [1, 2, 3, 4, 5])
+])
+def test_cursor_sorted_by_field(client, employee_payload, sort_by,
+                                expected):
+    client.request('POST', '/v1/department', {'name': 'Sales'})
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    for number in range(5):
+        client.request('POST', '/v1/employee', employee_payload(
+            number % 2 + 1, name='Employee %d' % number,
+            date_of_joining='2017-01-0%d' % (3 - number % 3)))
+    ids = follow_cursor(
+        client, '/v1/employee?page_size=2&fields=employee_id,name'
+                '&sort_by={sort_by}&order_by=ASC'.format(sort_by=sort_by))
+    assert ids == expected
+
+
+def test_cursor_of_other_sort_is_rejected(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    for number in range(3):
+        client.request('POST', '/v1/employee', employee_payload(1))
+    result = client.request(
+        'GET', '/v1/employee?page_size=1&cursor=&sort_by=name&order_by=ASC')
+    cursor = result.json['next_cursor']
+    result = client.request(
+        'GET', '/v1/employee?page_size=1&sort_by=salary&order_by=ASC'
+               '&cursor=' + cursor)
+    assert result.status_code == 400
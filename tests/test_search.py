@@ -0,0 +1,126 @@
+"""Tests of search filters of employee lists and bulk writes."""
+
+
+def employee_ids(result):
+    """Returns ids of employees of list response.
+    :param result: obj - Response.
+    :return: list
+    """
+    return [row['employee_id'] for row in result.json['employees']]
+
+
+def test_search_values_are_compared_as_given(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    for salary in [1000, 2000.5]:
+        client.request('POST', '/v1/employee', employee_payload(
+            1, salary=salary))
+    result = client.request(
+        'GET', '/v1/employee?search_by=salary&search_for=2000.5')
+    assert employee_ids(result) == [2]
+    result = client.request(
+        'GET', '/v1/employee?search_by=employee_id&search_for=1')
+    assert employee_ids(result) == [1]
+    result = client.request(
+        'PATCH', '/v1/employee?search_by=salary&search_for=1000',
+        {'name': 'Bob'})
+    assert result.json['affected_rows'] == 1
+    assert client.request(
+        'GET', '/v1/employee/1').json['employee']['name'] == 'Bob'
+    result = client.request(
+        'DELETE', '/v1/employee?search_by=salary&search_for=2000.5')
+    assert result.json['affected_rows'] == 1
+
+
+def test_non_numeric_search_value_is_rejected(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee', employee_payload(1))
+    for search in ['search_by=salary&search_for=abc',
+                   'search_by=employee_id&search_for=abc',
+                   'search_by=department_id:in&search_for=1|x',
+                   'search_by=salary:gte&search_for=abc']:
+        result = client.request('GET', '/v1/employee?' + search)
+        assert result.status_code == 400
+        assert result.json['code'] == 'bad_request'
+    result = client.request(
+        'GET', '/v1/department?search_by=department_id&search_for=abc')
+    assert result.status_code == 400
+    result = client.request(
+        'DELETE', '/v1/employee?search_by=salary&search_for=abc')
+    assert result.status_code < 500
+    assert client.request('GET', '/v1/employee/1').status_code == 200
+
+
+def test_search_modes_of_text_fields(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1, name='Ann Lee', address='12 Oak Street'),
+        employee_payload(1, name='Annabel Smith', address='100% Pine Road'),
+        employee_payload(1, name='Bob Oakley', address='3 Elm Street'),
+        employee_payload(1, name='Joann', address='Oak Oak Lane')])
+    url = '/v1/employee?sort_by=employee_id&order_by=ASC&search_by='
+    result = client.request(
+        'GET', url + 'name&search_for=ann&search_mode=prefix')
+    assert employee_ids(result) == [1, 2]
+    result = client.request(
+        'GET', url + 'name&search_for=ann&search_mode=contains')
+    assert employee_ids(result) == [1, 2, 4]
+    # Wildcards of LIKE are matched as text.
+    result = client.request(
+        'GET', url + 'address&search_for=0%25&search_mode=contains')
+    assert employee_ids(result) == [2]
+    result = client.request(
+        'GET', url + 'name&search_for=Ann Lee&search_mode=exact')
+    assert employee_ids(result) == [1]
+    result = client.request(
+        'GET', url + 'address&search_for=oak&search_mode=fulltext')
+    assert employee_ids(result) == [1, 4]
+
+
+def test_fulltext_search_sorted_by_relevance(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1, address='Oak Street'),
+        employee_payload(1, address='Elm Street'),
+        employee_payload(1, address='Oak Oak Oak Lane')])
+    result = client.request(
+        'GET', '/v1/employee?search_by=address&search_for=oak'
+        '&search_mode=fulltext&sort_by=relevance&order_by=DESC')
+    assert employee_ids(result) == [3, 1]
+    for query in ['search_by=address&search_for=oak&sort_by=relevance'
+                  '&order_by=DESC',
+                  'search_by=address&search_for=oak&search_mode=fulltext'
+                  '&sort_by=relevance&order_by=DESC&cursor=']:
+        result = client.request('GET', '/v1/employee?' + query)
+        assert result.status_code == 400
+    result = client.request(
+        'GET', '/v1/employee?search_by=name&search_for=Ann'
+        '&search_mode=fuzzy')
+    assert result.json['message'] == [{
+        'invalid search mode value':
+            'search_mode value should be exact, prefix, contains or '
+            'fulltext'}]
+
+
+def test_range_and_multi_value_operators(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/department', {'name': 'Sales'})
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1, salary=1000, date_of_joining='2016-05-01'),
+        employee_payload(2, salary=2000, date_of_joining='2017-05-01'),
+        employee_payload(1, salary=3000, date_of_joining='2018-05-01')])
+    url = '/v1/employee?sort_by=employee_id&order_by=ASC&'
+    for query, ids in [
+            ('search_by=salary:gte&search_for=2000', [2, 3]),
+            ('search_by=salary:lte&search_for=2000', [1, 2]),
+            ('search_by=salary:between&search_for=1500|3000', [2, 3]),
+            ('search_by=date_of_joining:between'
+             '&search_for=2017-01-01|2018-12-31', [2, 3]),
+            ('search_by=employee_id:in&search_for=1|3', [1, 3]),
+            ('search_by=department:in&search_for=Sales|IT', [2]),
+            ('search_by=salary:gte,department&search_for=1500,HR', [3])]:
+        assert employee_ids(client.request('GET', url + query)) == ids
+    for query in ['search_by=name:gte&search_for=A',
+                  'search_by=salary:between&search_for=1000',
+                  'search_by=salary:like&search_for=1000',
+                  'search_by=date_of_joining:lte&search_for=2017']:
+        assert client.request('GET', url + query).status_code == 400
@@ -0,0 +1,91 @@
+"""Tests of employee statistics maintained by the employee writes."""
+import mysql_connector
+import runstats
+
+from src.logic.models import employee
+
+
+def stats_rows():
+    """Returns statistics rows of all groups, salaries rounded to cents.
+    :return: list
+    """
+    return sorted(
+        (row.department_id, row.gender, row.headcount,
+         round(float(row.salary_sum), 2), round(float(row.salary_min), 2),
+         round(float(row.salary_max), 2))
+        for row in mysql_connector.Session.query(employee.EmployeeStats))
+
+
+def recomputed_stats_rows():
+    """Returns statistics rows recomputed from employees, in rolled back
+    transaction.
+    :return: list
+    """
+    session = mysql_connector.Session
+    employee.refresh_stats()
+    rows = stats_rows()
+    session.rollback()
+    return rows
+
+
+def test_stats_follow_single_employee_writes(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/department', {'name': 'Sales'})
+    for salary in [1000.5, 3000, 2000.25]:
+        client.request('POST', '/v1/employee', employee_payload(
+            1, salary=salary))
+    client.request('POST', '/v1/employee', employee_payload(
+        2, gender='male', salary=1500))
+    assert stats_rows() == [
+        (1, 'female', 3, 6000.75, 1000.5, 3000.0),
+        (2, 'male', 1, 1500.0, 1500.0, 1500.0)]
+
+    # Maximum of the group is removed, by update of salary and by moving
+    # the employee to other department.
+    client.request('PATCH', '/v1/employee/2', {'salary': 2500})
+    assert stats_rows() == recomputed_stats_rows()
+    client.request('PUT', '/v1/employee/2', employee_payload(
+        2, gender='male', salary=900))
+    assert stats_rows() == [
+        (1, 'female', 2, 3000.75, 1000.5, 2000.25),
+        (2, 'male', 2, 2400.0, 900.0, 1500.0)]
+
+    # Salary between minimum and maximum does not recompute them.
+    client.request('PATCH', '/v1/employee/3', {'salary': 1200})
+    assert stats_rows() == recomputed_stats_rows()
+
+    client.request('DELETE', '/v1/employee/1')
+    client.request('DELETE', '/v1/employee/4')
+    assert stats_rows() == [
+        (1, 'female', 1, 1200.0, 1200.0, 1200.0),
+        (2, 'male', 1, 900.0, 900.0, 900.0)]
+    client.request('DELETE', '/v1/employee/3')
+    assert stats_rows() == recomputed_stats_rows() == [
+        (2, 'male', 1, 900.0, 900.0, 900.0)]
+
+
+def test_stats_follow_bulk_insert(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee', employee_payload(1, salary=700))
+    client.request('POST', '/v1/employee/bulk', [
+        employee_payload(1, salary=salary) for salary in [500, 900.5]])
+    assert stats_rows() == recomputed_stats_rows() == [
+        (1, 'female', 3, 2100.5, 500.0, 900.5)]
+
+
+def test_rebuild_changes_version_of_stats(client, employee_payload,
+                                          monkeypatch):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee', employee_payload(1))
+    etag = client.request('GET', '/v1/stats/employees').headers['ETag']
+    # Employee written outside of the application.
+    session = mysql_connector.Session
+    session.query(employee.Employee).update({'salary': 500})
+    session.commit()
+    session.remove()
+    monkeypatch.setattr('sys.argv', ['runstats.py'])
+    assert runstats.main() == 0
+    result = client.request(
+        'GET', '/v1/stats/employees', headers={'If-None-Match': etag})
+    assert result.status_code == 200
+    assert stats_rows() == [(1, 'female', 1, 500.0, 500.0, 500.0)]
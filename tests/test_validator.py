@@ -0,0 +1,67 @@
+"""Tests of request validation compiled from the Swagger specification."""
+from src import validator
+
+# Message of each invalid employee field
+GENDER_MESSAGE = {'invalid gender value': 'Gender should be male or female'}
+SALARY_MESSAGE = {'invalid salary value': 'Salary should be like 2000.00'}
+DATE_MESSAGE = {'invalid date format':
+                'Date of joining should be in valid YYYY-MM-DD format'}
+
+
+def test_invalid_employee_body_is_rejected(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee', employee_payload(1))
+    for method, url in [('POST', '/v1/employee'), ('PUT', '/v1/employee/1')]:
+        result = client.request(method, url, employee_payload(
+            'a', gender='x', salary='abc', date_of_joining='2017-02-30'))
+        assert result.status_code == 400
+        assert result.json['message'] == [
+            {'non integer or negative fields list': ['department_id']},
+            DATE_MESSAGE, GENDER_MESSAGE, SALARY_MESSAGE]
+        payload = employee_payload(1)
+        del payload['name']
+        result = client.request(method, url, payload)
+        assert result.json['message'] == [{'missing fields': ['name']}]
+    result = client.request('POST', '/v1/employee', {})
+    assert result.json['message'] == 'Request should not be empty'
+
+
+def test_patch_body_checks_given_fields(client, employee_payload):
+    client.request('POST', '/v1/department', {'name': 'HR'})
+    client.request('POST', '/v1/employee', employee_payload(1))
+    result = client.request('PATCH', '/v1/employee/1', {'nickname': 'x'})
+    assert result.json['message'] == [{
+        'invalid fields': [
+            'nickname. request contains name,department_id,'
+            'date_of_joining,gender,address,salary']}]
+    result = client.request('PATCH', '/v1/employee/1', {'name': None})
+    assert result.json['message'] == [{'missing fields': ['name']}]
+    result = client.request(
+        'PATCH', '/v1/employee/1', {'salary': 'abc', 'gender': 'x'})
+    assert result.json['message'] == [GENDER_MESSAGE, SALARY_MESSAGE]
+    # Address is nullable, other fields are not checked.
+    result = client.request('PATCH', '/v1/employee/1', {'address': None})
+    assert result.status_code == 200
+    result = client.request('PATCH', '/v1/department/1', {'name': None})
+    assert result.json['message'] == [{'missing fields': ['name']}]
+
+
+def test_invalid_filter_is_rejected(client):
+    result = client.request(
+        'GET', '/v1/employee?sort_by=foo&order_by=UP&page_size=x')
+    assert result.status_code == 400
+    assert result.json['message'] == [
+        {'non integer or negative fields list': ['page_size']},
+        {'invalid order by value': 'order_by value should be ASC or DESC'},
+        {'invalid fields': [
+            'foo. sort_by contains employee_id,name,date_of_joining,gender,'
+            'salary,department,address,relevance']}]
+    result = client.request('GET', '/v1/department?search_by=name')
+    assert result.json['message'] == [{'missing fields': ['search_for']}]
+
+
+def test_validate_date():
+    assert validator.validate_date('2016-02-29')
+    assert validator.validate_date('2017-1-2')
+    for date in ['2017-02-29', '2017-13-01', '2017', '2017-01-02x', None]:
+        assert not validator.validate_date(date)